@@ -0,0 +1,140 @@
+# -*- coding: utf8 -*-
+# Compares BatchWriteRow and GetRange with and without the body compression against a local mock server.
+#
+#     python compression_benchmark.py --bandwidth 10
+#
+# The mock server answers as the service does, and delays every response by the time its request and response
+# bodies take over a link of ``--bandwidth`` MB/s, 0 for the unlimited loopback.
+
+import argparse
+import base64
+import hashlib
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import tablestore.protobuf.table_store_pb2 as pb2
+from tablestore import *
+from tablestore import utils
+from tablestore.auth import SignV2
+from tablestore.credentials import StaticCredentialsProvider
+from tablestore.plainbuffer.plain_buffer_builder import PlainBufferBuilder
+
+ACCESS_KEY_ID = 'benchmark_id'
+ACCESS_KEY_SECRET = 'benchmark_key'
+ROWS = 200
+
+
+def make_row(i):
+    return Row([('uid', i)], [('device', 'device-%04d' % (i % 16)), ('status', 'online'),
+                              ('payload', '{"temperature": %d, "humidity": 40, "unit": "celsius"}' % (i % 30)),
+                              ('region', 'cn-hangzhou')])
+
+
+def make_rows_body():
+    rows = [PlainBufferBuilder.serialize_for_put_row(row.primary_key, row.attribute_columns)
+            for row in map(make_row, range(ROWS))]
+    # the rows of GetRange share the header of the first row
+    return bytes(rows[0]) + b''.join(bytes(row[4:]) for row in rows[1:])
+
+
+class MockServerHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        request_size = len(body)
+        if self.headers.get('x-ots-request-compress-type') == 'deflate':
+            body = zlib.decompress(body)
+
+        if self.path == '/BatchWriteRow':
+            request = pb2.BatchWriteRowRequest.FromString(body)
+            proto = pb2.BatchWriteRowResponse()
+            for table in request.tables:
+                table_result = proto.tables.add(table_name=table.table_name)
+                for _ in table.rows:
+                    table_result.rows.add(is_ok=True).consumed.capacity_unit.write = 1
+        else:
+            proto = pb2.GetRangeResponse(rows=self.server.rows_body)
+            proto.consumed.capacity_unit.read = ROWS
+        body = proto.SerializeToString()
+
+        headers = {
+            'x-ots-date': utils.get_now_utc_datetime().strftime('%Y-%m-%dT%H:%M:%S.000Z'),
+            'x-ots-requestid': 'request-id',
+            'x-ots-contenttype': 'protocol buffer',
+        }
+        if self.headers.get('x-ots-response-compress-type') == 'deflate':
+            headers['x-ots-response-compress-type'] = 'deflate'
+            headers['x-ots-response-compress-size'] = str(len(body))
+            body = zlib.compress(body)
+        headers['x-ots-contentmd5'] = base64.b64encode(hashlib.md5(body).digest()).decode('utf8')
+        headers['authorization'] = 'OTS %s:%s' % (ACCESS_KEY_ID, self.server.signer.make_response_signature(
+            self.path, headers))
+
+        self.server.sent_bytes += request_size
+        self.server.received_bytes += len(body)
+        if self.server.bandwidth:
+            time.sleep((request_size + len(body)) / self.server.bandwidth)
+        self.send_response(200)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def run(client, server, name, func, rounds):
+    server.sent_bytes = server.received_bytes = 0
+    func(client)
+    begin = time.time()
+    for _ in range(rounds):
+        func(client)
+    elapsed = (time.time() - begin) / rounds
+    print('%-34s %8.2f ms %10d request bytes %10d response bytes' % (
+        name, elapsed * 1000, server.sent_bytes // (rounds + 1), server.received_bytes // (rounds + 1)))
+
+
+def batch_write_row(client):
+    request = BatchWriteRowRequest()
+    request.add(TableInBatchWriteRowItem('benchmark', [PutRowItem(make_row(i), Condition(RowExistenceExpectation.IGNORE))
+                                                       for i in range(ROWS)]))
+    assert client.batch_write_row(request).is_all_succeed()
+
+
+def get_range(client):
+    consumed, next_start_primary_key, rows, _ = client.get_range(
+        'benchmark', Direction.FORWARD, [('uid', INF_MIN)], [('uid', INF_MAX)])
+    assert len(rows) == ROWS
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--bandwidth', type=float, default=0, help='the simulated bandwidth in MB/s, 0 for unlimited')
+    parser.add_argument('--rounds', type=int, default=50)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), MockServerHandler)
+    server.daemon_threads = True
+    server.bandwidth = args.bandwidth * 1024 * 1024
+    server.rows_body = make_rows_body()
+    server.signer = SignV2(StaticCredentialsProvider(ACCESS_KEY_ID, ACCESS_KEY_SECRET), 'utf8')
+    server.signer.gen_signing_key()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    end_point = 'http://127.0.0.1:%d' % server.server_address[1]
+
+    for compression in [None, 'deflate']:
+        with OTSClient(end_point, ACCESS_KEY_ID, ACCESS_KEY_SECRET, 'benchmark', request_compression=compression,
+                       response_compression=compression) as client:
+            run(client, server, 'BatchWriteRow, compression=%s' % compression, batch_write_row, args.rounds)
+            run(client, server, 'GetRange, compression=%s' % compression, get_range, args.rounds)
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -4,6 +4,16 @@ __version__ = '6.3.0'
 __all__ = [
     'OTSClient',
     'AsyncOTSClient',
+    'BatchWriter',
+    'TimeseriesWriter',
+    'AsyncTimeseriesWriter',
+    'ParallelScanner',
+    'AsyncParallelScanner',
+    'Transport',
+    'AsyncTransport',
+    'HttpxTransport',
+    'AsyncHttpxTransport',
+    'ResponseBody',
 
     # Data Types
     'INF_MIN',
@@ -23,6 +33,7 @@ __all__ = [
     'RowDataItem',
     'Condition',
     'Row',
+    'LazyRow',
     'RowItem',
     'PutRowItem',
     'UpdateRowItem',
@@ -141,6 +152,11 @@ __all__ = [
 
 
 from tablestore.client import OTSClient, AsyncOTSClient
+from tablestore.batch_writer import BatchWriter
+from tablestore.timeseries_writer import TimeseriesWriter, AsyncTimeseriesWriter
+from tablestore.parallel_scanner import ParallelScanner, AsyncParallelScanner
+from tablestore.transport import Transport, AsyncTransport, HttpxTransport, AsyncHttpxTransport, ResponseBody
+from tablestore.plainbuffer.plain_buffer_fast_decoder import LazyRow
 from tablestore.metadata import *
 from tablestore.aggregation import *
 from tablestore.group_by import *
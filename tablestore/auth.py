@@ -3,6 +3,8 @@
 import hashlib
 import hmac
 import base64
+import datetime
+import time
 import six
 from abc import ABC, abstractmethod
 
@@ -41,6 +43,9 @@ class SignBase(ABC):
         self.credentials_provider = credentials_provider
         self.encoding = encoding
         self.signing_key = None
+        # the uri and the canonical prefix of the request signature string of the queries without parameters,
+        # which are the fixed '/ApiName' paths of the APIs
+        self._query_signature_prefixes = {}
 
     def get_credentials_provider(self):
         return self.credentials_provider
@@ -49,9 +54,14 @@ class SignBase(ABC):
     def _make_headers_string(headers):
         headers_item = ["%s:%s" % (k.lower(), v.strip()) for k, v in headers.items()
                         if k.startswith(consts.OTS_HEADER_PREFIX)]
-        return "\n".join(sorted(headers_item))
+        headers_item.sort()
+        return "\n".join(headers_item)
+
+    def _get_query_signature_prefix(self, query):
+        cached = self._query_signature_prefixes.get(query)
+        if cached is not None:
+            return cached
 
-    def _get_request_signature_string(self, query, headers):
         uri, param_string, query_string = urlparse(query)[2:5]
 
         # TODO a special query should be input to test query sorting,
@@ -59,14 +69,20 @@ class SignBase(ABC):
         # is required in the protocol document.
         query_pairs = parse_qsl(query_string)
         sorted_query = urlencode(sorted(query_pairs))
-        signature_string = uri + '\n' + 'POST' + '\n' + sorted_query + '\n'
+        cached = uri, uri + '\n' + 'POST' + '\n' + sorted_query + '\n'
+        if '?' not in query:
+            self._query_signature_prefixes[query] = cached
+        return cached
+
+    def _get_request_signature_string(self, query, headers):
+        signature_string = self._get_query_signature_prefix(query)[1]
 
         headers_string = self._make_headers_string(headers)
         signature_string += headers_string + '\n'
         return signature_string
 
     def make_response_signature(self, query, headers):
-        uri = urlparse(query)[2]
+        uri = self._get_query_signature_prefix(query)[0]
         headers_string = self._make_headers_string(headers)
         signature_string = headers_string + '\n' + uri
         # Response signature use same signing key as request signature
@@ -108,6 +124,8 @@ class SignV4(SignBase):
         if self.sign_date is None:
             self.sign_date = utils.get_now_utc_datetime().strftime(consts.V4_SIGNATURE_SIGN_DATE_FORMAT)
             self.auto_update_v4_sign = True
+        # the time when the UTC date changes, before which the sign date is not checked again
+        self._sign_date_expire_time = 0
 
     def gen_signing_key(self):
         # if the signing_key is None, we need to update signing_key.
@@ -118,8 +136,11 @@ class SignV4(SignBase):
             self.user_key = cur_user_key
             need_update = True
         # for v4, only update the sign date and signing_key
-        if self.auto_update_v4_sign:
-            cur_date = utils.get_now_utc_datetime().strftime(consts.V4_SIGNATURE_SIGN_DATE_FORMAT)
+        if self.auto_update_v4_sign and time.time() >= self._sign_date_expire_time:
+            now = utils.get_now_utc_datetime()
+            cur_date = now.strftime(consts.V4_SIGNATURE_SIGN_DATE_FORMAT)
+            next_date = now.replace(hour=0, minute=0, second=0, microsecond=0) + datetime.timedelta(days=1)
+            self._sign_date_expire_time = next_date.timestamp()
             # if sign_date changes, we need to update signing_key.
             if cur_date != self.sign_date:
                 self.sign_date = cur_date
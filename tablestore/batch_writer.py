@@ -0,0 +1,218 @@
+# -*- coding: utf8 -*-
+# Implementation of BatchWriter
+
+__all__ = ['BatchWriter']
+
+import collections
+import time
+from concurrent.futures import Future
+
+from tablestore.buffered_writer import BufferedWriter
+from tablestore.error import *
+from tablestore.metadata import *
+from tablestore.plainbuffer.plain_buffer_builder import PlainBufferBuilder
+
+
+class _PendingRow(object):
+
+    def __init__(self, table_name, row_item, size):
+        self.table_name = table_name
+        self.row_item = row_item
+        self.size = size
+        self.enqueue_time = time.time()
+        self.retry_times = 0
+        self.retry_delay = 0
+        self.future = Future()
+
+
+class BatchWriter(BufferedWriter):
+    """
+    ``BatchWriter`` buffers single row writes and sends them to the server through ``OTSClient.batch_write_row``.
+
+    Rows of different tables may be mixed in one batch. A batch is committed by a background thread when it
+    reaches ``max_batch_rows`` rows or ``max_batch_bytes`` bytes, or when the oldest buffered row has waited
+    for ``linger_time`` seconds. Rows that fail inside a successful BatchWriteRow request are retried one by one
+    according to the retry policy, the other rows of the batch are not sent again.
+
+    Every write returns a ``concurrent.futures.Future``. On success its result is the
+    ``tablestore.metadata.BatchWriteRowResponseItem`` of the row, otherwise it holds the ``OTSServiceError`` or
+    ``OTSClientError`` of the row. Asyncio callers can await it through ``asyncio.wrap_future``.
+
+    Example:
+
+        with BatchWriter(client) as writer:
+            future = writer.put_row('myTable', Row([('gid', 1), ('uid', 101)], [('name', 'a')]))
+            writer.delete_row('myTable', Row([('gid', 2), ('uid', 102)]))
+        consumed = future.result().consumed
+    """
+
+    MAX_BATCH_ROWS = 200
+    MAX_BATCH_BYTES = 4 * 1024 * 1024
+    DEFAULT_LINGER_TIME = 0.1
+
+    def __init__(self, client, max_batch_rows=MAX_BATCH_ROWS, max_batch_bytes=MAX_BATCH_BYTES,
+                 linger_time=DEFAULT_LINGER_TIME, retry_policy=None):
+        """
+        ``client`` is the ``OTSClient`` used to send the BatchWriteRow requests.
+        ``max_batch_rows`` is the maximum number of rows in one request, no more than 200.
+        ``max_batch_bytes`` is the maximum size of the serialized rows in one request, no more than 4MB.
+        ``linger_time`` is the maximum time in seconds that a row is buffered before its batch is committed.
+        ``retry_policy`` decides whether a failed row is sent again, the default is the retry policy of ``client``.
+        """
+        if max_batch_rows <= 0 or max_batch_rows > self.MAX_BATCH_ROWS:
+            raise OTSClientError("max_batch_rows should be in range (0, %d]." % self.MAX_BATCH_ROWS)
+        if max_batch_bytes <= 0 or max_batch_bytes > self.MAX_BATCH_BYTES:
+            raise OTSClientError("max_batch_bytes should be in range (0, %d]." % self.MAX_BATCH_BYTES)
+        if linger_time < 0:
+            raise OTSClientError("linger_time should not be negative.")
+
+        BufferedWriter.__init__(self)
+        self.client = client
+        self.max_batch_rows = max_batch_rows
+        self.max_batch_bytes = max_batch_bytes
+        self.linger_time = linger_time
+        self.retry_policy = retry_policy if retry_policy is not None else client.retry_policy
+
+        self._pending = collections.deque()
+        self._pending_bytes = 0
+        self._start('tablestore-batch-writer')
+
+    def put_row(self, table_name, row, condition=None, return_type=None):
+        """
+        Buffer a row to put, the parameters are the same as ``OTSClient.put_row``. Returns a Future.
+        """
+        return self.write(table_name, PutRowItem(row, condition, return_type))
+
+    def update_row(self, table_name, row, condition=None, return_type=None):
+        """
+        Buffer a row to update, the parameters are the same as ``OTSClient.update_row``. Returns a Future.
+        """
+        return self.write(table_name, UpdateRowItem(row, condition, return_type))
+
+    def delete_row(self, table_name, row, condition=None, return_type=None):
+        """
+        Buffer a row to delete, ``row`` is a Row or a primary key list. Returns a Future.
+        """
+        if not isinstance(row, Row):
+            row = Row(row)
+        return self.write(table_name, DeleteRowItem(row, condition, return_type))
+
+    def write(self, table_name, row_item):
+        """
+        Buffer a ``PutRowItem``, ``UpdateRowItem`` or ``DeleteRowItem`` of the table. Returns a Future.
+        """
+        if not isinstance(row_item, RowItem):
+            raise OTSClientError(
+                "The input row_item should be an instance of RowItem, not %s" % row_item.__class__.__name__
+            )
+
+        pending_row = _PendingRow(table_name, row_item, self._compute_row_item_size(table_name, row_item))
+        with self._cond:
+            if self._closed:
+                raise OTSClientError("BatchWriter is closed.")
+            self._pending.append(pending_row)
+            self._pending_bytes += pending_row.size
+            # wake up the background thread to start the linger timer or to commit a full batch
+            if (len(self._pending) == 1 or len(self._pending) >= self.max_batch_rows
+                    or self._pending_bytes >= self.max_batch_bytes):
+                self._cond.notify_all()
+        return pending_row.future
+
+    @staticmethod
+    def _compute_row_item_size(table_name, row_item):
+        row = row_item.row
+        if row_item.type == BatchWriteRowType.PUT:
+            size = PlainBufferBuilder.compute_put_row_size(row.primary_key, row.attribute_columns or [])
+        elif row_item.type == BatchWriteRowType.UPDATE:
+            size = PlainBufferBuilder.compute_update_row_size(row.primary_key, row.attribute_columns or {})
+        else:
+            size = PlainBufferBuilder.compute_delete_row_size(row.primary_key)
+        return size + len(table_name)
+
+    @staticmethod
+    def _row_identity(pending_row):
+        primary_key = pending_row.row_item.row.primary_key
+        return pending_row.table_name, tuple(
+            (pk[0], bytes(pk[1]) if isinstance(pk[1], bytearray) else pk[1]) for pk in primary_key
+        )
+
+    def _has_pending(self):
+        return bool(self._pending)
+
+    def _is_batch_ready(self):
+        if not self._pending:
+            return False
+        if self._closed or self._flush_requested:
+            return True
+        if len(self._pending) >= self.max_batch_rows or self._pending_bytes >= self.max_batch_bytes:
+            return True
+        return time.time() - self._pending[0].enqueue_time >= self.linger_time
+
+    def _linger_timeout(self):
+        if not self._pending:
+            return None
+        return self._pending[0].enqueue_time + self.linger_time - time.time()
+
+    def _take_batch(self):
+        # a batch must not contain the same row twice, otherwise the whole request is rejected by the server
+        batch = []
+        batch_bytes = 0
+        identities = set()
+        while self._pending and len(batch) < self.max_batch_rows:
+            pending_row = self._pending[0]
+            if batch and batch_bytes + pending_row.size > self.max_batch_bytes:
+                break
+            identity = self._row_identity(pending_row)
+            if identity in identities:
+                break
+            identities.add(identity)
+            self._pending.popleft()
+            self._pending_bytes -= pending_row.size
+            batch_bytes += pending_row.size
+            batch.append(pending_row)
+        if not self._pending:
+            self._flush_requested = False
+        return batch
+
+    @staticmethod
+    def _group_by_table(batch):
+        rows_of_table = collections.OrderedDict()
+        for pending_row in batch:
+            rows_of_table.setdefault(pending_row.table_name, []).append(pending_row)
+        return rows_of_table
+
+    def _send_batch(self, batch):
+        request = BatchWriteRowRequest()
+        for table_name, pending_rows in self._group_by_table(batch).items():
+            request.add(TableInBatchWriteRowItem(table_name, [p.row_item for p in pending_rows]))
+        return self.client.batch_write_row(request)
+
+    def _handle_response(self, batch, response):
+        # the rows are in the same order as in the request, and the index of a result is the position of the row
+        # in its table
+        rows_of_table = self._group_by_table(batch)
+        retry_rows = []
+        results = {}
+        for table_of_type in (response.table_of_put, response.table_of_update, response.table_of_delete):
+            for table_name, items in table_of_type.items():
+                for item in items:
+                    results[(table_name, item.index)] = item
+
+        for table_name, pending_rows in rows_of_table.items():
+            for index, pending_row in enumerate(pending_rows):
+                item = results.get((table_name, index))
+                if item is None:
+                    self._set_exception(pending_row.future,
+                                        OTSClientError("The result of row is missing in BatchWriteRow response."))
+                elif item.is_ok:
+                    self._set_result(pending_row.future, item)
+                else:
+                    error = OTSServiceError(None, item.error_code, item.error_message)
+                    if self.retry_policy.should_retry(pending_row.retry_times, error, 'BatchWriteRow'):
+                        pending_row.retry_delay = self.retry_policy.get_retry_delay(
+                            pending_row.retry_times, error, 'BatchWriteRow')
+                        pending_row.retry_times += 1
+                        retry_rows.append(pending_row)
+                    else:
+                        self._set_exception(pending_row.future, error)
+        return retry_rows
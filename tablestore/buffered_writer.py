@@ -0,0 +1,119 @@
+# -*- coding: utf8 -*-
+# The batching machinery shared by BatchWriter and the timeseries writers
+
+import threading
+import time
+
+
+class BufferedWriterBase(object):
+    """
+    The state of a writer which buffers single writes and commits them in batches.
+    Every buffered write has a ``future``, a ``retry_delay`` and a ``retry_times``.
+    """
+
+    def __init__(self):
+        self._inflight = 0
+        self._flush_requested = False
+        self._closed = False
+
+    @staticmethod
+    def _set_result(future, result):
+        # the future may have been cancelled by the caller
+        if not future.done():
+            future.set_result(result)
+
+    @staticmethod
+    def _set_exception(future, error):
+        if not future.done():
+            future.set_exception(error)
+
+    def _fail_batch(self, batch, error):
+        for pending in batch:
+            self._set_exception(pending.future, error)
+
+    @staticmethod
+    def _retry_delay(batch):
+        return max(pending.retry_delay for pending in batch)
+
+
+class BufferedWriter(BufferedWriterBase):
+    """
+    A BufferedWriterBase whose batches are committed by a background thread.
+
+    The subclasses implement ``_has_pending``, ``_is_batch_ready``, ``_linger_timeout`` and ``_take_batch``,
+    which are called with ``_cond`` held, and ``_send_batch`` and ``_handle_response``, which send a batch and
+    return the writes of it to retry.
+    """
+
+    def __init__(self):
+        BufferedWriterBase.__init__(self)
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def _start(self, thread_name):
+        self._thread = threading.Thread(target=self._run, name=thread_name)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def flush(self):
+        """
+        Commit all buffered writes and wait until they are finished.
+        """
+        with self._cond:
+            self._flush_requested = True
+            self._cond.notify_all()
+            while self._has_pending() or self._inflight:
+                self._cond.wait()
+
+    def close(self):
+        """
+        Commit all buffered writes and stop the background thread. Nothing can be written after close.
+        """
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._is_batch_ready():
+                    if self._closed:
+                        return
+                    self._cond.wait(self._linger_timeout())
+                batch = self._take_batch()
+                self._inflight += len(batch)
+                # there is room for the blocked writers
+                self._cond.notify_all()
+
+            try:
+                self._commit(batch)
+            except Exception as e:
+                # an unexpected error fails the batch instead of stopping the background thread
+                self._fail_batch(batch, e)
+            finally:
+                with self._cond:
+                    self._inflight -= len(batch)
+                    self._cond.notify_all()
+
+    def _commit(self, batch):
+        while batch:
+            try:
+                response = self._send_batch(batch)
+            except Exception as e:
+                self._fail_batch(batch, e)
+                return
+
+            batch = self._handle_response(batch, response)
+            if batch:
+                retry_delay = self._retry_delay(batch)
+                if retry_delay > 0:
+                    time.sleep(retry_delay)
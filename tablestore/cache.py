@@ -0,0 +1,199 @@
+# -*- coding: utf8 -*-
+# A bounded LRU cache with an optional time to live, shared by the client side caches
+
+__all__ = ['LRUCache', 'RowCache']
+
+import collections
+import threading
+import time
+
+from tablestore.error import *
+
+
+class LRUCache(object):
+    """
+    A thread safe LRU cache, the least recently used entry is evicted when there are ``max_size`` entries.
+    An entry expires ``ttl`` seconds after it is put, ``ttl`` None means the entries never expire.
+
+    ``hits`` and ``misses`` count the lookups, expired entries are counted as misses.
+    """
+
+    def __init__(self, max_size, ttl=None):
+        if max_size <= 0:
+            raise OTSClientError("max_size should be greater than 0.")
+        if ttl is not None and ttl <= 0:
+            raise OTSClientError("ttl should be greater than 0.")
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expire_time = entry
+                if expire_time is None or expire_time > time.time():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        expire_time = None if self.ttl is None else time.time() + self.ttl
+        with self._lock:
+            self._entries[key] = (value, expire_time)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def invalidate_if(self, predicate):
+        """
+        Remove the entries whose key matches ``predicate``.
+        """
+        with self._lock:
+            for key in [key for key in self._entries if predicate(key)]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return float(self.hits) / lookups if lookups else 0.0
+
+    def stats(self):
+        """
+        Return the size, hits, misses and hit rate of the cache as a dict.
+        """
+        return {'size': len(self._entries), 'hits': self.hits, 'misses': self.misses, 'hit_rate': self.hit_rate}
+
+
+class RowCache(object):
+    """
+    The cache of the rows read by ``get_row`` and ``batch_get_row``. A row is cached by the table, the primary key,
+    ``columns_to_get`` and ``max_version``, and all the cached results of a primary key are removed when it is written.
+
+    ``version`` increases on every invalidation and the version of the last invalidation of every row is kept, a result
+    read before an invalidation of its row is not put into the cache, so a read racing with a write of the same client
+    never caches the old row while the reads of the other rows are still cached.
+    """
+
+    # the number of the rows whose version of the last invalidation is kept
+    MIN_INVALIDATED_ROWS = 1024
+
+    def __init__(self, max_size, ttl=None):
+        if ttl is not None and ttl <= 0:
+            raise OTSClientError("ttl should be greater than 0.")
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.version = 0
+        # the results of the different columns_to_get and max_version of a row are evicted together
+        self._rows = LRUCache(max_size)
+        # the version of the last invalidation of the rows, oldest first, the versions of the rows evicted from it are
+        # no greater than ``_invalidated_version``, which is also the version of the last clear
+        self._invalidated = collections.OrderedDict()
+        self._invalidated_limit = max(max_size, self.MIN_INVALIDATED_ROWS)
+        self._invalidated_version = 0
+        self._transaction_rows = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._rows)
+
+    @staticmethod
+    def _row_key(table_name, primary_key):
+        return table_name, tuple(
+            (pk[0], bytes(pk[1]) if isinstance(pk[1], bytearray) else pk[1]) for pk in primary_key
+        )
+
+    @staticmethod
+    def _variant(columns_to_get, max_version):
+        columns = None if columns_to_get is None else tuple(columns_to_get)
+        return columns, 1 if max_version is None else max_version
+
+    def get(self, table_name, primary_key, columns_to_get, max_version):
+        """
+        Return (True, value) when the row is cached, otherwise (False, None).
+        """
+        row_key = self._row_key(table_name, primary_key)
+        with self._lock:
+            variants = self._rows.get(row_key)
+            entry = variants.get(self._variant(columns_to_get, max_version)) if variants else None
+            if entry is not None and (entry[1] is None or entry[1] > time.time()):
+                self.hits += 1
+                return True, entry[0]
+            self.misses += 1
+            return False, None
+
+    def put(self, table_name, primary_key, columns_to_get, max_version, value, version):
+        """
+        Cache the value of a row, ``version`` is the version of the cache before the row is read.
+        """
+        row_key = self._row_key(table_name, primary_key)
+        expire_time = None if self.ttl is None else time.time() + self.ttl
+        with self._lock:
+            if version < self._invalidated.get(row_key, self._invalidated_version):
+                return
+            variants = self._rows.get(row_key)
+            if variants is None:
+                variants = {}
+                self._rows.put(row_key, variants)
+            variants[self._variant(columns_to_get, max_version)] = (value, expire_time)
+
+    def invalidate(self, table_name, primary_key, transaction_id=None):
+        """
+        Remove the cached results of a row. The row of a transaction is removed again when the transaction finishes.
+        """
+        row_key = self._row_key(table_name, primary_key)
+        with self._lock:
+            self._invalidate(row_key)
+            if transaction_id is not None:
+                self._transaction_rows.setdefault(transaction_id, set()).add(row_key)
+
+    def finish_transaction(self, transaction_id):
+        with self._lock:
+            for row_key in self._transaction_rows.pop(transaction_id, ()):
+                self._invalidate(row_key)
+
+    def clear(self):
+        with self._lock:
+            self.version += 1
+            self._invalidated_version = self.version
+            self._invalidated.clear()
+            self._rows.clear()
+            self._transaction_rows.clear()
+
+    def _invalidate(self, row_key):
+        self.version += 1
+        self._rows.invalidate(row_key)
+        self._invalidated.pop(row_key, None)
+        self._invalidated[row_key] = self.version
+        if len(self._invalidated) > self._invalidated_limit:
+            # the reads of any row started before the oldest kept invalidation are not cached
+            _, self._invalidated_version = self._invalidated.popitem(last=False)
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return float(self.hits) / lookups if lookups else 0.0
+
+    def stats(self):
+        """
+        Return the number of cached rows, hits, misses and hit rate of the cache as a dict.
+        """
+        return {'size': len(self._rows), 'hits': self.hits, 'misses': self.misses, 'hit_rate': self.hit_rate}
@@ -4,6 +4,7 @@
 __all__ = ['OTSClient', 'AsyncOTSClient']
 
 import asyncio
+import copy
 import time
 import logging
 from abc import ABC
@@ -25,7 +26,12 @@ from tablestore.auth import SignV2, SignV4
 from tablestore.protocol import OTSProtocol
 from tablestore.connection import ConnectionPool, AsyncConnectionPool
 from tablestore.metadata import *
-from tablestore.retry import DefaultRetryPolicy
+from tablestore.retry import DefaultRetryPolicy, RetryUtil
+from tablestore.cache import LRUCache, RowCache
+from tablestore.single_flight import SingleFlight, AsyncSingleFlight
+from tablestore.timeseries_condition import canonicalize_meta_condition
+from tablestore.utils import prefetch_iterator, aprefetch_iterator
+from tablestore.range_scanner import complete_split_point, make_scan_ranges, iter_ranges_in_parallel, aiter_ranges_in_parallel
 
 
 class BaseOTSClient(ABC):
@@ -34,6 +40,12 @@ class BaseOTSClient(ABC):
     DEFAULT_SOCKET_TIMEOUT = 50
     DEFAULT_MAX_CONNECTION = 50
     DEFAULT_LOGGER_NAME = 'tablestore-client'
+    DEFAULT_SCAN_CONCURRENCY = 8
+    MAX_BATCH_GET_ROWS = 100
+    MAX_BATCH_WRITE_ROWS = 200
+    DEFAULT_TIMESERIES_META_CACHE_TTL = 60
+    DEFAULT_ROW_CACHE_TTL = 10
+    DEFAULT_COMPRESSION_THRESHOLD = 1024
 
     def __init__(self, end_point, access_key_id=None, access_key_secret=None, instance_name=None,
                  credentials_provider: CredentialsProvider = None, region: str = None, **kwargs):
@@ -70,6 +82,25 @@ class BaseOTSClient(ABC):
 
         ``ssl_version`` defines the TLS version used for https connections. The default is None.
 
+        ``timeseries_meta_cache_size`` is the maximum number of QueryTimeseriesMeta results cached by the client. The default is 0, which disables the cache.
+
+        ``timeseries_meta_cache_ttl`` is the time in seconds that a cached QueryTimeseriesMeta result is used. The default is 60.
+
+        ``row_cache_size`` is the maximum number of rows cached by ``get_row`` and ``batch_get_row``. The default is 0, which disables the cache.
+
+        ``row_cache_ttl`` is the time in seconds that a cached row is used. The default is 10.
+
+        ``coalesce_requests`` specifies whether the concurrent requests of the read APIs with the same request body share one request and its result. The default is False.
+        The callers of a shared request get the same response object, and a read may join a request which was sent before a write of this client finished.
+
+        ``request_compression`` is the compression of the request bodies, 'deflate' or None. The default is None, which disables the compression.
+
+        ``response_compression`` is the compression of the response bodies asked from the server, 'deflate' or None. The default is None.
+
+        ``compression_threshold`` is the minimum size in bytes of the request bodies which are compressed. The default is 1024.
+
+        ``verify_checksum`` specifies whether the checksums of the rows in the responses are verified. The default is True.
+
 
         Example: Create an OTSClient instance
 
@@ -122,10 +153,17 @@ class BaseOTSClient(ABC):
             )
 
         # initialize protocol instance via user configuration
+        compression_threshold = kwargs.get('compression_threshold')
+        if compression_threshold is None:
+            compression_threshold = BaseOTSClient.DEFAULT_COMPRESSION_THRESHOLD
         self.protocol = OTSProtocol(
             instance_name=instance_name,
             encoding=self.encoding,
-            logger=self.logger
+            logger=self.logger,
+            request_compression=kwargs.get('request_compression'),
+            response_compression=kwargs.get('response_compression'),
+            compression_threshold=compression_threshold,
+            verify_checksum=kwargs.get('verify_checksum', True)
         )
 
         # initialize connection via user configuration
@@ -146,6 +184,27 @@ class BaseOTSClient(ABC):
             retry_policy = DefaultRetryPolicy()
         self.retry_policy = retry_policy
 
+        # initialize the cache of QueryTimeseriesMeta
+        self.timeseries_meta_cache = None
+        self._timeseries_meta_cache_version = 0
+        timeseries_meta_cache_size = kwargs.get('timeseries_meta_cache_size')
+        if timeseries_meta_cache_size:
+            timeseries_meta_cache_ttl = kwargs.get('timeseries_meta_cache_ttl')
+            if timeseries_meta_cache_ttl is None:
+                timeseries_meta_cache_ttl = BaseOTSClient.DEFAULT_TIMESERIES_META_CACHE_TTL
+            self.timeseries_meta_cache = LRUCache(timeseries_meta_cache_size, timeseries_meta_cache_ttl)
+
+        # initialize the cache of GetRow and BatchGetRow
+        self.row_cache = None
+        row_cache_size = kwargs.get('row_cache_size')
+        if row_cache_size:
+            row_cache_ttl = kwargs.get('row_cache_ttl')
+            if row_cache_ttl is None:
+                row_cache_ttl = BaseOTSClient.DEFAULT_ROW_CACHE_TTL
+            self.row_cache = RowCache(row_cache_size, row_cache_ttl)
+
+        self.coalesce_requests = kwargs.get('coalesce_requests', False)
+
     @staticmethod
     def _create_credentials_provider(end_point, instance_name, access_key_id, access_key_secret,
                                      sts_token: str = None,
@@ -164,6 +223,146 @@ class BaseOTSClient(ABC):
         else:
             return credentials_provider
 
+    def invalidate_timeseries_meta_cache(self, timeseries_table_name=None):
+        """
+        Description: Removes the cached QueryTimeseriesMeta results of a timeseries table, or of all tables when ``timeseries_table_name`` is None.
+        The cache is invalidated by ``update_timeseries_meta`` and ``delete_timeseries_meta`` of this client, this method is for the changes made by others.
+        """
+        if self.timeseries_meta_cache is None:
+            return
+        # the responses of the queries sent before the invalidation are not cached
+        self._timeseries_meta_cache_version += 1
+        if timeseries_table_name is None:
+            self.timeseries_meta_cache.clear()
+        else:
+            self.timeseries_meta_cache.invalidate_if(lambda key: key[0] == timeseries_table_name)
+
+    def prepare_search_query(self, search_query):
+        """
+        Description: Encodes a search query once for the searches which only change its paging.
+
+        ``search_query`` is an instance of the tablestore.metadata.SearchQuery class, it is not modified.
+
+        Return: An instance of the tablestore.metadata.PreparedSearchQuery class, it is passed to ``search`` and ``search_pages`` in place of the SearchQuery.
+        Its ``get_total_count``, ``next_token``, ``offset`` and ``limit`` can be changed between the searches, the changes of the other parts of ``search_query`` are not applied after it is prepared.
+
+        Example:
+
+            prepared = client.prepare_search_query(SearchQuery(BoolQuery(must_queries=[TermQuery('k', 'key000')]), limit=100))
+            prepared.offset = 100
+            search_response = client.search('myTable', 'myIndex', prepared)
+        """
+        return self.protocol.encoder.encode_prepared_search_query(search_query)
+
+    def prepare_get_row(self, table_name, columns_to_get=None, column_filter=None, max_version=1):
+        """
+        Description: Encodes the parts of a GetRow request other than the primary key once, for the reads which only change the primary key.
+
+        ``table_name``, ``columns_to_get``, ``column_filter`` and ``max_version`` are the same as those of ``get_row``.
+
+        Return: An instance of the tablestore.metadata.PreparedGetRow class, it is executed by ``execute_get_row``.
+
+        Example:
+
+            prepared = client.prepare_get_row('myTable', ['name', 'address', 'age'])
+        """
+        return self.protocol.encoder.encode_prepared_get_row(table_name, columns_to_get, column_filter, max_version)
+
+    def prepare_put_row(self, table_name, condition=None, return_type=None):
+        """
+        Description: Encodes the parts of a PutRow request other than the row once, for the writes which only change the row.
+
+        ``table_name``, ``condition`` and ``return_type`` are the same as those of ``put_row``.
+
+        Return: An instance of the tablestore.metadata.PreparedPutRow class, it is executed by ``execute_put_row``.
+
+        Example:
+
+            prepared = client.prepare_put_row('myTable', Condition('EXPECT_NOT_EXIST'))
+        """
+        return self.protocol.encoder.encode_prepared_put_row(table_name, condition, return_type)
+
+    @staticmethod
+    def _timeseries_meta_cache_key(request):
+        return (request.timeseriesTableName, canonicalize_meta_condition(request.condition),
+                bool(request.getTotalHits), request.limit, request.nextToken)
+
+    def _is_row_cacheable(self, column_filter, time_range, start_column, end_column, token, transaction_id):
+        # only the plain reads of whole rows out of transactions are cached
+        return (self.row_cache is not None and column_filter is None and time_range is None and start_column is None
+                and end_column is None and token is None and transaction_id is None)
+
+    def _invalidate_rows(self, table_name, primary_keys, transaction_id=None):
+        if self.row_cache is None:
+            return
+        for primary_key in primary_keys:
+            if isinstance(primary_key, list):
+                self.row_cache.invalidate(table_name, primary_key, transaction_id)
+
+    def _invalidate_batch_write_rows(self, request):
+        for table_name, table_item in request.items.items():
+            self._invalidate_rows(table_name, [row_item.row.primary_key for row_item in table_item.row_items],
+                                  request.transaction_id)
+
+    def _split_batch_get_row(self, request):
+        # Return the cached rows of every table by the index of the primary key, and the request of the other rows.
+        cached_rows = {}
+        missing_request = BatchGetRowRequest()
+        for table_name, table_item in request.items.items():
+            if not self._is_row_cacheable(table_item.column_filter, table_item.time_range, table_item.start_column,
+                                          table_item.end_column, table_item.token, None):
+                missing_request.add(table_item)
+                continue
+            hits = cached_rows[table_name] = {}
+            missing_primary_keys = []
+            for index, primary_key in enumerate(table_item.primary_keys):
+                found, row = self.row_cache.get(table_name, primary_key, table_item.columns_to_get,
+                                                table_item.max_version)
+                if found:
+                    hits[index] = row
+                else:
+                    missing_primary_keys.append(primary_key)
+            if missing_primary_keys:
+                missing_item = copy.copy(table_item)
+                missing_item.primary_keys = missing_primary_keys
+                missing_request.add(missing_item)
+        return cached_rows, missing_request
+
+    def _merge_batch_get_row(self, request, cached_rows, response, version):
+        table_rows = {}
+        for table_name, table_item in request.items.items():
+            hits = cached_rows.get(table_name)
+            if hits is None:
+                table_rows[table_name] = response.get(table_name, [])
+                continue
+            received = iter(response.get(table_name, []))
+            items = table_rows[table_name] = []
+            for index, primary_key in enumerate(table_item.primary_keys):
+                if index in hits:
+                    item = RowDataItem(True, None, None, table_name, CapacityUnit(0, 0), None, None)
+                    item.row = hits[index]
+                else:
+                    item = next(received, None)
+                    if item is None:
+                        raise OTSClientError("The result of row is missing in BatchGetRow response.")
+                    if item.is_ok:
+                        self.row_cache.put(table_name, primary_key, table_item.columns_to_get,
+                                           table_item.max_version, item.row, version)
+                items.append(item)
+        return table_rows
+
+    def _single_flight_key(self, api_name, req_body, decode_options):
+        # Return the key of the request to share with the concurrent requests, or None if it is not shared.
+        if self.single_flight is None or not RetryUtil.is_repeatable_api(api_name):
+            return None
+        return api_name, req_body, tuple(sorted(decode_options.items())) if decode_options else None
+
+    @staticmethod
+    def _decode_options(**options):
+        # the options which are not the default are passed to the decoder of the response
+        options = dict((key, value) for key, value in options.items() if value)
+        return options or None
+
 class OTSClient(BaseOTSClient):
     """
     `OTSClient` implements all the interfaces of the OTS service. Users can create an instance of `OTSClient` and call its
@@ -175,6 +374,26 @@ class OTSClient(BaseOTSClient):
 
     def __init__(self, end_point, access_key_id=None, access_key_secret=None, instance_name=None,
                  credentials_provider: CredentialsProvider = None, region: str = None, **kwargs):
+        """
+        Initialize an ``OTSClient`` instance.
+
+        Besides the init parameters of BaseOTSClient, the following parameters of the connection pool are available:
+
+        ``connection_warm_up`` is the number of connections opened when the client is created, so that the first requests do not wait for the TCP and TLS handshakes. The default is 0.
+                               A failure of the warm-up is logged and does not fail the creation of the client.
+
+        ``connection_idle_timeout`` is the time in seconds after which an idle connection is closed instead of reused, it should be less than the idle timeout of the server. The default is None, which keeps the idle connections.
+
+        ``connection_keepalive_interval`` enables the TCP keep-alive probes of the connections at this interval in seconds, and a background thread which
+                                          closes the connections idle for ``connection_idle_timeout`` and reopens ``connection_warm_up`` connections at the same interval. The default is None.
+
+        ``tls_session_resumption`` specifies whether the new https connections resume the TLS session of the previous connection. The default is False.
+
+        The state of the connections is returned by ``client.connection.stats()``.
+
+        ``transport`` is an instance of tablestore.transport.Transport which sends the requests in place of the connection pool, e.g. tablestore.transport.HttpxTransport for HTTP/2.
+                      The parameters of the connection pool are not used with it, and it is not closed by the client so that it can be shared by clients of the same endpoint.
+        """
         super().__init__(
             end_point=end_point,
             access_key_id=access_key_id,
@@ -184,16 +403,52 @@ class OTSClient(BaseOTSClient):
             region=region,
             **kwargs,
         )
-        self.connection = ConnectionPool(
-            self.host, self.path, timeout=self.socket_timeout, maxsize=self.max_connection, client_ssl_version=self.ssl_version
-        )
+        self.transport = kwargs.get('transport')
+        if self.transport is not None:
+            self.connection = self.transport
+        else:
+            self.connection = ConnectionPool(
+                self.host, self.path, timeout=self.socket_timeout, maxsize=self.max_connection, client_ssl_version=self.ssl_version,
+                idle_timeout=kwargs.get('connection_idle_timeout'),
+                keepalive_interval=kwargs.get('connection_keepalive_interval'),
+                warm_up=kwargs.get('connection_warm_up', 0),
+                tls_session_resumption=kwargs.get('tls_session_resumption', False),
+                logger=self.logger
+            )
+            if self.connection.warm_up_connections:
+                try:
+                    self.connection.warm_up()
+                except Exception as e:
+                    self.logger.warning("Failed to warm up the connections to %s: %s" % (self.host, e))
+        self.single_flight = SingleFlight() if self.coalesce_requests else None
+
+    def close(self):
+        """
+        Description: Closes the connections of the client and stops the keep-alive thread of the connection pool.
+        A transport passed by the ``transport`` parameter is not closed.
+        """
+        if self.transport is None:
+            self.connection.close()
+
+    def __enter__(self):
+        return self
 
-    def _request_helper(self, api_name, *args, **kwargs):
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _request_helper(self, api_name, *args, decode_options=None, **kwargs):
         # Generate signing key, each request generate once
         # Must generate before making request headers
         self._signer.gen_signing_key()
         query, req_headers, req_body = self.protocol.make_request(api_name, self._signer, *args, **kwargs)
 
+        single_flight_key = self._single_flight_key(api_name, req_body, decode_options)
+        if single_flight_key is not None:
+            return self.single_flight.do(single_flight_key, lambda: self._send_request(
+                api_name, query, req_headers, req_body, decode_options))
+        return self._send_request(api_name, query, req_headers, req_body, decode_options)
+
+    def _send_request(self, api_name, query, req_headers, req_body, decode_options):
         retry_times = 0
         while True:
             try:
@@ -208,7 +463,7 @@ class OTSClient(BaseOTSClient):
                 else:
                     raise e
 
-        return self.protocol.parse_response(api_name, status, res_headers, res_body)
+        return self.protocol.parse_response(api_name, status, res_headers, res_body, decode_options)
 
     def create_table(self, table_meta, table_options, reserved_throughput, secondary_indexes=None):
         """
@@ -319,6 +574,11 @@ class OTSClient(BaseOTSClient):
         ``max_version`` is an optional parameter, indicating the maximum number of versions to read.
         ``time_range`` is an optional parameter, indicating the version range or specific version to read, and at least one of ``time_range`` or ``max_version`` must be provided.
 
+        When the client is created with ``row_cache_size``, the rows read without ``column_filter``, ``time_range``, wide row parameters and ``transaction_id``
+        are cached by the table, primary key, ``columns_to_get`` and ``max_version``, and the rows written by this client are removed from the cache.
+        A cached row is returned with a consumed CapacityUnit of 0, it is shared by the callers and should not be modified.
+        The hits and misses are in ``client.row_cache.stats()``.
+
         Return: The consumed CapacityUnit for this operation, primary key columns, and attribute columns.
 
         ``consumed`` indicates the consumed CapacityUnit, which is an instance of the tablestore.metadata.CapacityUnit class.
@@ -332,11 +592,48 @@ class OTSClient(BaseOTSClient):
             consumed, return_row, next_token = client.get_row('myTable', primary_key, columns_to_get)
         """
 
-        return self._request_helper(
+        return self._get_row(table_name, primary_key, columns_to_get, column_filter, max_version, time_range,
+                             start_column, end_column, token, transaction_id)
+
+    def execute_get_row(self, prepared, primary_key, transaction_id=None):
+        """
+        Description: Get a single row of data by a GetRow request prepared by ``prepare_get_row``.
+        Only the primary key and ``transaction_id`` are encoded, the other parts of the request are reused.
+
+        ``prepared`` is an instance of the tablestore.metadata.PreparedGetRow class.
+        ``primary_key`` and ``transaction_id`` are the same as those of ``get_row``.
+
+        Return: The same as ``get_row``.
+
+        Example:
+
+            prepared = client.prepare_get_row('myTable', ['name', 'address', 'age'])
+            consumed, return_row, next_token = client.execute_get_row(prepared, [('gid', 1), ('uid', 101)])
+        """
+        return self._get_row(prepared.table_name, primary_key, prepared.columns_to_get, prepared.column_filter,
+                             prepared.max_version, None, None, None, None, transaction_id, prepared)
+
+    def _get_row(self, table_name, primary_key, columns_to_get, column_filter, max_version, time_range,
+                 start_column, end_column, token, transaction_id, prepared=None):
+        if not self._is_row_cacheable(column_filter, time_range, start_column, end_column, token, transaction_id):
+            return self._request_helper(
+                'GetRow', table_name, primary_key, columns_to_get,
+                column_filter, max_version, time_range,
+                start_column, end_column, token, transaction_id, prepared=prepared
+            )
+
+        found, cached = self.row_cache.get(table_name, primary_key, columns_to_get, max_version)
+        if found:
+            return CapacityUnit(0, 0), cached, b''
+        version = self.row_cache.version
+        consumed, return_row, next_token = self._request_helper(
             'GetRow', table_name, primary_key, columns_to_get,
             column_filter, max_version, time_range,
-            start_column, end_column, token, transaction_id
+            start_column, end_column, token, transaction_id, prepared=prepared
         )
+        if not next_token:
+            self.row_cache.put(table_name, primary_key, columns_to_get, max_version, return_row, version)
+        return consumed, return_row, next_token
 
     def put_row(self, table_name, row, condition=None, return_type=None, transaction_id=None):
         """
@@ -362,9 +659,35 @@ class OTSClient(BaseOTSClient):
             consumed, return_row = client.put_row('myTable', row, condition)
         """
 
-        return self._request_helper(
-            'PutRow', table_name, row, condition, return_type, transaction_id
-        )
+        try:
+            return self._request_helper(
+                'PutRow', table_name, row, condition, return_type, transaction_id
+            )
+        finally:
+            self._invalidate_rows(table_name, [row.primary_key], transaction_id)
+
+    def execute_put_row(self, prepared, row, transaction_id=None):
+        """
+        Description: Write a row of data by a PutRow request prepared by ``prepare_put_row``.
+        Only the row and ``transaction_id`` are encoded, the other parts of the request are reused.
+
+        ``prepared`` is an instance of the tablestore.metadata.PreparedPutRow class.
+        ``row`` and ``transaction_id`` are the same as those of ``put_row``.
+
+        Return: The same as ``put_row``.
+
+        Example:
+
+            prepared = client.prepare_put_row('myTable', Condition('EXPECT_NOT_EXIST'))
+            consumed, return_row = client.execute_put_row(prepared, Row([('gid', 1), ('uid', 101)], [('age', 20)]))
+        """
+        try:
+            return self._request_helper(
+                'PutRow', prepared.table_name, row, prepared.condition, prepared.return_type, transaction_id,
+                prepared=prepared
+            )
+        finally:
+            self._invalidate_rows(prepared.table_name, [row.primary_key], transaction_id)
 
     def update_row(self, table_name, row, condition, return_type=None, transaction_id=None):
         """
@@ -395,9 +718,12 @@ class OTSClient(BaseOTSClient):
             consumed = client.update_row('myTable', row, condition)
         """
 
-        return self._request_helper(
-            'UpdateRow', table_name, row, condition, return_type, transaction_id
-        )
+        try:
+            return self._request_helper(
+                'UpdateRow', table_name, row, condition, return_type, transaction_id
+            )
+        finally:
+            self._invalidate_rows(table_name, [row.primary_key], transaction_id)
 
     def delete_row(self, table_name, row=None, condition=None, return_type=None, transaction_id=None, **kwargs):
         """
@@ -428,15 +754,19 @@ class OTSClient(BaseOTSClient):
         # When passing Row as a parameter, extract the primary_key
         if isinstance(primary_key, Row):
             primary_key = primary_key.primary_key
-        return self._request_helper(
-            'DeleteRow', table_name, primary_key, condition, return_type, transaction_id
-        )
+        try:
+            return self._request_helper(
+                'DeleteRow', table_name, primary_key, condition, return_type, transaction_id
+            )
+        finally:
+            self._invalidate_rows(table_name, [primary_key], transaction_id)
 
-    def exe_sql_query(self, query):
+    def exe_sql_query(self, query, columnar=False):
         """
         Description: Executes an SQL query.
 
         ``query`` is the query to be executed.
+        ``columnar`` is an optional parameter. When it is True, the rows are returned by columns as numpy arrays instead of Row objects.
         
         (rows, table_capacity_units, search_capacity_units)
 
@@ -444,15 +774,18 @@ class OTSClient(BaseOTSClient):
         ``table_capacity_units``  The CapacityUnit consumed for each table by this operation
         ``search_capacity_units`` The CapacityUnit consumed for each search by this operation
         ``rows``                  The returned data
+                                  When ``columnar`` is True, it is a dict from the column name to (values, is_null) in the order of the columns,
+                                  where ``values`` and ``is_null`` are numpy arrays of the same length, and ``values`` is undefined where ``is_null`` is True.
+                                  The LONG, BOOLEAN and DOUBLE arrays are read only views of the response, the STRING and BINARY arrays have the dtype object.
         
         Example:
         row_list, table_consume_list, search_consume_list = client.exe_sql_query(query)
         """
         return self._request_helper(
-            'SQLQuery', query
+            'SQLQuery', query, decode_options=self._decode_options(columnar=columnar)
         )
 
-    def batch_get_row(self, request):
+    def batch_get_row(self, request, lazy_rows=False):
         """
         Description: Batch retrieve multiple rows of data.
         request = BatchGetRowRequest()
@@ -465,6 +798,8 @@ class OTSClient(BaseOTSClient):
         response = client.batch_get_row(request)
 
         ``response`` is the returned result, of type tablestore.metadata.BatchGetRowResponse
+        ``lazy_rows`` is an optional parameter. When it is True, the row of every item is a tablestore.LazyRow, whose attribute columns are decoded when they are accessed.
+        When the client is created with ``row_cache_size``, the rows are cached the same as ``get_row``, and only the rows which are not cached are requested.
 
         Example:
             cond = CompositeColumnCondition(LogicalOperator.AND)
@@ -491,8 +826,18 @@ class OTSClient(BaseOTSClient):
             table0 = result.get_result_by_table('myTable0')
             table1 = result.get_result_by_table('myTable1')
         """
-        response = self._request_helper('BatchGetRow', request)
-        return BatchGetRowResponse(response)
+        if self.row_cache is None:
+            response = self._request_helper('BatchGetRow', request, decode_options=self._decode_options(lazy_rows=lazy_rows))
+            return BatchGetRowResponse(response)
+
+        cached_rows, missing_request = self._split_batch_get_row(request)
+        version = self.row_cache.version
+        response = {}
+        if missing_request.items:
+            response = self._request_helper(
+                'BatchGetRow', missing_request, decode_options=self._decode_options(lazy_rows=lazy_rows)
+            )
+        return BatchGetRowResponse(self._merge_batch_get_row(request, cached_rows, response, version))
 
     def batch_write_row(self, request):
         """
@@ -534,7 +879,10 @@ class OTSClient(BaseOTSClient):
 
         """
 
-        response = self._request_helper('BatchWriteRow', request)
+        try:
+            response = self._request_helper('BatchWriteRow', request)
+        finally:
+            self._invalidate_batch_write_rows(request)
 
         return BatchWriteRowResponse(request, response)
 
@@ -549,7 +897,8 @@ class OTSClient(BaseOTSClient):
                   start_column=None,
                   end_column=None,
                   token=None,
-                  transaction_id=None):
+                  transaction_id=None,
+                  lazy_rows=False):
         """
         Description: Retrieve multiple rows of data based on range conditions.
 
@@ -565,6 +914,7 @@ class OTSClient(BaseOTSClient):
         ``start_column`` is an optional parameter used for wide row reading, indicating the starting column for this read operation.
         ``end_column`` is an optional parameter used for wide row reading, indicating the ending column for this read operation.
         ``token`` is an optional parameter used for wide row reading, indicating the starting column position for this read operation. It is binary-encoded and originates from the result of the previous request.
+        ``lazy_rows`` is an optional parameter. When it is True, the rows are tablestore.LazyRow, only the primary keys are decoded before returning, and the attribute columns are decoded when they are accessed.
 
         Returns: A list of results that meet the specified conditions.
 
@@ -592,7 +942,7 @@ class OTSClient(BaseOTSClient):
             column_filter, max_version,
             time_range, start_column,
             end_column, token,
-            transaction_id
+            transaction_id, decode_options=self._decode_options(lazy_rows=lazy_rows)
         )
 
     def xget_range(self, table_name, direction,
@@ -606,7 +956,9 @@ class OTSClient(BaseOTSClient):
                    time_range=None,
                    start_column=None,
                    end_column=None,
-                   token=None):
+                   token=None,
+                   prefetch_depth=0,
+                   lazy_rows=False):
         """
         Description: Retrieve multiple rows of data based on range conditions, iterator version.
 
@@ -623,6 +975,8 @@ class OTSClient(BaseOTSClient):
         ``start_column`` is an optional parameter, used for wide row reading, indicating the starting column for this read.
         ``end_column`` is an optional parameter, used for wide row reading, indicating the ending column for this read.
         ``token`` is an optional parameter, used for wide row reading, indicating the starting column position for this read. The content is encoded in binary and originates from the result of the previous request.
+        ``prefetch_depth`` is an optional parameter, indicating the number of pages fetched ahead in the background while the current page is being iterated. The default is 0, which disables prefetching.
+        ``lazy_rows`` is an optional parameter. When it is True, the rows are tablestore.LazyRow, the same as ``get_range``.
 
         Return: A list of results that meet the conditions.
 
@@ -656,8 +1010,36 @@ class OTSClient(BaseOTSClient):
                 raise OTSClientError("the value of count must be larger than 0")
             left_count = count
 
+        if prefetch_depth < 0:
+            raise OTSClientError("the value of prefetch_depth must not be negative")
+
         consumed_counter.read = 0
         consumed_counter.write = 0
+        pages = self._iter_range_pages(
+            table_name, direction,
+            inclusive_start_primary_key, exclusive_end_primary_key,
+            columns_to_get, left_count, column_filter,
+            max_version, time_range, start_column,
+            end_column, token, lazy_rows
+        )
+        if prefetch_depth > 0:
+            pages = prefetch_iterator(pages, prefetch_depth)
+        for consumed, row_list in pages:
+            consumed_counter.read += consumed.read
+            for row in row_list:
+                yield row
+                if left_count is not None:
+                    left_count -= 1
+                    if left_count <= 0:
+                        return
+
+    def _iter_range_pages(self, table_name, direction,
+                          inclusive_start_primary_key, exclusive_end_primary_key,
+                          columns_to_get, left_count, column_filter,
+                          max_version, time_range, start_column,
+                          end_column, token, lazy_rows=False):
+        # The limit of the next page only depends on the size of the current page,
+        # so the pages can be requested before the rows are consumed.
         next_start_pk = inclusive_start_primary_key
         while next_start_pk:
             consumed, next_start_pk, row_list, next_token = self.get_range(
@@ -665,15 +1047,103 @@ class OTSClient(BaseOTSClient):
                 next_start_pk, exclusive_end_primary_key,
                 columns_to_get, left_count, column_filter,
                 max_version, time_range, start_column,
-                end_column, token
+                end_column, token, None, lazy_rows
+            )
+            yield consumed, row_list
+            if left_count is not None:
+                left_count -= len(row_list)
+                if left_count <= 0:
+                    return
+
+    def compute_split_points_by_size(self, table_name, split_size, split_size_unit_in_byte=None):
+        """
+        Description: Split the table into ranges of about ``split_size`` data, the split points are sampled by the server.
+
+        ``table_name`` is the corresponding table name.
+        ``split_size`` is the approximate data size of each split, in the unit of 100MB by default.
+        ``split_size_unit_in_byte`` is an optional parameter, indicating the unit of ``split_size`` in bytes.
+
+        Return: The consumed CapacityUnit, the primary key schema and the split points.
+
+        ``consumed`` indicates the consumed CapacityUnit, which is an instance of the tablestore.metadata.CapacityUnit class.
+        ``schema`` indicates the primary key schema of the table, such as [('gid', 'INTEGER'), ('uid', 'INTEGER')].
+        ``split_points`` indicates the primary keys between splits in increasing order, the tailing INF_MIN columns are omitted.
+
+        Example:
+
+            consumed, schema, split_points = client.compute_split_points_by_size('myTable', 1)
+        """
+
+        return self._request_helper('ComputeSplitPointsBySize', table_name, split_size, split_size_unit_in_byte)
+
+    def parallel_xget_range(self, table_name, direction,
+                            inclusive_start_primary_key,
+                            exclusive_end_primary_key,
+                            consumed_counter,
+                            columns_to_get=None,
+                            column_filter=None,
+                            max_version=1,
+                            time_range=None,
+                            split_points=None,
+                            split_size=1,
+                            max_concurrency=None,
+                            ordered=True):
+        """
+        Description: Retrieve multiple rows of data based on range conditions, the range is split into sub-ranges which are scanned concurrently.
+
+        ``table_name``, ``direction``, ``inclusive_start_primary_key``, ``exclusive_end_primary_key``, ``consumed_counter``,
+        ``columns_to_get``, ``column_filter``, ``max_version`` and ``time_range`` are the same as in xget_range.
+        ``consumed_counter`` sums the CapacityUnit consumed by all sub-ranges.
+        ``split_points`` is an optional parameter, indicating the full primary keys at which the range is split. If not specified,
+        the split points are sampled by compute_split_points_by_size.
+        ``split_size`` is an optional parameter, indicating the split size passed to compute_split_points_by_size, in the unit of 100MB.
+        ``max_concurrency`` is an optional parameter, indicating the maximum number of GetRange requests in flight. The default is 8.
+        ``ordered`` is an optional parameter, if True the rows are returned in the order of primary key, otherwise in the order they arrive.
+
+        Return: An iterator of rows, the same as xget_range.
+
+        Example:
+
+            consumed_counter = CapacityUnit(0, 0)
+            inclusive_start_primary_key = [('gid',INF_MIN), ('uid',INF_MIN)]
+            exclusive_end_primary_key = [('gid',INF_MAX), ('uid',INF_MAX)]
+            range_iterator = client.parallel_xget_range(
+                        'myTable', Direction.FORWARD,
+                        inclusive_start_primary_key, exclusive_end_primary_key,
+                        consumed_counter, max_concurrency=16, ordered=False
             )
+            for row in range_iterator:
+               pass
+        """
+
+        if not isinstance(consumed_counter, CapacityUnit):
+            raise OTSClientError(
+                "consumed_counter should be an instance of CapacityUnit, not %s" % (
+                    consumed_counter.__class__.__name__)
+            )
+        if max_concurrency is None:
+            max_concurrency = self.DEFAULT_SCAN_CONCURRENCY
+        if max_concurrency <= 0:
+            raise OTSClientError("the value of max_concurrency must be larger than 0")
+
+        consumed_counter.read = 0
+        consumed_counter.write = 0
+        if split_points is None:
+            consumed, schema, points = self.compute_split_points_by_size(table_name, split_size)
             consumed_counter.read += consumed.read
-            for row in row_list:
-                yield row
-                if left_count is not None:
-                    left_count -= 1
-                    if left_count <= 0:
-                        return
+            split_points = [complete_split_point(point, schema) for point in points]
+        ranges = make_scan_ranges(direction, inclusive_start_primary_key, exclusive_end_primary_key, split_points)
+
+        def get_range(start_primary_key, end_primary_key):
+            return self.get_range(
+                table_name, direction,
+                start_primary_key, end_primary_key,
+                columns_to_get, None, column_filter,
+                max_version, time_range
+            )
+
+        for row in iter_ranges_in_parallel(get_range, ranges, consumed_counter, max_concurrency, ordered):
+            yield row
 
     def list_search_index(self, table_name=None):
         """
@@ -776,8 +1246,8 @@ class OTSClient(BaseOTSClient):
         :type index_name: str
         :param index_name: The name of the index.
 
-        :type search_query: tablestore.metadata.SearchQuery
-        :param search_query: The query to perform.
+        :type search_query: tablestore.metadata.SearchQuery or tablestore.metadata.PreparedSearchQuery
+        :param search_query: The query to perform, see ``prepare_search_query`` for the PreparedSearchQuery.
 
         :type columns_to_get: tablestore.metadata.ColumnsToGet
         :param columns_to_get: Columns to return.
@@ -925,7 +1395,11 @@ class OTSClient(BaseOTSClient):
             client.commit_transaction(transaction_id)
         """
 
-        return self._request_helper('CommitTransaction', transaction_id)
+        try:
+            return self._request_helper('CommitTransaction', transaction_id)
+        finally:
+            if self.row_cache is not None:
+                self.row_cache.finish_transaction(transaction_id)
 
     def abort_transaction(self, transaction_id):
         """
@@ -938,12 +1412,35 @@ class OTSClient(BaseOTSClient):
             client.abort_transaction(transaction_id)
         """
 
-        return self._request_helper('AbortTransaction', transaction_id)
+        try:
+            return self._request_helper('AbortTransaction', transaction_id)
+        finally:
+            if self.row_cache is not None:
+                self.row_cache.finish_transaction(transaction_id)
 
     def put_timeseries_data(self, timeseriesTableName: str, timeseriesRows: TimeseriesRow) -> PutTimeseriesDataResponse:
 
         return self._request_helper('PutTimeseriesData', timeseriesTableName, timeseriesRows)
 
+    def put_timeseries_columns(self, timeseries_table_name, timeseries_key, timestamps, fields) -> PutTimeseriesDataResponse:
+        """
+        Description: Writes the points of one timeseries from columns, without creating a TimeseriesRow for each point.
+
+        ``timeseries_table_name`` is the name of the timeseries table.
+        ``timeseries_key`` is the TimeseriesKey of all the points.
+        ``timestamps`` is the time in microseconds of each point.
+        ``fields`` is a dict from the field name to the values of each point, which have the same length as ``timestamps``.
+        The arrays can be numpy arrays, array.array or lists. The integer, float and bool arrays are written as LONG, DOUBLE and BOOLEAN fields.
+
+        Returns: PutTimeseriesDataResponse. The index of a failed row is the index of the point in ``timestamps``.
+
+        Example:
+        client.put_timeseries_columns('table', TimeseriesKey('cpu', 'host1', {'region': 'hz'}),
+                                      numpy.arange(1000) + start_in_us, {'usage': usage_array})
+        """
+        return self._request_helper('PutTimeseriesData', timeseries_table_name, None,
+                                    timeseries_columns=(timeseries_key, timestamps, fields))
+
     def create_timeseries_table(self, request: CreateTimeseriesTableRequest):
         return self._request_helper('CreateTimeseriesTable', request)
 
@@ -951,7 +1448,10 @@ class OTSClient(BaseOTSClient):
         return self._request_helper('ListTimeseriesTable')
 
     def delete_timeseries_table(self, timeseries_table_name: str):
-        return self._request_helper('DeleteTimeseriesTable', timeseries_table_name)
+        try:
+            return self._request_helper('DeleteTimeseriesTable', timeseries_table_name)
+        finally:
+            self.invalidate_timeseries_meta_cache(timeseries_table_name)
 
     def describe_timeseries_table(self, timeseries_table_name: str) -> DescribeTimeseriesTableResponse:
         return self._request_helper('DescribeTimeseriesTable', timeseries_table_name)
@@ -960,21 +1460,95 @@ class OTSClient(BaseOTSClient):
         return self._request_helper('UpdateTimeseriesTable', timeseries_meta)
 
     def update_timeseries_meta(self, request: UpdateTimeseriesMetaRequest) -> UpdateTimeseriesMetaResponse:
-        return self._request_helper('UpdateTimeseriesMeta', request)
+        try:
+            return self._request_helper('UpdateTimeseriesMeta', request)
+        finally:
+            self.invalidate_timeseries_meta_cache(request.timeseries_tablename)
 
     def delete_timeseries_meta(self, request: DeleteTimeseriesMetaRequest) -> DeleteTimeseriesMetaResponse:
-        return self._request_helper('DeleteTimeseriesMeta', request)
+        try:
+            return self._request_helper('DeleteTimeseriesMeta', request)
+        finally:
+            self.invalidate_timeseries_meta_cache(request.timeseries_tablename)
 
     def query_timeseries_meta(self, request: QueryTimeseriesMetaRequest) -> QueryTimeseriesMetaResponse:
-        return self._request_helper('QueryTimeseriesMeta', request)
+        """
+        Description: Queries the metas of the timeseries which match ``request.condition``.
 
-    def get_timeseries_data(self, request: GetTimeseriesDataRequest) -> GetTimeseriesDataResponse:
-        return self._request_helper('GetTimeseriesData', request)
+        When the client is created with ``timeseries_meta_cache_size``, the responses are cached by the table, the canonical form of the condition,
+        ``getTotalHits``, ``limit`` and ``nextToken``, and the cached response is returned until it expires or is invalidated.
+        The cached responses are shared by the callers and should not be modified. The hits and misses are in ``client.timeseries_meta_cache.stats()``.
+
+        Returns: QueryTimeseriesMetaResponse.
+        """
+        if self.timeseries_meta_cache is None:
+            return self._request_helper('QueryTimeseriesMeta', request)
+
+        key = self._timeseries_meta_cache_key(request)
+        response = self.timeseries_meta_cache.get(key)
+        if response is None:
+            version = self._timeseries_meta_cache_version
+            response = self._request_helper('QueryTimeseriesMeta', request)
+            if version == self._timeseries_meta_cache_version:
+                self.timeseries_meta_cache.put(key, response)
+        return response
+
+    def get_timeseries_data(self, request: GetTimeseriesDataRequest, columnar=False) -> GetTimeseriesDataResponse:
+        """
+        Description: Reads the points of one timeseries, one page at a time.
+
+        ``request`` is a GetTimeseriesDataRequest, the next page is read by setting ``request.nextToken`` to ``nextToken`` of the response.
+        ``columnar`` is an optional parameter. When it is True, ``rows`` of the response is (times, fields) instead of a list of TimeseriesRow,
+        where ``times`` is an int64 numpy array of the time in microseconds, and ``fields`` is an OrderedDict from the field name to (values, is_null),
+        the same as the columnar result of ``exe_sql_query``. The LONG, DOUBLE and BOOLEAN fields are int64, float64 and bool arrays.
+
+        Returns: GetTimeseriesDataResponse.
+        """
+        return self._request_helper(
+            'GetTimeseriesData', request, decode_options=self._decode_options(columnar=columnar)
+        )
+
+    def xget_timeseries_data(self, request: GetTimeseriesDataRequest, prefetch_depth=1, columnar=False):
+        """
+        Description: Reads the points of one timeseries, iterator version. The pages are read one after another by ``nextToken``.
+
+        ``request`` is a GetTimeseriesDataRequest, ``request.limit`` is the number of points of each page. The request is not modified.
+        ``prefetch_depth`` is an optional parameter, indicating the number of pages fetched ahead in the background while the current page is being iterated. The default is 1, 0 disables prefetching.
+        ``columnar`` is an optional parameter. When it is False, the iterator yields TimeseriesRow. When it is True, it yields (times, fields) for each page, the same as ``rows`` of ``get_timeseries_data`` with ``columnar``.
+
+        Example:
+
+            request = GetTimeseriesDataRequest('table', TimeseriesKey('cpu', 'host1', {'region': 'hz'}), begin_in_us, end_in_us)
+            for times, fields in client.xget_timeseries_data(request, columnar=True):
+                usage, is_null = fields['usage']
+        """
+        if prefetch_depth < 0:
+            raise OTSClientError("the value of prefetch_depth must not be negative")
+
+        pages = self._iter_timeseries_data_pages(request, columnar)
+        if prefetch_depth > 0:
+            pages = prefetch_iterator(pages, prefetch_depth)
+        for response in pages:
+            if not columnar:
+                for row in response.rows or []:
+                    yield row
+            elif len(response.rows[0]) != 0:
+                yield response.rows
+
+    def _iter_timeseries_data_pages(self, request, columnar):
+        request = copy.copy(request)
+        while True:
+            response = self.get_timeseries_data(request, columnar)
+            yield response
+            if not response.nextToken:
+                return
+            request.nextToken = response.nextToken
 
 
 class AsyncOTSClient(BaseOTSClient):
 
     DEFAULT_KEEPALIVE_TIMEOUT = 12
+    DEFAULT_DNS_CACHE_TTL = 10
 
     def __init__(self, end_point, access_key_id=None, access_key_secret=None, instance_name=None,
                  credentials_provider: CredentialsProvider = None, region: str = None, **kwargs):
@@ -991,6 +1565,18 @@ class AsyncOTSClient(BaseOTSClient):
                            If tuple or list, the format is (conn_timeout, read_timeout). The default value is 50.
 
         ``ssl_version`` defines the minimum TLS version used for https connections. The default is None.
+
+        ``max_connection`` is the maximum number of connections in total. The default is 50.
+
+        ``max_connection_per_host`` is the maximum number of connections to one host. The default is 0, which is no limit.
+
+        ``dns_cache_ttl`` is the time in seconds that the resolved addresses of a host are cached, None caches them forever. The default is 10.
+
+        ``share_connection_pool`` specifies whether the client uses the connection pool shared by the clients of the same endpoint and connection settings in the event loop,
+                                  e.g. the clients of the tenants with different credentials. The shared pool is closed when all the clients using it are closed. The default is False.
+
+        ``transport`` is an instance of tablestore.transport.AsyncTransport which sends the requests in place of the connection pool, e.g. tablestore.transport.AsyncHttpxTransport for HTTP/2.
+                      The parameters of the connection pool are not used with it, and it is not closed by the client so that it can be shared by clients of the same endpoint.
         """
         super().__init__(
             end_point=end_point,
@@ -1004,24 +1590,41 @@ class AsyncOTSClient(BaseOTSClient):
 
         self.keepalive_timeout = kwargs.get('keepalive_timeout', self.DEFAULT_KEEPALIVE_TIMEOUT)
         self.force_close = kwargs.get('force_close', False)
+        self.max_connection_per_host = kwargs.get('max_connection_per_host', 0)
+        self.dns_cache_ttl = kwargs.get('dns_cache_ttl', self.DEFAULT_DNS_CACHE_TTL)
+        self.share_connection_pool = kwargs.get('share_connection_pool', False)
         self._connection = None
+        self.transport = kwargs.get('transport')
+        self.single_flight = AsyncSingleFlight() if self.coalesce_requests else None
 
     def _get_or_create_connection(self):
+        if self.transport is not None:
+            return self.transport
+        # the connection pool is bound to the event loop where it is created
+        if self._connection is not None and self._connection.loop is not asyncio.get_running_loop():
+            self._connection.detach()
+            self._connection = None
         if self._connection is None:
-            self._connection = AsyncConnectionPool(
-                self.host, self.path,
+            settings = dict(
                 timeout=self.socket_timeout,
                 maxsize=self.max_connection,
                 keepalive_timeout=self.keepalive_timeout,
                 force_close=self.force_close,
-                client_ssl_version=self.ssl_version
+                client_ssl_version=self.ssl_version,
+                limit_per_host=self.max_connection_per_host,
+                ttl_dns_cache=self.dns_cache_ttl
             )
+            if self.share_connection_pool:
+                self._connection = AsyncConnectionPool.acquire_shared(self.host, self.path, **settings)
+            else:
+                self._connection = AsyncConnectionPool(self.host, self.path, **settings)
         return self._connection
 
     async def close(self):
         connection = self._connection # prevent concurrency issues in coroutines, if after close, set this value to None, other coroutine may get a closed connection
         self._connection = None
-        await connection.close()
+        if connection is not None:
+            await connection.release()
 
     async def __aenter__(self):
         return self
@@ -1029,14 +1632,21 @@ class AsyncOTSClient(BaseOTSClient):
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         await self.close()
 
-    async def _request_helper(self, api_name, *args, **kwargs):
+    async def _request_helper(self, api_name, *args, decode_options=None, **kwargs):
         # Generate signing key, each request generate once
         # Must generate before making request headers
-        connection = self._get_or_create_connection()
-
         self._signer.gen_signing_key()
         query, req_headers, req_body = self.protocol.make_request(api_name, self._signer, *args, **kwargs)
 
+        single_flight_key = self._single_flight_key(api_name, req_body, decode_options)
+        if single_flight_key is not None:
+            return await self.single_flight.do(single_flight_key, lambda: self._send_request(
+                api_name, query, req_headers, req_body, decode_options))
+        return await self._send_request(api_name, query, req_headers, req_body, decode_options)
+
+    async def _send_request(self, api_name, query, req_headers, req_body, decode_options):
+        connection = self._get_or_create_connection()
+
         retry_times = 0
         while True:
             try:
@@ -1051,7 +1661,7 @@ class AsyncOTSClient(BaseOTSClient):
                 else:
                     raise e
 
-        return self.protocol.parse_response(api_name, status, res_headers, res_body)
+        return self.protocol.parse_response(api_name, status, res_headers, res_body, decode_options)
 
     async def create_table(self, table_meta, table_options, reserved_throughput, secondary_indexes=None):
         """
@@ -1162,6 +1772,11 @@ class AsyncOTSClient(BaseOTSClient):
         ``max_version`` is an optional parameter, indicating the maximum number of versions to read.
         ``time_range`` is an optional parameter, indicating the version range or specific version to read, and at least one of ``time_range`` or ``max_version`` must be provided.
 
+        When the client is created with ``row_cache_size``, the rows read without ``column_filter``, ``time_range``, wide row parameters and ``transaction_id``
+        are cached by the table, primary key, ``columns_to_get`` and ``max_version``, and the rows written by this client are removed from the cache.
+        A cached row is returned with a consumed CapacityUnit of 0, it is shared by the callers and should not be modified.
+        The hits and misses are in ``client.row_cache.stats()``.
+
         Return: The consumed CapacityUnit for this operation, primary key columns, and attribute columns.
 
         ``consumed`` indicates the consumed CapacityUnit, which is an instance of the tablestore.metadata.CapacityUnit class.
@@ -1175,11 +1790,48 @@ class AsyncOTSClient(BaseOTSClient):
             consumed, return_row, next_token = await client.get_row('myTable', primary_key, columns_to_get)
         """
 
-        return await self._request_helper(
+        return await self._get_row(table_name, primary_key, columns_to_get, column_filter, max_version, time_range,
+                                   start_column, end_column, token, transaction_id)
+
+    async def execute_get_row(self, prepared, primary_key, transaction_id=None):
+        """
+        Description: Get a single row of data by a GetRow request prepared by ``prepare_get_row``.
+        Only the primary key and ``transaction_id`` are encoded, the other parts of the request are reused.
+
+        ``prepared`` is an instance of the tablestore.metadata.PreparedGetRow class.
+        ``primary_key`` and ``transaction_id`` are the same as those of ``get_row``.
+
+        Return: The same as ``get_row``.
+
+        Example:
+
+            prepared = client.prepare_get_row('myTable', ['name', 'address', 'age'])
+            consumed, return_row, next_token = await client.execute_get_row(prepared, [('gid', 1), ('uid', 101)])
+        """
+        return await self._get_row(prepared.table_name, primary_key, prepared.columns_to_get, prepared.column_filter,
+                                   prepared.max_version, None, None, None, None, transaction_id, prepared)
+
+    async def _get_row(self, table_name, primary_key, columns_to_get, column_filter, max_version, time_range,
+                       start_column, end_column, token, transaction_id, prepared=None):
+        if not self._is_row_cacheable(column_filter, time_range, start_column, end_column, token, transaction_id):
+            return await self._request_helper(
+                'GetRow', table_name, primary_key, columns_to_get,
+                column_filter, max_version, time_range,
+                start_column, end_column, token, transaction_id, prepared=prepared
+            )
+
+        found, cached = self.row_cache.get(table_name, primary_key, columns_to_get, max_version)
+        if found:
+            return CapacityUnit(0, 0), cached, b''
+        version = self.row_cache.version
+        consumed, return_row, next_token = await self._request_helper(
             'GetRow', table_name, primary_key, columns_to_get,
             column_filter, max_version, time_range,
-            start_column, end_column, token, transaction_id
+            start_column, end_column, token, transaction_id, prepared=prepared
         )
+        if not next_token:
+            self.row_cache.put(table_name, primary_key, columns_to_get, max_version, return_row, version)
+        return consumed, return_row, next_token
 
     async def put_row(self, table_name, row, condition=None, return_type=None, transaction_id=None):
         """
@@ -1205,9 +1857,35 @@ class AsyncOTSClient(BaseOTSClient):
             consumed, return_row = await client.put_row('myTable', row, condition)
         """
 
-        return await self._request_helper(
-            'PutRow', table_name, row, condition, return_type, transaction_id
-        )
+        try:
+            return await self._request_helper(
+                'PutRow', table_name, row, condition, return_type, transaction_id
+            )
+        finally:
+            self._invalidate_rows(table_name, [row.primary_key], transaction_id)
+
+    async def execute_put_row(self, prepared, row, transaction_id=None):
+        """
+        Description: Write a row of data by a PutRow request prepared by ``prepare_put_row``.
+        Only the row and ``transaction_id`` are encoded, the other parts of the request are reused.
+
+        ``prepared`` is an instance of the tablestore.metadata.PreparedPutRow class.
+        ``row`` and ``transaction_id`` are the same as those of ``put_row``.
+
+        Return: The same as ``put_row``.
+
+        Example:
+
+            prepared = client.prepare_put_row('myTable', Condition('EXPECT_NOT_EXIST'))
+            consumed, return_row = await client.execute_put_row(prepared, Row([('gid', 1), ('uid', 101)], [('age', 20)]))
+        """
+        try:
+            return await self._request_helper(
+                'PutRow', prepared.table_name, row, prepared.condition, prepared.return_type, transaction_id,
+                prepared=prepared
+            )
+        finally:
+            self._invalidate_rows(prepared.table_name, [row.primary_key], transaction_id)
 
     async def update_row(self, table_name, row, condition, return_type=None, transaction_id=None):
         """
@@ -1238,9 +1916,12 @@ class AsyncOTSClient(BaseOTSClient):
             consumed = await client.update_row('myTable', row, condition)
         """
 
-        return await self._request_helper(
-            'UpdateRow', table_name, row, condition, return_type, transaction_id
-        )
+        try:
+            return await self._request_helper(
+                'UpdateRow', table_name, row, condition, return_type, transaction_id
+            )
+        finally:
+            self._invalidate_rows(table_name, [row.primary_key], transaction_id)
 
     async def delete_row(self, table_name, row=None, condition=None, return_type=None, transaction_id=None, **kwargs):
         """
@@ -1271,15 +1952,19 @@ class AsyncOTSClient(BaseOTSClient):
         # When passing Row as a parameter, extract the primary_key
         if isinstance(primary_key, Row):
             primary_key = primary_key.primary_key
-        return await self._request_helper(
-            'DeleteRow', table_name, primary_key, condition, return_type, transaction_id
-        )
+        try:
+            return await self._request_helper(
+                'DeleteRow', table_name, primary_key, condition, return_type, transaction_id
+            )
+        finally:
+            self._invalidate_rows(table_name, [primary_key], transaction_id)
 
-    async def exe_sql_query(self, query):
+    async def exe_sql_query(self, query, columnar=False):
         """
         Description: Executes an SQL query.
 
         ``query`` is the query to be executed.
+        ``columnar`` is an optional parameter. When it is True, the rows are returned by columns as numpy arrays instead of Row objects.
 
         (rows, table_capacity_units, search_capacity_units)
 
@@ -1287,15 +1972,18 @@ class AsyncOTSClient(BaseOTSClient):
         ``table_capacity_units``  The CapacityUnit consumed for each table by this operation
         ``search_capacity_units`` The CapacityUnit consumed for each search by this operation
         ``rows``                  The returned data
+                                  When ``columnar`` is True, it is a dict from the column name to (values, is_null) in the order of the columns,
+                                  where ``values`` and ``is_null`` are numpy arrays of the same length, and ``values`` is undefined where ``is_null`` is True.
+                                  The LONG, BOOLEAN and DOUBLE arrays are read only views of the response, the STRING and BINARY arrays have the dtype object.
 
         Example:
         row_list, table_consume_list, search_consume_list = await client.exe_sql_query(query)
         """
         return await self._request_helper(
-            'SQLQuery', query
+            'SQLQuery', query, decode_options=self._decode_options(columnar=columnar)
         )
 
-    async def batch_get_row(self, request):
+    async def batch_get_row(self, request, lazy_rows=False):
         """
         Description: Batch retrieve multiple rows of data.
         request = BatchGetRowRequest()
@@ -1308,6 +1996,8 @@ class AsyncOTSClient(BaseOTSClient):
         response = await client.batch_get_row(request)
 
         ``response`` is the returned result, of type tablestore.metadata.BatchGetRowResponse
+        ``lazy_rows`` is an optional parameter. When it is True, the row of every item is a tablestore.LazyRow, whose attribute columns are decoded when they are accessed.
+        When the client is created with ``row_cache_size``, the rows are cached the same as ``get_row``, and only the rows which are not cached are requested.
 
         Example:
             cond = CompositeColumnCondition(LogicalOperator.AND)
@@ -1334,8 +2024,18 @@ class AsyncOTSClient(BaseOTSClient):
             table0 = result.get_result_by_table('myTable0')
             table1 = result.get_result_by_table('myTable1')
         """
-        response = await self._request_helper('BatchGetRow', request)
-        return BatchGetRowResponse(response)
+        if self.row_cache is None:
+            response = await self._request_helper('BatchGetRow', request, decode_options=self._decode_options(lazy_rows=lazy_rows))
+            return BatchGetRowResponse(response)
+
+        cached_rows, missing_request = self._split_batch_get_row(request)
+        version = self.row_cache.version
+        response = {}
+        if missing_request.items:
+            response = await self._request_helper(
+                'BatchGetRow', missing_request, decode_options=self._decode_options(lazy_rows=lazy_rows)
+            )
+        return BatchGetRowResponse(self._merge_batch_get_row(request, cached_rows, response, version))
 
     async def batch_write_row(self, request):
         """
@@ -1377,10 +2077,131 @@ class AsyncOTSClient(BaseOTSClient):
 
         """
 
-        response = await self._request_helper('BatchWriteRow', request)
+        try:
+            response = await self._request_helper('BatchWriteRow', request)
+        finally:
+            self._invalidate_batch_write_rows(request)
 
         return BatchWriteRowResponse(request, response)
 
+    async def get_rows_many(self, table_name, primary_keys, columns_to_get=None, column_filter=None,
+                            max_version=1, time_range=None, batch_size=None, max_concurrency=None):
+        """
+        Description: Read many rows of a table, the rows are chunked into BatchGetRow requests which are sent concurrently.
+
+        ``table_name`` is the name of the table.
+        ``primary_keys`` is a list of primary keys, such as [[('gid', 1), ('uid', 101)], [('gid', 2), ('uid', 202)]].
+        ``columns_to_get``, ``column_filter``, ``max_version`` and ``time_range`` are the same as ``TableInBatchGetRowItem``.
+        ``batch_size`` is the maximum number of rows in one BatchGetRow request, no more than 100. The default is 100.
+        ``max_concurrency`` is the maximum number of requests in flight, the default and the upper limit is ``max_connection`` of the client.
+
+        Return: A list of tablestore.metadata.RowDataItem in the order of ``primary_keys``.
+        The rows of a failed request are returned as failed items with the error code and message of the request,
+        so one failed request does not affect the others.
+
+        Example:
+
+            primary_keys = [[('gid', i), ('uid', i)] for i in range(1000)]
+            items = await client.get_rows_many('myTable', primary_keys, columns_to_get=['name'])
+            rows = [item.row for item in items if item.is_ok]
+        """
+        if batch_size is None:
+            batch_size = self.MAX_BATCH_GET_ROWS
+        if batch_size <= 0 or batch_size > self.MAX_BATCH_GET_ROWS:
+            raise OTSClientError("batch_size should be in range (0, %d]." % self.MAX_BATCH_GET_ROWS)
+        semaphore = asyncio.Semaphore(self._bulk_concurrency(max_concurrency))
+
+        async def get_chunk(chunk):
+            request = BatchGetRowRequest()
+            request.add(TableInBatchGetRowItem(table_name, chunk, columns_to_get, column_filter, max_version, time_range))
+            try:
+                async with semaphore:
+                    response = await self.batch_get_row(request)
+                items = response.get_result_by_table(table_name)
+                if items is None or len(items) != len(chunk):
+                    raise OTSClientError("The result of rows is missing in BatchGetRow response.")
+                return items
+            except OTSError as e:
+                return [RowDataItem(False, getattr(e, 'code', None), e.message, table_name, None, None, None)
+                        for _ in chunk]
+
+        chunks = [primary_keys[i:i + batch_size] for i in range(0, len(primary_keys), batch_size)]
+        results = await asyncio.gather(*[get_chunk(chunk) for chunk in chunks])
+        return [item for items in results for item in items]
+
+    async def put_rows_many(self, table_name, rows, condition=None, return_type=None,
+                            batch_size=None, max_concurrency=None):
+        """
+        Description: Write many rows into a table, the rows are chunked into BatchWriteRow requests which are sent concurrently.
+
+        ``table_name`` is the name of the table.
+        ``rows`` is a list of tablestore.metadata.Row to put.
+        ``condition`` and ``return_type`` are applied to every row, they are the same as ``PutRowItem``.
+        ``batch_size`` is the maximum number of rows in one BatchWriteRow request, no more than 200. The default is 200.
+        ``max_concurrency`` is the maximum number of requests in flight, the default and the upper limit is ``max_connection`` of the client.
+
+        Return: A list of tablestore.metadata.BatchWriteRowResponseItem in the order of ``rows``, the ``index`` of
+        every item is its position in ``rows``. The rows of a failed request are returned as failed items.
+        A request never contains the same primary key twice, such rows are moved to the next request.
+
+        Example:
+
+            rows = [Row([('gid', i), ('uid', i)], [('name', 'n%d' % i)]) for i in range(1000)]
+            items = await client.put_rows_many('myTable', rows)
+            failed = [item for item in items if not item.is_ok]
+        """
+        if batch_size is None:
+            batch_size = self.MAX_BATCH_WRITE_ROWS
+        if batch_size <= 0 or batch_size > self.MAX_BATCH_WRITE_ROWS:
+            raise OTSClientError("batch_size should be in range (0, %d]." % self.MAX_BATCH_WRITE_ROWS)
+        semaphore = asyncio.Semaphore(self._bulk_concurrency(max_concurrency))
+
+        async def put_chunk(chunk):
+            request = BatchWriteRowRequest()
+            request.add(TableInBatchWriteRowItem(
+                table_name, [PutRowItem(rows[index], condition, return_type) for index in chunk]))
+            try:
+                async with semaphore:
+                    response = await self.batch_write_row(request)
+                items = response.table_of_put.get(table_name, [])
+                if len(items) != len(chunk):
+                    raise OTSClientError("The result of rows is missing in BatchWriteRow response.")
+            except OTSError as e:
+                items = [BatchWriteRowResponseItem(False, getattr(e, 'code', None), e.message, None,
+                                                   rows[index].primary_key) for index in chunk]
+            for index, item in zip(chunk, items):
+                item.set_index(index)
+            return items
+
+        # the server rejects a request which writes the same row twice
+        chunks = []
+        chunk = []
+        identities = set()
+        for index, row in enumerate(rows):
+            identity = tuple((pk[0], bytes(pk[1]) if isinstance(pk[1], bytearray) else pk[1])
+                             for pk in row.primary_key)
+            if len(chunk) >= batch_size or identity in identities:
+                chunks.append(chunk)
+                chunk = []
+                identities = set()
+            chunk.append(index)
+            identities.add(identity)
+        if chunk:
+            chunks.append(chunk)
+
+        results = await asyncio.gather(*[put_chunk(chunk) for chunk in chunks])
+        items = [item for chunk_items in results for item in chunk_items]
+        items.sort(key=lambda item: item.index)
+        return items
+
+    def _bulk_concurrency(self, max_concurrency):
+        if max_concurrency is None:
+            return self.max_connection
+        if max_concurrency <= 0:
+            raise OTSClientError("the value of max_concurrency must be larger than 0")
+        # more concurrent requests than connections only wait in the connection pool
+        return min(max_concurrency, self.max_connection)
+
     async def get_range(self, table_name, direction,
                   inclusive_start_primary_key,
                   exclusive_end_primary_key,
@@ -1392,7 +2213,8 @@ class AsyncOTSClient(BaseOTSClient):
                   start_column=None,
                   end_column=None,
                   token=None,
-                  transaction_id=None):
+                  transaction_id=None,
+                  lazy_rows=False):
         """
         Description: Retrieve multiple rows of data based on range conditions.
 
@@ -1408,6 +2230,7 @@ class AsyncOTSClient(BaseOTSClient):
         ``start_column`` is an optional parameter used for wide row reading, indicating the starting column for this read operation.
         ``end_column`` is an optional parameter used for wide row reading, indicating the ending column for this read operation.
         ``token`` is an optional parameter used for wide row reading, indicating the starting column position for this read operation. It is binary-encoded and originates from the result of the previous request.
+        ``lazy_rows`` is an optional parameter. When it is True, the rows are tablestore.LazyRow, only the primary keys are decoded before returning, and the attribute columns are decoded when they are accessed.
 
         Returns: A list of results that meet the specified conditions.
 
@@ -1435,7 +2258,7 @@ class AsyncOTSClient(BaseOTSClient):
             column_filter, max_version,
             time_range, start_column,
             end_column, token,
-            transaction_id
+            transaction_id, decode_options=self._decode_options(lazy_rows=lazy_rows)
         )
 
     async def xget_range(self, table_name, direction,
@@ -1449,7 +2272,9 @@ class AsyncOTSClient(BaseOTSClient):
                    time_range=None,
                    start_column=None,
                    end_column=None,
-                   token=None):
+                   token=None,
+                   prefetch_depth=0,
+                   lazy_rows=False):
         """
         Description: Retrieve multiple rows of data based on range conditions, iterator version.
 
@@ -1466,6 +2291,8 @@ class AsyncOTSClient(BaseOTSClient):
         ``start_column`` is an optional parameter, used for wide row reading, indicating the starting column for this read.
         ``end_column`` is an optional parameter, used for wide row reading, indicating the ending column for this read.
         ``token`` is an optional parameter, used for wide row reading, indicating the starting column position for this read. The content is encoded in binary and originates from the result of the previous request.
+        ``prefetch_depth`` is an optional parameter, indicating the number of pages fetched ahead in the background while the current page is being iterated. The default is 0, which disables prefetching.
+        ``lazy_rows`` is an optional parameter. When it is True, the rows are tablestore.LazyRow, the same as ``get_range``.
 
         Return: A list of results that meet the conditions.
 
@@ -1499,8 +2326,36 @@ class AsyncOTSClient(BaseOTSClient):
                 raise OTSClientError("the value of count must be larger than 0")
             left_count = count
 
+        if prefetch_depth < 0:
+            raise OTSClientError("the value of prefetch_depth must not be negative")
+
         consumed_counter.read = 0
         consumed_counter.write = 0
+        pages = self._iter_range_pages(
+            table_name, direction,
+            inclusive_start_primary_key, exclusive_end_primary_key,
+            columns_to_get, left_count, column_filter,
+            max_version, time_range, start_column,
+            end_column, token, lazy_rows
+        )
+        if prefetch_depth > 0:
+            pages = aprefetch_iterator(pages, prefetch_depth)
+        async for consumed, row_list in pages:
+            consumed_counter.read += consumed.read
+            for row in row_list:
+                yield row
+                if left_count is not None:
+                    left_count -= 1
+                    if left_count <= 0:
+                        return
+
+    async def _iter_range_pages(self, table_name, direction,
+                                inclusive_start_primary_key, exclusive_end_primary_key,
+                                columns_to_get, left_count, column_filter,
+                                max_version, time_range, start_column,
+                                end_column, token, lazy_rows=False):
+        # The limit of the next page only depends on the size of the current page,
+        # so the pages can be requested before the rows are consumed.
         next_start_pk = inclusive_start_primary_key
         while next_start_pk:
             consumed, next_start_pk, row_list, next_token = await self.get_range(
@@ -1508,15 +2363,95 @@ class AsyncOTSClient(BaseOTSClient):
                 next_start_pk, exclusive_end_primary_key,
                 columns_to_get, left_count, column_filter,
                 max_version, time_range, start_column,
-                end_column, token
+                end_column, token, None, lazy_rows
             )
+            yield consumed, row_list
+            if left_count is not None:
+                left_count -= len(row_list)
+                if left_count <= 0:
+                    return
+
+    async def compute_split_points_by_size(self, table_name, split_size, split_size_unit_in_byte=None):
+        """
+        Description: Split the table into ranges of about ``split_size`` data, the split points are sampled by the server.
+
+        ``table_name`` is the corresponding table name.
+        ``split_size`` is the approximate data size of each split, in the unit of 100MB by default.
+        ``split_size_unit_in_byte`` is an optional parameter, indicating the unit of ``split_size`` in bytes.
+
+        Return: The consumed CapacityUnit, the primary key schema and the split points.
+
+        ``consumed`` indicates the consumed CapacityUnit, which is an instance of the tablestore.metadata.CapacityUnit class.
+        ``schema`` indicates the primary key schema of the table, such as [('gid', 'INTEGER'), ('uid', 'INTEGER')].
+        ``split_points`` indicates the primary keys between splits in increasing order, the tailing INF_MIN columns are omitted.
+
+        Example:
+
+            consumed, schema, split_points = await client.compute_split_points_by_size('myTable', 1)
+        """
+
+        return await self._request_helper('ComputeSplitPointsBySize', table_name, split_size, split_size_unit_in_byte)
+
+    async def parallel_xget_range(self, table_name, direction,
+                                  inclusive_start_primary_key,
+                                  exclusive_end_primary_key,
+                                  consumed_counter,
+                                  columns_to_get=None,
+                                  column_filter=None,
+                                  max_version=1,
+                                  time_range=None,
+                                  split_points=None,
+                                  split_size=1,
+                                  max_concurrency=None,
+                                  ordered=True):
+        """
+        Description: Retrieve multiple rows of data based on range conditions, the range is split into sub-ranges which are scanned concurrently.
+
+        The parameters are the same as OTSClient.parallel_xget_range. Every sub-range is scanned by its own task,
+        and ``max_concurrency`` limits the number of GetRange requests in flight.
+
+        Return: An async iterator of rows.
+
+        Example:
+
+            consumed_counter = CapacityUnit(0, 0)
+            range_iterator = client.parallel_xget_range(
+                        'myTable', Direction.FORWARD,
+                        inclusive_start_primary_key, exclusive_end_primary_key,
+                        consumed_counter, max_concurrency=16
+            )
+            async for row in range_iterator:
+               pass
+        """
+
+        if not isinstance(consumed_counter, CapacityUnit):
+            raise OTSClientError(
+                "consumed_counter should be an instance of CapacityUnit, not %s" % (
+                    consumed_counter.__class__.__name__)
+            )
+        if max_concurrency is None:
+            max_concurrency = self.DEFAULT_SCAN_CONCURRENCY
+        if max_concurrency <= 0:
+            raise OTSClientError("the value of max_concurrency must be larger than 0")
+
+        consumed_counter.read = 0
+        consumed_counter.write = 0
+        if split_points is None:
+            consumed, schema, points = await self.compute_split_points_by_size(table_name, split_size)
             consumed_counter.read += consumed.read
-            for row in row_list:
-                yield row
-                if left_count is not None:
-                    left_count -= 1
-                    if left_count <= 0:
-                        return
+            split_points = [complete_split_point(point, schema) for point in points]
+        ranges = make_scan_ranges(direction, inclusive_start_primary_key, exclusive_end_primary_key, split_points)
+
+        async def get_range(start_primary_key, end_primary_key):
+            return await self.get_range(
+                table_name, direction,
+                start_primary_key, end_primary_key,
+                columns_to_get, None, column_filter,
+                max_version, time_range
+            )
+
+        async for row in aiter_ranges_in_parallel(get_range, ranges, consumed_counter, max_concurrency, ordered):
+            yield row
 
     async def list_search_index(self, table_name=None):
         """
@@ -1619,8 +2554,8 @@ class AsyncOTSClient(BaseOTSClient):
         :type index_name: str
         :param index_name: The name of the index.
 
-        :type search_query: tablestore.metadata.SearchQuery
-        :param search_query: The query to perform.
+        :type search_query: tablestore.metadata.SearchQuery or tablestore.metadata.PreparedSearchQuery
+        :param search_query: The query to perform, see ``prepare_search_query`` for the PreparedSearchQuery.
 
         :type columns_to_get: tablestore.metadata.ColumnsToGet
         :param columns_to_get: Columns to return.
@@ -1647,6 +2582,42 @@ class AsyncOTSClient(BaseOTSClient):
         return await self._request_helper('Search', table_name, index_name, search_query, columns_to_get, routing_keys,
                                     timeout_s)
 
+    async def search_pages(self, table_name, index_name, search_query, columns_to_get=None, routing_keys=None,
+                           timeout_s=None, prefetch_depth=1):
+        """
+        Description: Page through all results of a search query by the ``next_token`` of every response.
+
+        The parameters are the same as ``search``, ``search_query`` is not modified.
+        ``prefetch_depth`` is the number of pages requested ahead while the current page is processed, 0 disables prefetching.
+
+        Return: An async iterator of tablestore.metadata.SearchResponse, one for each page.
+
+        Example:
+
+            query = SearchQuery(TermQuery('k', 'key000'), limit=100, get_total_count=False)
+            async for response in client.search_pages('myTable', 'myIndex', query):
+                for row in response.rows:
+                    pass
+        """
+        if prefetch_depth < 0:
+            raise OTSClientError("the value of prefetch_depth must not be negative")
+
+        async def pages():
+            query = search_query
+            while True:
+                response = await self.search(table_name, index_name, query, columns_to_get, routing_keys, timeout_s)
+                yield response
+                if not response.next_token:
+                    return
+                query = copy.copy(query)
+                query.next_token = response.next_token
+
+        iterator = pages()
+        if prefetch_depth > 0:
+            iterator = aprefetch_iterator(iterator, prefetch_depth)
+        async for response in iterator:
+            yield response
+
     async def compute_splits(self, table_name, index_name):
         """
         Compute splits on search index.
@@ -1769,7 +2740,11 @@ class AsyncOTSClient(BaseOTSClient):
             await client.commit_transaction(transaction_id)
         """
 
-        return await self._request_helper('CommitTransaction', transaction_id)
+        try:
+            return await self._request_helper('CommitTransaction', transaction_id)
+        finally:
+            if self.row_cache is not None:
+                self.row_cache.finish_transaction(transaction_id)
 
     async def abort_transaction(self, transaction_id):
         """
@@ -1782,12 +2757,35 @@ class AsyncOTSClient(BaseOTSClient):
             await client.abort_transaction(transaction_id)
         """
 
-        return await self._request_helper('AbortTransaction', transaction_id)
+        try:
+            return await self._request_helper('AbortTransaction', transaction_id)
+        finally:
+            if self.row_cache is not None:
+                self.row_cache.finish_transaction(transaction_id)
 
     async def put_timeseries_data(self, timeseriesTableName: str, timeseriesRows: TimeseriesRow) -> PutTimeseriesDataResponse:
 
         return await self._request_helper('PutTimeseriesData', timeseriesTableName, timeseriesRows)
 
+    async def put_timeseries_columns(self, timeseries_table_name, timeseries_key, timestamps, fields) -> PutTimeseriesDataResponse:
+        """
+        Description: Writes the points of one timeseries from columns, without creating a TimeseriesRow for each point.
+
+        ``timeseries_table_name`` is the name of the timeseries table.
+        ``timeseries_key`` is the TimeseriesKey of all the points.
+        ``timestamps`` is the time in microseconds of each point.
+        ``fields`` is a dict from the field name to the values of each point, which have the same length as ``timestamps``.
+        The arrays can be numpy arrays, array.array or lists. The integer, float and bool arrays are written as LONG, DOUBLE and BOOLEAN fields.
+
+        Returns: PutTimeseriesDataResponse. The index of a failed row is the index of the point in ``timestamps``.
+
+        Example:
+        client.put_timeseries_columns('table', TimeseriesKey('cpu', 'host1', {'region': 'hz'}),
+                                      numpy.arange(1000) + start_in_us, {'usage': usage_array})
+        """
+        return await self._request_helper('PutTimeseriesData', timeseries_table_name, None,
+                                          timeseries_columns=(timeseries_key, timestamps, fields))
+
     async def create_timeseries_table(self, request: CreateTimeseriesTableRequest):
         return await self._request_helper('CreateTimeseriesTable', request)
 
@@ -1795,7 +2793,10 @@ class AsyncOTSClient(BaseOTSClient):
         return await self._request_helper('ListTimeseriesTable')
 
     async def delete_timeseries_table(self, timeseries_table_name: str):
-        return await self._request_helper('DeleteTimeseriesTable', timeseries_table_name)
+        try:
+            return await self._request_helper('DeleteTimeseriesTable', timeseries_table_name)
+        finally:
+            self.invalidate_timeseries_meta_cache(timeseries_table_name)
 
     async def describe_timeseries_table(self, timeseries_table_name: str) -> DescribeTimeseriesTableResponse:
         return await self._request_helper('DescribeTimeseriesTable', timeseries_table_name)
@@ -1804,13 +2805,86 @@ class AsyncOTSClient(BaseOTSClient):
         return await self._request_helper('UpdateTimeseriesTable', timeseries_meta)
 
     async def update_timeseries_meta(self, request: UpdateTimeseriesMetaRequest) -> UpdateTimeseriesMetaResponse:
-        return await self._request_helper('UpdateTimeseriesMeta', request)
+        try:
+            return await self._request_helper('UpdateTimeseriesMeta', request)
+        finally:
+            self.invalidate_timeseries_meta_cache(request.timeseries_tablename)
 
     async def delete_timeseries_meta(self, request: DeleteTimeseriesMetaRequest) -> DeleteTimeseriesMetaResponse:
-        return await self._request_helper('DeleteTimeseriesMeta', request)
+        try:
+            return await self._request_helper('DeleteTimeseriesMeta', request)
+        finally:
+            self.invalidate_timeseries_meta_cache(request.timeseries_tablename)
 
     async def query_timeseries_meta(self, request: QueryTimeseriesMetaRequest) -> QueryTimeseriesMetaResponse:
-        return await self._request_helper('QueryTimeseriesMeta', request)
+        """
+        Description: Queries the metas of the timeseries which match ``request.condition``.
+
+        When the client is created with ``timeseries_meta_cache_size``, the responses are cached by the table, the canonical form of the condition,
+        ``getTotalHits``, ``limit`` and ``nextToken``, and the cached response is returned until it expires or is invalidated.
+        The cached responses are shared by the callers and should not be modified. The hits and misses are in ``client.timeseries_meta_cache.stats()``.
+
+        Returns: QueryTimeseriesMetaResponse.
+        """
+        if self.timeseries_meta_cache is None:
+            return await self._request_helper('QueryTimeseriesMeta', request)
+
+        key = self._timeseries_meta_cache_key(request)
+        response = self.timeseries_meta_cache.get(key)
+        if response is None:
+            version = self._timeseries_meta_cache_version
+            response = await self._request_helper('QueryTimeseriesMeta', request)
+            if version == self._timeseries_meta_cache_version:
+                self.timeseries_meta_cache.put(key, response)
+        return response
+
+    async def get_timeseries_data(self, request: GetTimeseriesDataRequest, columnar=False) -> GetTimeseriesDataResponse:
+        """
+        Description: Reads the points of one timeseries, one page at a time.
+
+        ``request`` is a GetTimeseriesDataRequest, the next page is read by setting ``request.nextToken`` to ``nextToken`` of the response.
+        ``columnar`` is an optional parameter. When it is True, ``rows`` of the response is (times, fields) instead of a list of TimeseriesRow,
+        where ``times`` is an int64 numpy array of the time in microseconds, and ``fields`` is an OrderedDict from the field name to (values, is_null),
+        the same as the columnar result of ``exe_sql_query``. The LONG, DOUBLE and BOOLEAN fields are int64, float64 and bool arrays.
 
-    async def get_timeseries_data(self, request: GetTimeseriesDataRequest) -> GetTimeseriesDataResponse:
-        return await self._request_helper('GetTimeseriesData', request)
\ No newline at end of file
+        Returns: GetTimeseriesDataResponse.
+        """
+        return await self._request_helper(
+            'GetTimeseriesData', request, decode_options=self._decode_options(columnar=columnar)
+        )
+
+    async def xget_timeseries_data(self, request: GetTimeseriesDataRequest, prefetch_depth=1, columnar=False):
+        """
+        Description: Reads the points of one timeseries, iterator version. The pages are read one after another by ``nextToken``.
+
+        ``request`` is a GetTimeseriesDataRequest, ``request.limit`` is the number of points of each page. The request is not modified.
+        ``prefetch_depth`` is an optional parameter, indicating the number of pages fetched ahead in the background while the current page is being iterated. The default is 1, 0 disables prefetching.
+        ``columnar`` is an optional parameter. When it is False, the iterator yields TimeseriesRow. When it is True, it yields (times, fields) for each page, the same as ``rows`` of ``get_timeseries_data`` with ``columnar``.
+
+        Example:
+
+            request = GetTimeseriesDataRequest('table', TimeseriesKey('cpu', 'host1', {'region': 'hz'}), begin_in_us, end_in_us)
+            async for times, fields in client.xget_timeseries_data(request, columnar=True):
+                usage, is_null = fields['usage']
+        """
+        if prefetch_depth < 0:
+            raise OTSClientError("the value of prefetch_depth must not be negative")
+
+        pages = self._iter_timeseries_data_pages(request, columnar)
+        if prefetch_depth > 0:
+            pages = aprefetch_iterator(pages, prefetch_depth)
+        async for response in pages:
+            if not columnar:
+                for row in response.rows or []:
+                    yield row
+            elif len(response.rows[0]) != 0:
+                yield response.rows
+
+    async def _iter_timeseries_data_pages(self, request, columnar):
+        request = copy.copy(request)
+        while True:
+            response = await self.get_timeseries_data(request, columnar)
+            yield response
+            if not response.nextToken:
+                return
+            request.nextToken = response.nextToken
@@ -1,6 +1,12 @@
 # -*- coding: utf8 -*-
+import asyncio
+import hashlib
+import logging
+import socket
 import ssl
+import threading
 import time
+import weakref
 
 import aiohttp
 from aiohttp import ClientTimeout
@@ -11,25 +17,203 @@ except ImportError:
     import http.client
 
 from urllib3.poolmanager import PoolManager
-from urllib3.connectionpool import HTTPConnectionPool
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
 import certifi
 
 from tablestore.error import *
+from tablestore.transport import Transport, AsyncTransport, ResponseBody
 
 _NETWORK_IO_TIME_COUNT_FLAG = False
 _network_io_time = 0
 
+RECEIVE_CHUNK_SIZE = 64 * 1024
 
-class ConnectionPool(object):
+
+def _content_length(headers):
+    # the size of the received body, None if it is unknown or the body is decoded
+    if headers.get('content-encoding', 'identity') != 'identity':
+        return None
+    try:
+        return int(headers.get('content-length'))
+    except (TypeError, ValueError):
+        return None
+
+
+def _receive_body(response):
+    # Receive the body of a urllib3 response into one buffer and hash it as the chunks arrive.
+    md5 = hashlib.md5()
+    length = _content_length(response.headers)
+    if length is None:
+        body = ResponseBody()
+        for chunk in response.stream(RECEIVE_CHUNK_SIZE):
+            md5.update(chunk)
+            body += chunk
+    else:
+        body = ResponseBody(length)
+        received = 0
+        with memoryview(body) as view:
+            while received < length:
+                size = response.readinto(view[received:received + RECEIVE_CHUNK_SIZE])
+                if not size:
+                    break
+                md5.update(view[received:received + size])
+                received += size
+        # a truncated body fails the MD5 check
+        del body[received:]
+    body.content_md5 = md5.digest()
+    return body
+
+
+async def _async_receive_body(response):
+    # Receive the body of an aiohttp response into one buffer and hash it as the chunks arrive.
+    md5 = hashlib.md5()
+    body = ResponseBody(_content_length(response.headers) or 0)
+    received = 0
+    async for chunk in response.content.iter_chunked(RECEIVE_CHUNK_SIZE):
+        md5.update(chunk)
+        # the chunk is copied into the preallocated buffer, or appended if the buffer is full
+        body[received:received + len(chunk)] = chunk
+        received += len(chunk)
+    del body[received:]
+    body.content_md5 = md5.digest()
+    return body
+
+
+class _TLSSessionContext(ssl.SSLContext):
+    # Resumes the TLS session of the last connection returned to the pool in the new connections.
+
+    tls_session = None
+
+    def wrap_socket(self, sock, *args, **kwargs):
+        if kwargs.get('session') is None and self.tls_session is not None:
+            kwargs['session'] = self.tls_session
+        return super().wrap_socket(sock, *args, **kwargs)
+
+
+# The protocol versions of ``ssl_version`` pinning one TLS version, which are the minimum and maximum version of the
+# context resuming TLS sessions. PROTOCOL_TLS and PROTOCOL_TLS_CLIENT negotiate any version.
+_PINNED_TLS_VERSIONS = {
+    ssl.PROTOCOL_TLSv1: ssl.TLSVersion.TLSv1,
+    ssl.PROTOCOL_TLSv1_1: ssl.TLSVersion.TLSv1_1,
+    ssl.PROTOCOL_TLSv1_2: ssl.TLSVersion.TLSv1_2,
+}
+
+
+def _set_tls_version(context, client_ssl_version):
+    if client_ssl_version is None or client_ssl_version in (ssl.PROTOCOL_TLS, ssl.PROTOCOL_TLS_CLIENT):
+        return
+    if isinstance(client_ssl_version, ssl.TLSVersion):
+        context.minimum_version = client_ssl_version
+    elif client_ssl_version in _PINNED_TLS_VERSIONS:
+        context.minimum_version = context.maximum_version = _PINNED_TLS_VERSIONS[client_ssl_version]
+    else:
+        raise OTSClientError('ssl_version %s is not supported with tls_session_resumption.' % client_ssl_version)
+
+
+class _PooledConnectionMixin(object):
+    # ``owner`` is the ConnectionPool counting the connections, it is set by the connection pool of urllib3.
+    owner = None
+
+    def connect(self):
+        super().connect()
+        if self.owner is not None:
+            self.owner._on_connect(self)
+
+
+class _HTTPConnection(_PooledConnectionMixin, HTTPConnection):
+    pass
+
+
+class _HTTPSConnection(_PooledConnectionMixin, HTTPSConnection):
+    pass
+
+
+class _PoolMixin(object):
+    # ``owner`` is the ConnectionPool counting the connections, it is set by _PoolManager.
+    owner = None
+
+    def _new_conn(self):
+        conn = super()._new_conn()
+        conn.owner = self.owner
+        return conn
+
+    def _get_conn(self, timeout=None):
+        conn = super()._get_conn(timeout)
+        self.owner._check_out(conn)
+        return conn
+
+    def _put_conn(self, conn):
+        self.owner._check_in(conn)
+        super()._put_conn(conn)
+
+
+class _HTTPConnectionPool(_PoolMixin, HTTPConnectionPool):
+    ConnectionCls = _HTTPConnection
+
+
+class _HTTPSConnectionPool(_PoolMixin, HTTPSConnectionPool):
+    ConnectionCls = _HTTPSConnection
+
+
+class _PoolManager(PoolManager):
+
+    def __init__(self, owner, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.owner = owner
+        self.pool_classes_by_scheme = {'http': _HTTPConnectionPool, 'https': _HTTPSConnectionPool}
+
+    def _new_pool(self, scheme, host, port, request_context=None):
+        pool = super()._new_pool(scheme, host, port, request_context)
+        pool.owner = self.owner
+        return pool
+
+
+class ConnectionPool(Transport):
+    """
+    The connection pool of OTSClient.
+
+    ``idle_timeout`` is the time in seconds after which an idle connection is closed instead of reused, None keeps the idle connections.
+    ``keepalive_interval`` enables the TCP keep-alive probes of the connections at this interval in seconds,
+    and a background thread which closes the connections idle for ``idle_timeout`` and reopens ``warm_up`` connections at the same interval.
+    ``warm_up`` is the number of connections opened by ``warm_up()``.
+    ``tls_session_resumption`` resumes the TLS session of the previous connection in the new https connections.
+    ``logger`` logs the errors of the background thread.
+    """
 
     NUM_POOLS = 5    # one pool per host, usually just 1 pool is needed
                       # when redirect happens, one additional pool will be created
 
-    def __init__(self, host, path, timeout=0, maxsize=50, client_ssl_version=None):
+    def __init__(self, host, path, timeout=0, maxsize=50, client_ssl_version=None, idle_timeout=None,
+                 keepalive_interval=None, warm_up=0, tls_session_resumption=False, logger=None):
         self.host = host
+        self.logger = logger if logger is not None else logging.getLogger(__name__)
         self.path = path
-       
-        self.pool = PoolManager(
+        self.maxsize = maxsize
+        self.idle_timeout = idle_timeout
+        self.keepalive_interval = keepalive_interval
+        self.warm_up_connections = min(warm_up or 0, maxsize)
+
+        self.created = 0
+        self.discarded = 0
+        self.tls_resumed = 0
+        self._active = 0
+        self._lock = threading.Lock()
+
+        pool_kwargs = {}
+        if keepalive_interval:
+            pool_kwargs['socket_options'] = HTTPConnection.default_socket_options + self._keepalive_socket_options(
+                keepalive_interval)
+        self.ssl_context = None
+        if tls_session_resumption:
+            self.ssl_context = _TLSSessionContext(ssl.PROTOCOL_TLS_CLIENT)
+            _set_tls_version(self.ssl_context, client_ssl_version)
+            pool_kwargs['ssl_context'] = self.ssl_context
+        else:
+            pool_kwargs['ssl_version'] = client_ssl_version
+
+        self.pool = _PoolManager(
+            self,
             self.NUM_POOLS,
             headers=None,
             cert_reqs='CERT_REQUIRED', # Force certificate check
@@ -37,9 +221,154 @@ class ConnectionPool(object):
             timeout=timeout,
             maxsize=maxsize,
             block=True,
-            ssl_version=client_ssl_version
+            **pool_kwargs
         )
 
+        self._closed = threading.Event()
+        self._keepalive_thread = None
+        if keepalive_interval:
+            self._keepalive_thread = threading.Thread(target=self._keepalive, name='tablestore-connection-keepalive')
+            self._keepalive_thread.daemon = True
+            self._keepalive_thread.start()
+
+    @staticmethod
+    def _keepalive_socket_options(interval):
+        interval = max(int(interval), 1)
+        options = [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+        for name in ('TCP_KEEPIDLE', 'TCP_KEEPINTVL'):
+            if hasattr(socket, name):
+                options.append((socket.IPPROTO_TCP, getattr(socket, name), interval))
+        return options
+
+    def _on_connect(self, conn):
+        with self._lock:
+            self.created += 1
+            if getattr(conn.sock, 'session_reused', False):
+                self.tls_resumed += 1
+
+    def _check_out(self, conn):
+        now = time.time()
+        with self._lock:
+            self._active += 1
+        idle_since = getattr(conn, 'idle_since', None)
+        if idle_since is not None and self._is_expired(conn, idle_since, now):
+            # the connection is opened again by the request
+            conn.close()
+            with self._lock:
+                self.discarded += 1
+
+    def _check_in(self, conn):
+        with self._lock:
+            self._active -= 1
+            if conn is None:
+                # the connection of a failed request is closed by urllib3
+                self.discarded += 1
+                return
+        conn.idle_since = time.time()
+        if self.ssl_context is not None and isinstance(conn.sock, ssl.SSLSocket):
+            session = conn.sock.session
+            if session is not None:
+                self.ssl_context.tls_session = session
+
+    def _is_expired(self, conn, idle_since, now):
+        return self.idle_timeout is not None and conn.sock is not None and now - idle_since > self.idle_timeout
+
+    def _url_pools(self):
+        pools = self.pool.pools
+        return [pool for pool in (pools.get(key) for key in pools.keys()) if pool is not None]
+
+    @staticmethod
+    def _is_empty_slot(conn):
+        # a slot without a connection, or with a connection which is not opened
+        return conn is None or conn.sock is None
+
+    def warm_up(self, count=None):
+        """
+        Open the connections to the host until there are ``count`` idle connections, ``count`` None is ``warm_up`` of the pool.
+        Return the number of connections opened.
+
+        Only the empty slots of the pool are filled, the connections are opened outside the pool, so the requests never
+        wait for the warm-up.
+        """
+        count = self.warm_up_connections if count is None else min(count, self.maxsize)
+        pool = self.pool.connection_from_url(self.host)
+        queue = pool.pool
+        opened = 0
+        while queue is not None:
+            with queue.mutex:
+                idle = sum(1 for conn in queue.queue if not self._is_empty_slot(conn))
+                if idle >= count or idle == len(queue.queue):
+                    break
+            conn = pool._new_conn()
+            conn.connect()
+            conn.idle_since = time.time()
+            with queue.mutex:
+                empty = [index for index, slot in enumerate(queue.queue) if self._is_empty_slot(slot)]
+                placed = bool(empty)
+                if placed:
+                    # the connection takes the place of an empty slot on the top of the pool, the size of the queue is unchanged
+                    del queue.queue[empty[0]]
+                    queue.queue.append(conn)
+            if not placed:
+                # the empty slots are taken by the requests meanwhile
+                conn.close()
+                with self._lock:
+                    self.discarded += 1
+                break
+            opened += 1
+        return opened
+
+    def reap_idle_connections(self):
+        """
+        Close the pooled connections idle for longer than ``idle_timeout``, return the number of connections closed.
+        """
+        now = time.time()
+        expired = []
+        for pool in self._url_pools():
+            queue = pool.pool
+            if queue is None:
+                continue
+            with queue.mutex:
+                for index, conn in enumerate(queue.queue):
+                    if conn is not None and self._is_expired(conn, conn.idle_since, now):
+                        # an empty slot of the pool opens a new connection when it is taken
+                        queue.queue[index] = None
+                        expired.append(conn)
+        for conn in expired:
+            conn.close()
+        with self._lock:
+            self.discarded += len(expired)
+        return len(expired)
+
+    def _keepalive(self):
+        while not self._closed.wait(self.keepalive_interval):
+            try:
+                self.reap_idle_connections()
+                if self.warm_up_connections:
+                    self.warm_up()
+            except Exception as e:
+                # the connections are opened again by the requests
+                self.logger.warning("Failed to keep the connections to %s alive: %s" % (self.host, e))
+
+    def stats(self):
+        """
+        Return the numbers of the idle and active connections, and the counts of the connections created, discarded and
+        resumed TLS sessions, as a dict.
+        """
+        idle = 0
+        for pool in self._url_pools():
+            queue = pool.pool
+            if queue is not None:
+                with queue.mutex:
+                    idle += sum(1 for conn in queue.queue if conn is not None and conn.sock is not None)
+        with self._lock:
+            return {'idle': idle, 'active': self._active, 'created': self.created, 'discarded': self.discarded,
+                    'tls_resumed': self.tls_resumed}
+
+    def close(self):
+        self._closed.set()
+        self.pool.clear()
+
     def send_receive(self, url, request_headers, request_body):
 
         global _network_io_time
@@ -52,7 +381,12 @@ class ConnectionPool(object):
             body=request_body, headers=request_headers,
             redirect=False,
             assert_same_host=False,
+            preload_content=False,
         )
+        try:
+            response_body = _receive_body(response)
+        finally:
+            response.release_conn()
 
         if _NETWORK_IO_TIME_COUNT_FLAG:
             end = time.time()
@@ -60,16 +394,34 @@ class ConnectionPool(object):
 
         # TODO error handling
         response_headers = dict(response.headers)
-        response_body = response.data # TODO figure out why response.read() don't work
 
         return response.status, response.reason, response_headers, response_body
 
 
-class AsyncConnectionPool(object):
+class AsyncConnectionPool(AsyncTransport):
+    """
+    The connection pool of AsyncOTSClient, created in the event loop where it is used.
+
+    ``maxsize`` is the limit of the connections in total and ``limit_per_host`` is the limit of the connections to one host, 0 is no limit.
+    ``ttl_dns_cache`` is the time in seconds that the resolved addresses of a host are cached, None caches them forever.
+
+    A pool returned by ``acquire_shared`` is shared by the clients of the same endpoint and settings in the event loop,
+    it is closed when all of them release it.
+    """
 
-    def __init__(self, host, path, timeout=50, maxsize=50, keepalive_timeout=12, force_close=False, client_ssl_version=None):
+    # the event loop -> the pools of it by the endpoint and settings, neither keeps a loop or a pool alive
+    _shared_pools = weakref.WeakKeyDictionary()
+    _shared_lock = threading.Lock()
+    # the tasks closing the pools detached from an event loop which is not running
+    _closing_tasks = set()
+
+    def __init__(self, host, path, timeout=50, maxsize=50, keepalive_timeout=12, force_close=False, client_ssl_version=None,
+                 limit_per_host=0, ttl_dns_cache=10):
         self.host = host
         self.path = path
+        self.loop = asyncio.get_running_loop()
+        self._shared_key = None
+        self._references = 1
 
         if isinstance(timeout, (list, tuple)):
             conn_timeout, read_timeout = timeout
@@ -88,12 +440,74 @@ class AsyncConnectionPool(object):
             ),
             connector=aiohttp.TCPConnector(
                 limit=maxsize,
+                limit_per_host=limit_per_host,
+                ttl_dns_cache=ttl_dns_cache,
                 ssl_context=ssl_context,
                 keepalive_timeout=keepalive_timeout,
                 force_close=force_close,
             )
         )
 
+    @classmethod
+    def acquire_shared(cls, host, path, **kwargs):
+        """
+        Return the pool of the endpoint shared in the running event loop, a new pool is created if there is none.
+        Each pool returned by ``acquire_shared`` should be released by ``release()``.
+        """
+        settings = tuple(sorted((name, tuple(value) if isinstance(value, list) else value)
+                                for name, value in kwargs.items()))
+        loop = asyncio.get_running_loop()
+        key = (host, path, settings)
+        with cls._shared_lock:
+            pools = cls._shared_pools.get(loop)
+            if pools is None:
+                pools = cls._shared_pools[loop] = weakref.WeakValueDictionary()
+            pool = pools.get(key)
+            if pool is not None and not pool.pool.closed:
+                pool._references += 1
+                return pool
+            pool = cls(host, path, **kwargs)
+            pool._shared_key = key
+            pools[key] = pool
+            return pool
+
+    def _unreference(self):
+        # Return True if the pool is released by all the users.
+        with self._shared_lock:
+            self._references -= 1
+            if self._references > 0:
+                return False
+            pools = self._shared_pools.get(self.loop)
+            if pools is not None and self._shared_key is not None and pools.get(self._shared_key) is self:
+                del pools[self._shared_key]
+                if not pools:
+                    del self._shared_pools[self.loop]
+            return True
+
+    async def release(self):
+        """
+        Release the pool, it is closed when it is released by all the users.
+        """
+        if self._unreference():
+            await self.close()
+
+    def detach(self):
+        """
+        Release the pool for a user moving to the running event loop from the loop of the pool.
+
+        The pool is closed in its own loop when it is released by all the users, or by a task of the running loop
+        if its own loop is not running. The connections of a closed loop are dropped then, their sockets are closed
+        when they are garbage collected.
+        """
+        if not self._unreference():
+            return
+        if self.loop.is_running():
+            asyncio.run_coroutine_threadsafe(self.close(), self.loop)
+        else:
+            task = asyncio.get_running_loop().create_task(self.close())
+            self._closing_tasks.add(task)
+            task.add_done_callback(self._closing_tasks.discard)
+
     async def send_receive(self, url, request_headers, request_body):
 
         global _network_io_time
@@ -107,7 +521,7 @@ class AsyncConnectionPool(object):
             headers=request_headers,
             allow_redirects=False,
         ) as response:
-            response_body = await response.read()
+            response_body = await _async_receive_body(response)
 
         if _NETWORK_IO_TIME_COUNT_FLAG:
             end = time.time()
@@ -11,3 +11,8 @@ OTS_HEADER_SIGNATURE = 'x-ots-signature'
 OTS_HEADER_SIGNATURE_V4 = 'x-ots-signaturev4'
 OTS_HEADER_SIGN_DATE = 'x-ots-signdate'
 OTS_HEADER_SIGN_REGION = 'x-ots-signregion'
+
+OTS_HEADER_REQUEST_COMPRESS_TYPE = 'x-ots-request-compress-type'
+OTS_HEADER_REQUEST_COMPRESS_SIZE = 'x-ots-request-compress-size'
+OTS_HEADER_RESPONSE_COMPRESS_TYPE = 'x-ots-response-compress-type'
+OTS_HEADER_RESPONSE_COMPRESS_SIZE = 'x-ots-response-compress-size'
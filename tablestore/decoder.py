@@ -1,6 +1,9 @@
 # -*- coding: utf8 -*-
 
+import collections
+
 import google.protobuf.text_format as text_format
+import numpy
 
 from tablestore.metadata import *
 from tablestore.aggregation import *
@@ -16,10 +19,32 @@ from tablestore.flatbuffer.dataprotocol.SQLResponseColumns import *
 from tablestore.flatbuffer.flat_buffer_decoder import *
 
 
+def _timeseries_column_as_numpy(column, size):
+    # column maps the index of the row to the value, the rows without the field are null
+    values = list(column.values())
+    array = None
+    if isinstance(values[0], (bool, int, float)):
+        array = numpy.array(values)
+    if array is None or array.dtype.kind not in 'bif':
+        # numpy would turn strings into a fixed size type and equal length bytes into a 2D array
+        array = numpy.empty(len(values), dtype=object)
+        array[:] = values
+    if len(column) == size:
+        return array, numpy.zeros(size, dtype=numpy.bool_)
+
+    indexes = numpy.fromiter(column.keys(), dtype=numpy.intp, count=len(column))
+    result = numpy.zeros(size, dtype=array.dtype)
+    result[indexes] = array
+    is_null = numpy.ones(size, dtype=numpy.bool_)
+    is_null[indexes] = False
+    return result, is_null
+
+
 class OTSProtoBufferDecoder(object):
 
-    def __init__(self, encoding):
+    def __init__(self, encoding, verify_checksum=True):
         self.encoding = encoding
+        self.verify_checksum = verify_checksum
 
         self.api_decode_map = {
             'CreateTable'           : self._decode_create_table,
@@ -34,6 +59,7 @@ class OTSProtoBufferDecoder(object):
             'BatchGetRow'           : self._decode_batch_get_row,
             'BatchWriteRow'         : self._decode_batch_write_row,
             'GetRange'              : self._decode_get_range,
+            'ComputeSplitPointsBySize': self._decode_compute_split_points_by_size,
             'ListSearchIndex'       : self._decode_list_search_index,
             'DeleteSearchIndex'     : self._decode_delete_search_index,
             'DescribeSearchIndex'   : self._decode_describe_search_index,
@@ -158,11 +184,12 @@ class OTSProtoBufferDecoder(object):
             allow_update = proto.allow_update
         return TableOptions(time_to_live, max_versions, max_deviation_time, allow_update)
 
-    def _parse_get_row_item(self, proto, table_name):
+    def _parse_get_row_item(self, proto, table_name, lazy_rows=False):
         row_list = []
         for row_item in proto:
             primary_key_columns = None
             attribute_columns = None
+            lazy_row = None
 
             if row_item.is_ok:
                 error_code = None
@@ -171,8 +198,11 @@ class OTSProtoBufferDecoder(object):
 
                 if len(row_item.row) != 0:
                     inputStream = PlainBufferInputStream(row_item.row)
-                    codedInputStream = PlainBufferCodedInputStream(inputStream)
-                    primary_key_columns, attribute_columns = codedInputStream.read_row()
+                    codedInputStream = PlainBufferCodedInputStream(inputStream, self.verify_checksum)
+                    if lazy_rows:
+                        lazy_row = codedInputStream.read_lazy_row()
+                    else:
+                        primary_key_columns, attribute_columns = codedInputStream.read_row()
             else:
                 error_code = row_item.error.code
                 error_message = row_item.error.message if row_item.error.HasField('message') else ''
@@ -186,14 +216,16 @@ class OTSProtoBufferDecoder(object):
                 table_name,
                 capacity_unit, primary_key_columns, attribute_columns
             )
+            if lazy_row is not None:
+                row_data_item.row = lazy_row
             row_list.append(row_data_item)
 
         return row_list
 
-    def _parse_batch_get_row(self, proto):
+    def _parse_batch_get_row(self, proto, lazy_rows=False):
         rows = {}
         for table_item in proto:
-            rows[table_item.table_name] = self._parse_get_row_item(table_item.rows, table_item.table_name)
+            rows[table_item.table_name] = self._parse_get_row_item(table_item.rows, table_item.table_name, lazy_rows)
         return rows
 
     def _parse_write_row_item(self, row_item):
@@ -207,7 +239,7 @@ class OTSProtoBufferDecoder(object):
 
             if len(row_item.row) != 0:
                 inputStream = PlainBufferInputStream(row_item.row)
-                codedInputStream = PlainBufferCodedInputStream(inputStream)
+                codedInputStream = PlainBufferCodedInputStream(inputStream, self.verify_checksum)
                 primary_key_columns, attribute_columns = codedInputStream.read_row()
         else:
             error_code = row_item.error.code
@@ -334,7 +366,7 @@ class OTSProtoBufferDecoder(object):
 
         if len(proto.row) != 0:
             inputStream = PlainBufferInputStream(proto.row)
-            codedInputStream = PlainBufferCodedInputStream(inputStream)
+            codedInputStream = PlainBufferCodedInputStream(inputStream, self.verify_checksum)
             primary_key, attributes = codedInputStream.read_row()
             return_row = Row(primary_key, attributes)
 
@@ -350,7 +382,7 @@ class OTSProtoBufferDecoder(object):
 
         if len(proto.row) != 0:
             inputStream = PlainBufferInputStream(proto.row)
-            codedInputStream = PlainBufferCodedInputStream(inputStream)
+            codedInputStream = PlainBufferCodedInputStream(inputStream, self.verify_checksum)
             primary_key, attribute_columns = codedInputStream.read_row()
             return_row = Row(primary_key, attribute_columns)
 
@@ -366,7 +398,7 @@ class OTSProtoBufferDecoder(object):
 
         if len(proto.row) != 0:
             inputStream = PlainBufferInputStream(proto.row)
-            codedInputStream = PlainBufferCodedInputStream(inputStream)
+            codedInputStream = PlainBufferCodedInputStream(inputStream, self.verify_checksum)
             primary_key, attribute_columns = codedInputStream.read_row()
             return_row = Row(primary_key, attribute_columns)
 
@@ -382,17 +414,17 @@ class OTSProtoBufferDecoder(object):
 
         if len(proto.row) != 0:
             inputStream = PlainBufferInputStream(proto.row)
-            codedInputStream = PlainBufferCodedInputStream(inputStream)
+            codedInputStream = PlainBufferCodedInputStream(inputStream, self.verify_checksum)
             primary_key, attribute_columns = codedInputStream.read_row()
             return_row = Row(primary_key, attribute_columns)
 
         return (consumed, return_row), proto
 
-    def _decode_batch_get_row(self, body, request_id):
+    def _decode_batch_get_row(self, body, request_id, lazy_rows=False):
         proto = pb.BatchGetRowResponse()
         proto.ParseFromString(body)
 
-        rows = self._parse_batch_get_row(proto.tables)
+        rows = self._parse_batch_get_row(proto.tables, lazy_rows)
         return rows, proto
 
     def _decode_batch_write_row(self, body, request_id):
@@ -402,7 +434,7 @@ class OTSProtoBufferDecoder(object):
         rows = self._parse_batch_write_row(proto.tables)
         return rows, proto
 
-    def _decode_get_range(self, body, request_id):
+    def _decode_get_range(self, body, request_id, lazy_rows=False):
         proto = pb.GetRangeResponse()
         proto.ParseFromString(body)
 
@@ -412,23 +444,46 @@ class OTSProtoBufferDecoder(object):
         row_list = []
         if len(proto.next_start_primary_key) != 0:
             inputStream = PlainBufferInputStream(proto.next_start_primary_key)
-            codedInputStream = PlainBufferCodedInputStream(inputStream)
+            codedInputStream = PlainBufferCodedInputStream(inputStream, self.verify_checksum)
             next_start_pk, att = codedInputStream.read_row()
 
         if len(proto.rows) != 0:
             inputStream = PlainBufferInputStream(proto.rows)
-            codedInputStream = PlainBufferCodedInputStream(inputStream)
-            row_list = codedInputStream.read_rows()
+            codedInputStream = PlainBufferCodedInputStream(inputStream, self.verify_checksum)
+            if lazy_rows:
+                row_list = codedInputStream.read_lazy_rows()
+            else:
+                row_list = codedInputStream.read_rows()
 
         next_token = proto.next_token
 
         return (capacity_unit, next_start_pk, row_list, next_token), proto
 
-    def decode_response(self, api_name, response_body, request_id):
+    def _decode_compute_split_points_by_size(self, body, request_id):
+        proto = pb.ComputeSplitPointsBySizeResponse()
+        proto.ParseFromString(body)
+
+        consumed = self._parse_capacity_unit(proto.consumed.capacity_unit)
+        schema = self._parse_schema_list(proto.schema)
+
+        split_points = []
+        for split_point in proto.split_points:
+            inputStream = PlainBufferInputStream(split_point)
+            codedInputStream = PlainBufferCodedInputStream(inputStream, self.verify_checksum)
+            primary_key, attributes = codedInputStream.read_row()
+            split_points.append(primary_key)
+
+        response = ComputeSplitPointsBySizeResponse(consumed, schema, split_points)
+        response.set_request_id(request_id)
+        return response, proto
+
+    def decode_response(self, api_name, response_body, request_id, decode_options=None):
         if api_name not in self.api_decode_map:
             raise OTSClientError("No PB decode method for API %s" % api_name)
 
         handler = self.api_decode_map[api_name]
+        if decode_options:
+            return handler(response_body, request_id, **decode_options)
         return handler(response_body, request_id)
 
     def _parse_index_info(self, proto):
@@ -648,7 +703,7 @@ class OTSProtoBufferDecoder(object):
         rows = []
         for row_proto in proto.rows:
             input_stream = PlainBufferInputStream(row_proto)
-            codedInputStream = PlainBufferCodedInputStream(input_stream)
+            codedInputStream = PlainBufferCodedInputStream(input_stream, self.verify_checksum)
             primary_key_columns, attribute_columns = codedInputStream.read_row()
             rows.append((primary_key_columns, attribute_columns))
         total_count = proto.total_hits
@@ -752,7 +807,7 @@ class OTSProtoBufferDecoder(object):
             rows = []
             for row_proto in proto.rows:
                 input_stream = PlainBufferInputStream(row_proto)
-                codedInputStream = PlainBufferCodedInputStream(input_stream)
+                codedInputStream = PlainBufferCodedInputStream(input_stream, self.verify_checksum)
                 primary_key_columns, attribute_columns = codedInputStream.read_row()
                 rows.append((primary_key_columns, attribute_columns))
             return rows
@@ -881,7 +936,7 @@ class OTSProtoBufferDecoder(object):
         rows = []
         for row_proto in proto.rows:
             input_stream = PlainBufferInputStream(row_proto)
-            codedInputStream = PlainBufferCodedInputStream(input_stream)
+            codedInputStream = PlainBufferCodedInputStream(input_stream, self.verify_checksum)
             primary_key_columns, attribute_columns = codedInputStream.read_row()
             rows.append((primary_key_columns, attribute_columns))
 
@@ -925,12 +980,12 @@ class OTSProtoBufferDecoder(object):
         proto = timeseries_pb2.PutTimeseriesDataResponse()
         proto.ParseFromString(body)
 
-        resp = PutTimeseriesDataResponse()
+        resp = PutTimeseriesDataResponse([])
         for failed in proto.failed_rows:
             resp.failedRows.append(self._parse_timeseries_failed_rows(failed))
         return resp, proto
 
-    def _decode_exe_sql_query(self, body, request_id):
+    def _decode_exe_sql_query(self, body, request_id, columnar=False):
         proto = pb.SQLQueryResponse()
         proto.ParseFromString(body)
 
@@ -952,6 +1007,13 @@ class OTSProtoBufferDecoder(object):
             search_capacity_unit = (search_consume.table_name, capacity_unit)
             search_capacity_units.append(search_capacity_unit)
 
+        if columnar:
+            rows = {}
+            if len(proto.rows) != 0:
+                rows = flat_buffer_decoder.format_flat_buffer_columns_as_numpy(
+                    SQLResponseColumns.GetRootAsSQLResponseColumns(proto.rows))
+            return (rows, table_capacity_units, search_capacity_units), proto
+
         rows = []
         if len(proto.rows) != 0:
             columns = flat_buffer_decoder.format_flat_buffer_columns(
@@ -1037,11 +1099,7 @@ class OTSProtoBufferDecoder(object):
         return UpdateTimeseriesMetaResponse(fails), proto
 
     def _parse_timeseries_failed_rows(self, proto):
-        result = FailedRowResult()
-        result.index = proto.row_index
-        result.error.code = proto.error_code
-        result.error.message = proto.error_message
-        return result
+        return FailedRowResult(proto.row_index, Error(proto.error_code, proto.error_message))
 
     def _decode_delete_timeseries_meta(self, body, request_id):
         proto = timeseries_pb2.DeleteTimeseriesMetaResponse()
@@ -1086,23 +1144,26 @@ class OTSProtoBufferDecoder(object):
             res[tag.name] = tag.value
         return res
 
-    def _decode_get_timeseries_data(self, body, request_id):
+    def _decode_get_timeseries_data(self, body, request_id, columnar=False):
         proto = timeseries_pb2.GetTimeseriesDataResponse()
         proto.ParseFromString(body)
         res = GetTimeseriesDataResponse()
         if proto.HasField('next_token'):
             res.nextToken = proto.next_token
+        row_list = []
         if len(proto.rows_data) != 0:
             inputStream = PlainBufferInputStream(proto.rows_data)
-            codedInputStream = PlainBufferCodedInputStream(inputStream)
+            codedInputStream = PlainBufferCodedInputStream(inputStream, self.verify_checksum)
             row_list = codedInputStream.read_rows()
-            rows = []
-            for row in row_list:
-                rows.append(self._parse_timeseries_rows_plain_buffer(row))
-            res.rows = rows
+        if columnar:
+            res.rows = self._parse_timeseries_rows_as_columns(row_list)
+        elif len(row_list) != 0:
+            # the rows of one response usually belong to a few timeseries, parse their tags once
+            parsed_tags = {}
+            res.rows = [self._parse_timeseries_rows_plain_buffer(row, parsed_tags) for row in row_list]
         return res, proto
 
-    def _parse_timeseries_rows_plain_buffer(self, row):
+    def _parse_timeseries_rows_plain_buffer(self, row, parsed_tags=None):
         measurement = None
         source = None
         tags_str = None
@@ -1124,7 +1185,12 @@ class OTSProtoBufferDecoder(object):
             elif pkcell[0] != "_#h":
                 tags[pkcell[0]] = pkcell[1]
         if tags_str is not None:
-            tags.update(self._parse_timeseries_tag_or_attribute(tags_str))
+            if parsed_tags is None:
+                tags.update(self._parse_timeseries_tag_or_attribute(tags_str))
+            else:
+                if tags_str not in parsed_tags:
+                    parsed_tags[tags_str] = self._parse_timeseries_tag_or_attribute(tags_str)
+                tags.update(parsed_tags[tags_str])
         if time == -1:
             raise OTSClientError('no time column in timeesries row')
 
@@ -1135,6 +1201,35 @@ class OTSProtoBufferDecoder(object):
 
         return TimeseriesRow(key, fields, time)
 
+    def _parse_timeseries_rows_as_columns(self, row_list):
+        # Return (times, fields), times is an int64 array and fields is an OrderedDict from the field name
+        # to (values, is_null) in the order of appearance, the same shape as the columnar SQL result.
+        times = numpy.empty(len(row_list), dtype=numpy.int64)
+        columns = collections.OrderedDict()
+        field_names = {}
+        for index, row in enumerate(row_list):
+            time = None
+            for pk_index, pkcell in enumerate(row.primary_key):
+                if pkcell[0] == "_time":
+                    time = pkcell[1]
+                    break
+            if time is None:
+                raise OTSClientError('no time column in timeesries row')
+            times[index] = time
+            for cell in row.attribute_columns:
+                # the name of an attribute column is "field_name:type"
+                name = field_names.get(cell[0])
+                if name is None:
+                    name = field_names[cell[0]] = cell[0].split(":")[0]
+                columns.setdefault(name, {})[index] = cell[1]
+            for cell in row.primary_key[pk_index + 1:]:
+                columns.setdefault(cell[0], {})[index] = cell[1]
+
+        fields = collections.OrderedDict()
+        for name, column in columns.items():
+            fields[name] = _timeseries_column_as_numpy(column, len(row_list))
+        return times, fields
+
     def _parse_attribute_columns(self, columns):
         res = {}
         for i in range(0, len(columns)):
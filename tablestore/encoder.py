@@ -1,5 +1,6 @@
 # -*- coding: utf8 -*-#
 
+import copy
 import six
 from builtins import int
 
@@ -81,6 +82,20 @@ ROW_EXISTENCE_EXPECTATION_MAP = {
 }
 
 
+def _encode_varint(value):
+    data = bytearray()
+    while value > 0x7f:
+        data.append((value & 0x7f) | 0x80)
+        value >>= 7
+    data.append(value)
+    return bytes(data)
+
+
+def _encode_bytes_field(field_number, value):
+    # the tag and the length of a length-delimited protobuf field followed by the value
+    return _encode_varint((field_number << 3) | 2) + _encode_varint(len(value)) + value
+
+
 class OTSProtoBufferEncoder(object):
 
     def __init__(self, encoding):
@@ -99,6 +114,7 @@ class OTSProtoBufferEncoder(object):
             'BatchGetRow'           : self._encode_batch_get_row,
             'BatchWriteRow'         : self._encode_batch_write_row,
             'GetRange'              : self._encode_get_range,
+            'ComputeSplitPointsBySize': self._encode_compute_split_points_by_size,
             'ListSearchIndex'       : self._encode_list_search_index,
             'CreateSearchIndex'     : self._encode_create_search_index,
             'UpdateSearchIndex'     : self._encode_update_search_index,
@@ -761,7 +777,7 @@ class OTSProtoBufferEncoder(object):
                 table_item.filter = pb_filter.SerializeToString()
 
             for pk in item.primary_keys:
-                table_item.primary_key.append(bytes(PlainBufferBuilder.serialize_primary_key(pk)))
+                table_item.primary_key.append(PlainBufferBuilder.serialize_primary_key(pk))
             if item.token is not None:
                 for token in item.token:
                     table_item.token.append(token)
@@ -794,8 +810,8 @@ class OTSProtoBufferEncoder(object):
         if put_row_item.return_type == ReturnType.RT_PK:
             proto.return_content.return_type = pb2.RT_PK
 
-        proto.row_change = bytes(PlainBufferBuilder.serialize_for_put_row(
-                put_row_item.row.primary_key, put_row_item.row.attribute_columns))
+        proto.row_change = PlainBufferBuilder.serialize_for_put_row(
+                put_row_item.row.primary_key, put_row_item.row.attribute_columns)
         proto.type = pb2.PUT
         return proto
 
@@ -808,8 +824,8 @@ class OTSProtoBufferEncoder(object):
         if update_row_item.return_type == ReturnType.RT_PK:
             proto.return_content.return_type = pb2.RT_PK
 
-        proto.row_change = bytes(PlainBufferBuilder.serialize_for_update_row(
-                update_row_item.row.primary_key, update_row_item.row.attribute_columns))
+        proto.row_change = PlainBufferBuilder.serialize_for_update_row(
+                update_row_item.row.primary_key, update_row_item.row.attribute_columns)
         proto.type = pb2.UPDATE
         return proto
 
@@ -822,7 +838,7 @@ class OTSProtoBufferEncoder(object):
         if delete_row_item.return_type == ReturnType.RT_PK:
             proto.return_content.return_type = pb2.RT_PK
 
-        proto.row_change = bytes(PlainBufferBuilder.serialize_for_delete_row(delete_row_item.row.primary_key))
+        proto.row_change = PlainBufferBuilder.serialize_for_delete_row(delete_row_item.row.primary_key)
         proto.type = pb2.DELETE
         return proto
 
@@ -898,8 +914,11 @@ class OTSProtoBufferEncoder(object):
         proto.table_name = self._get_unicode(table_name)
         return proto
 
-    def _encode_get_row(self, table_name, primary_key, columns_to_get, column_filter,
-                        max_version, time_range, start_column, end_column, token, transaction_id):
+    def encode_prepared_get_row(self, table_name, columns_to_get, column_filter, max_version):
+        proto = self._make_get_row_template(table_name, columns_to_get, column_filter, max_version)
+        return PreparedGetRow(table_name, columns_to_get, column_filter, max_version, proto.SerializePartialToString())
+
+    def _make_get_row_template(self, table_name, columns_to_get, column_filter, max_version):
         proto = pb2.GetRowRequest()
         proto.table_name = self._get_unicode(table_name)
         self._make_repeated_str(proto.columns_to_get, columns_to_get)
@@ -909,9 +928,24 @@ class OTSProtoBufferEncoder(object):
             self._make_column_condition(pb_filter, column_filter)
             proto.filter = pb_filter.SerializeToString()
 
-        proto.primary_key = bytes(PlainBufferBuilder.serialize_primary_key(primary_key))
         if max_version is not None:
             proto.max_versions = max_version
+        return proto
+
+    def _encode_prepared_row_request(self, prepared, row_data, transaction_id, transaction_id_field):
+        data = prepared.request_bytes + _encode_bytes_field(2, row_data)
+        if transaction_id is not None:
+            data += _encode_bytes_field(transaction_id_field, self._get_unicode(transaction_id).encode('utf-8'))
+        return data
+
+    def _encode_get_row(self, table_name, primary_key, columns_to_get, column_filter,
+                        max_version, time_range, start_column, end_column, token, transaction_id, prepared=None):
+        if prepared is not None:
+            return self._encode_prepared_row_request(
+                prepared, PlainBufferBuilder.serialize_primary_key(primary_key), transaction_id, 11)
+
+        proto = self._make_get_row_template(table_name, columns_to_get, column_filter, max_version)
+        proto.primary_key = PlainBufferBuilder.serialize_primary_key(primary_key)
         if time_range is not None:
             if isinstance(time_range, tuple):
                 proto.time_range.start_time = time_range[0]
@@ -930,7 +964,11 @@ class OTSProtoBufferEncoder(object):
 
         return proto
 
-    def _encode_put_row(self, table_name, row, condition, return_type, transaction_id):
+    def encode_prepared_put_row(self, table_name, condition, return_type):
+        proto = self._make_put_row_template(table_name, condition, return_type)
+        return PreparedPutRow(table_name, condition, return_type, proto.SerializePartialToString())
+
+    def _make_put_row_template(self, table_name, condition, return_type):
         proto = pb2.PutRowRequest()
         proto.table_name = self._get_unicode(table_name)
         if condition is None:
@@ -938,8 +976,16 @@ class OTSProtoBufferEncoder(object):
         self._make_condition(proto.condition, condition)
         if return_type == ReturnType.RT_PK:
             proto.return_content.return_type = pb2.RT_PK
+        return proto
+
+    def _encode_put_row(self, table_name, row, condition, return_type, transaction_id, prepared=None):
+        if prepared is not None:
+            return self._encode_prepared_row_request(
+                prepared, PlainBufferBuilder.serialize_for_put_row(row.primary_key, row.attribute_columns),
+                transaction_id, 5)
 
-        proto.row = bytes(PlainBufferBuilder.serialize_for_put_row(row.primary_key, row.attribute_columns))
+        proto = self._make_put_row_template(table_name, condition, return_type)
+        proto.row = PlainBufferBuilder.serialize_for_put_row(row.primary_key, row.attribute_columns)
         if transaction_id is not None:
             proto.transaction_id = transaction_id
 
@@ -955,7 +1001,7 @@ class OTSProtoBufferEncoder(object):
         if return_type == ReturnType.RT_PK:
             proto.return_content.return_type = pb2.RT_PK
 
-        proto.row_change = bytes(PlainBufferBuilder.serialize_for_update_row(row.primary_key, row.attribute_columns))
+        proto.row_change = PlainBufferBuilder.serialize_for_update_row(row.primary_key, row.attribute_columns)
         if transaction_id is not None:
             proto.transaction_id = transaction_id
 
@@ -971,7 +1017,7 @@ class OTSProtoBufferEncoder(object):
         if return_type == ReturnType.RT_PK:
             proto.return_content.return_type = pb2.RT_PK
 
-        proto.primary_key = bytes(PlainBufferBuilder.serialize_for_delete_row(primary_key))
+        proto.primary_key = PlainBufferBuilder.serialize_for_delete_row(primary_key)
         if transaction_id is not None:
             proto.transaction_id = transaction_id
 
@@ -997,8 +1043,8 @@ class OTSProtoBufferEncoder(object):
         proto.direction = self._get_direction(direction)
         self._make_repeated_str(proto.columns_to_get, columns_to_get)
 
-        proto.inclusive_start_primary_key = bytes(PlainBufferBuilder.serialize_primary_key(inclusive_start_primary_key))
-        proto.exclusive_end_primary_key = bytes(PlainBufferBuilder.serialize_primary_key(exclusive_end_primary_key))
+        proto.inclusive_start_primary_key = PlainBufferBuilder.serialize_primary_key(inclusive_start_primary_key)
+        proto.exclusive_end_primary_key = PlainBufferBuilder.serialize_primary_key(exclusive_end_primary_key)
 
         if column_filter is not None:
             pb_filter = filter_pb2.Filter()
@@ -1025,6 +1071,14 @@ class OTSProtoBufferEncoder(object):
             proto.transaction_id = transaction_id
         return proto
 
+    def _encode_compute_split_points_by_size(self, table_name, split_size, split_size_unit_in_byte):
+        proto = pb2.ComputeSplitPointsBySizeRequest()
+        proto.table_name = self._get_unicode(table_name)
+        proto.split_size = self._get_int64(split_size)
+        if split_size_unit_in_byte is not None:
+            proto.split_size_unit_in_byte = self._get_int64(split_size_unit_in_byte)
+        return proto
+
     def encode_request(self, api_name, *args, **kwargs):
         if api_name not in self.api_encode_map:
             raise OTSClientError("No PB encode method for API %s" % api_name)
@@ -1087,7 +1141,7 @@ class OTSProtoBufferEncoder(object):
         proto.search_query = self._encode_search_query(search_query)
         if routing_keys is not None:
             for routing_key in routing_keys:
-                proto.routing_values.append(bytes(PlainBufferBuilder.serialize_primary_key(routing_key)))
+                proto.routing_values.append(PlainBufferBuilder.serialize_primary_key(routing_key))
 
         if timeout_s is not None:
             if not isinstance(timeout_s, int) and not isinstance(timeout_s, float):
@@ -1380,13 +1434,13 @@ class OTSProtoBufferEncoder(object):
     def _make_collapse(self, proto, collapse):
         proto.field_name = collapse.field_name
 
-    def _encode_search_query(self, search_query):
-        proto = search_pb2.SearchQuery()
-        self._make_query(proto.query, search_query.query)
-
-        if search_query.sort is not None:
-            self._make_index_sort(proto.sort, search_query.sort)
+    def encode_prepared_search_query(self, search_query):
+        query = copy.copy(search_query)
+        query.get_total_count = query.next_token = query.offset = query.limit = None
+        return PreparedSearchQuery(self._encode_search_query(query), search_query.get_total_count,
+                                   search_query.next_token, search_query.offset, search_query.limit)
 
+    def _make_search_paging(self, proto, search_query):
         if search_query.get_total_count is not None:
             proto.get_total_count = search_query.get_total_count
 
@@ -1399,6 +1453,21 @@ class OTSProtoBufferEncoder(object):
         if search_query.limit is not None:
             proto.limit = search_query.limit
 
+    def _encode_search_query(self, search_query):
+        if isinstance(search_query, PreparedSearchQuery):
+            # the fields of the concatenated messages are merged by the parser of protobuf
+            proto = search_pb2.SearchQuery()
+            self._make_search_paging(proto, search_query)
+            return search_query.query_bytes + proto.SerializeToString()
+
+        proto = search_pb2.SearchQuery()
+        self._make_query(proto.query, search_query.query)
+
+        if search_query.sort is not None:
+            self._make_index_sort(proto.sort, search_query.sort)
+
+        self._make_search_paging(proto, search_query)
+
         if search_query.collapse is not None:
             self._make_collapse(proto.collapse, search_query.collapse)
 
@@ -1527,7 +1596,7 @@ class OTSProtoBufferEncoder(object):
     def _encode_start_local_transaction(self, table_name, key):
         proto = pb2.StartLocalTransactionRequest()
         proto.table_name = table_name
-        proto.key = bytes(PlainBufferBuilder.serialize_primary_key(key))
+        proto.key = PlainBufferBuilder.serialize_primary_key(key)
 
         return proto
 
@@ -1549,13 +1618,17 @@ class OTSProtoBufferEncoder(object):
         proto.version = 2
         return proto
 
-    def _encode_put_timeseries_data(self, timeseries_table_name, timeseries_rows):
+    def _encode_put_timeseries_data(self, timeseries_table_name, timeseries_rows, timeseries_columns=None):
         proto = timeseries_pb2.PutTimeseriesDataRequest()
         proto.table_name = self._get_unicode(timeseries_table_name)
         proto.meta_update_mode = timeseries_pb2.MUM_NORMAL
         proto.supported_table_version = self._get_int32(SUPPORT_TABLE_VERSION)
 
-        flat_buffer_data = get_column_val_by_tp(timeseries_table_name, timeseries_rows)
+        if timeseries_columns is not None:
+            # (timeseries_key, timestamps, fields) of put_timeseries_columns
+            flat_buffer_data = get_column_val_by_columns(*timeseries_columns)
+        else:
+            flat_buffer_data = get_column_val_by_tp(timeseries_table_name, timeseries_rows)
         databytes = bytes(flat_buffer_data)
         proto.rows_data.rows_data = databytes
         crc = self.unsigned_to_signed(crc32c.crc32c(databytes) & 0xffffffff, 32)
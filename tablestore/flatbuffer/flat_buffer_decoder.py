@@ -5,6 +5,7 @@ from tablestore.flatbuffer.dataprotocol.BytesValue import BytesValue
 from tablestore.flatbuffer.dataprotocol.DataType import *
 import sys
 import collections
+import numpy
 from tablestore.flatbuffer.dataprotocol.ColumnValues import *
 from tablestore.flatbuffer.dataprotocol.RLEStringValues import RLEStringValues
 
@@ -75,6 +76,75 @@ class flat_buffer_decoder(object):
             columns_meta[col_name] = flat_buffer_decoder.gen_meta_column(col_val,col_tp)
         return columns_meta
     
+    @staticmethod
+    def gen_numpy_column(col_val: ColumnValues, col_tp: DataType):
+        """
+        Return (values, is_null) of a column as numpy arrays. The values at the null positions are undefined.
+        The numeric arrays are read only views of the response buffer.
+        """
+        is_null = col_val.IsNullvaluesAsNumpy()
+        if not isinstance(is_null, numpy.ndarray):
+            is_null = numpy.zeros(0, dtype=numpy.bool_)
+
+        if col_tp == DataType.LONG:
+            values = flat_buffer_decoder._numpy_or_empty(col_val.LongValuesAsNumpy(), numpy.int64)
+        elif col_tp == DataType.BOOLEAN:
+            values = flat_buffer_decoder._numpy_or_empty(col_val.BoolValuesAsNumpy(), numpy.bool_)
+        elif col_tp == DataType.DOUBLE:
+            values = flat_buffer_decoder._numpy_or_empty(col_val.DoubleValuesAsNumpy(), numpy.float64)
+        elif col_tp == DataType.STRING:
+            values = numpy.empty(col_val.StringValuesLength(), dtype=object)
+            values[:] = [col_val.StringValues(i).decode('UTF-8') for i in range(len(values))]
+        elif col_tp == DataType.BINARY:
+            values = numpy.empty(col_val.BinaryValuesLength(), dtype=object)
+            values[:] = [flat_buffer_decoder._numpy_bytes_value(col_val.BinaryValues(i)) for i in range(len(values))]
+        elif col_tp == DataType.STRING_RLE:
+            values = flat_buffer_decoder.gen_numpy_rle_string_values(col_val.RleStringValues())
+        else:
+            values = numpy.full(len(is_null), None, dtype=object)
+
+        if len(is_null) != len(values):
+            raise ValueError("the length of unpacked values not equal to null map")
+        return values, is_null
+
+    @staticmethod
+    def gen_numpy_rle_string_values(values: Optional[RLEStringValues]):
+        if values is None:
+            return numpy.empty(0, dtype=object)
+        # every distinct string is decoded once, and the rows are expanded by the index mapping
+        array = numpy.empty(values.ArrayLength(), dtype=object)
+        array[:] = [values.Array(i).decode('UTF-8') for i in range(len(array))]
+        index_mapping = flat_buffer_decoder._numpy_or_empty(values.IndexMappingAsNumpy(), numpy.int32)
+        return array[index_mapping]
+
+    @staticmethod
+    def _numpy_or_empty(array, dtype):
+        # the *AsNumpy accessors return 0 when the vector is absent
+        if isinstance(array, numpy.ndarray):
+            return array
+        return numpy.zeros(0, dtype=dtype)
+
+    @staticmethod
+    def _numpy_bytes_value(bytes_value: Optional[BytesValue]):
+        if bytes_value is None:
+            return None
+        value = bytes_value.ValueAsNumpy()
+        if not isinstance(value, numpy.ndarray):
+            return b''
+        return value.tobytes()
+
+    @staticmethod
+    def format_flat_buffer_columns_as_numpy(columns):
+        """
+        Return a dict from the column name to (values, is_null), in the order of the columns.
+        """
+        columns_data = collections.OrderedDict()
+        for i in range(columns.ColumnsLength()):
+            column = columns.Columns(i)
+            col_name = flat_buffer_decoder.byte_to_str_decode(column.ColumnName())
+            columns_data[col_name] = flat_buffer_decoder.gen_numpy_column(column.ColumnValue(), column.ColumnType())
+        return columns_data
+
     @staticmethod
     def columns_to_rows(columns_meta):
         res_list = []
@@ -1,4 +1,7 @@
+import array
+
 import six
+import numpy
 
 from tablestore.error import *
 from .timeseries.DataType import *
@@ -13,21 +16,299 @@ import flatbuffers
 
 
 def get_column_val_by_tp(timeseries_table_name, timeseries_rows):
-    builder = flatbuffers.Builder()
-
-    row_group_offs = []
-    for index in range(len(timeseries_rows)):
-        row = timeseries_rows[index]
-        off = build_row_to_row_group_offset(row, builder, timeseries_table_name)
-        row_group_offs.append(off)
-
-    row_group_vector_offs = build_row_group_vectors(row_group_offs, builder)
-    FlatBufferRows.FlatBufferRowsStart(builder)
-    FlatBufferRows.FlatBufferRowsAddRowGroups(builder, row_group_vector_offs)
-    rows_offset = FlatBufferRows.FlatBufferRowsEnd(builder)
-    builder.Finish(rows_offset)
-
-    return builder.Output()
+    encoder = TimeseriesFlatBufferEncoder()
+    for row in timeseries_rows:
+        encoder.add_row(row.timeseries_key, row.fields, row.time_in_us)
+    return encoder.finish()
+
+
+def get_column_val_by_columns(timeseries_key, timestamps, fields):
+    encoder = TimeseriesFlatBufferEncoder()
+    encoder.add_columns(timeseries_key, timestamps, fields)
+    return encoder.finish()
+
+
+_FIELD_TYPES = {
+    bool: DataType.BOOLEAN,
+    int: DataType.LONG,
+    float: DataType.DOUBLE,
+    six.text_type: DataType.STRING,
+    six.binary_type: DataType.STRING,
+    bytearray: DataType.BINARY,
+}
+
+_NUMPY_TYPES = {
+    DataType.LONG: numpy.dtype('<i8'),
+    DataType.DOUBLE: numpy.dtype('<f8'),
+    DataType.BOOLEAN: numpy.dtype(numpy.bool_),
+}
+
+
+def get_field_type(value):
+    field_type = _FIELD_TYPES.get(type(value))
+    if field_type is not None:
+        return field_type
+    if isinstance(value, (bool, numpy.bool_)):
+        return DataType.BOOLEAN
+    if isinstance(value, (int, numpy.integer)):
+        return DataType.LONG
+    if isinstance(value, six.text_type) or isinstance(value, six.binary_type):
+        return DataType.STRING
+    if isinstance(value, bytearray):
+        return DataType.BINARY
+    if isinstance(value, (float, numpy.floating)):
+        return DataType.DOUBLE
+    raise OTSClientError("Unsupported column type: " + str(type(value)))
+
+
+_INT64_MAX = (1 << 63) - 1
+
+
+def _check_int64(name, values):
+    # numpy casts the unsigned integers greater than the int64 maximum to negative values silently
+    if values.dtype.kind == 'u' and len(values) != 0 and values.max() > _INT64_MAX:
+        raise OTSClientError("the values of %s should not be greater than %d." % (name, _INT64_MAX))
+    return values
+
+
+def _field_column(name, values):
+    # return the type of a field and its values, the numeric values are returned as a numpy array
+    if isinstance(values, numpy.ndarray):
+        if values.ndim != 1:
+            raise OTSClientError("the values of field %s should be a one dimensional array." % name)
+        if values.dtype.kind == 'b':
+            return DataType.BOOLEAN, values
+        if values.dtype.kind in 'iu':
+            return DataType.LONG, _check_int64('field ' + name, values)
+        if values.dtype.kind == 'f':
+            return DataType.DOUBLE, values
+        values = values.tolist()
+    elif isinstance(values, array.array):
+        values = numpy.asarray(values)
+        if values.dtype.kind in 'iu':
+            return DataType.LONG, _check_int64('field ' + name, values)
+        if values.dtype.kind == 'f':
+            return DataType.DOUBLE, values
+        values = values.tolist()
+    else:
+        values = list(values)
+    if len(values) == 0:
+        return DataType.LONG, values
+
+    field_type = get_field_type(values[0])
+    for value in values:
+        if get_field_type(value) != field_type:
+            raise OTSClientError("the values of field %s should have the same type." % name)
+    if field_type in _NUMPY_TYPES:
+        return field_type, numpy.asarray(values, dtype=_NUMPY_TYPES[field_type])
+    return field_type, values
+
+
+class TimeseriesFlatBufferEncoder(object):
+    """
+    Encode timeseries rows into one FlatBufferRows in a batch.
+
+    Consecutive rows with the same measurement and the same field names and types share one row group,
+    so the rows are never reordered and the indexes of the failed rows still refer to the input.
+    The strings, the tag lists and the field name and type vectors are written once and shared by the rows,
+    and the long, double and bool vectors of every row are written from numpy arrays.
+    """
+
+    def __init__(self, initial_size=1024):
+        self.builder = flatbuffers.Builder(initial_size)
+        self._strings = {}
+        self._tag_lists = {}
+        self._field_names = {}
+        self._field_name_vectors = {}
+        self._field_type_vectors = {}
+        self._row_groups = []
+        # the row group being built, it is written when a row of another group comes
+        self._group = None
+        self._group_rows = []
+
+    def add_row(self, timeseries_key, fields, time_in_us):
+        field_names = self._get_field_names(fields)
+        field_types = tuple(get_field_type(fields[name]) for name in field_names)
+        self._switch_group(timeseries_key.measurement_name, field_names, field_types)
+        field_values = self._build_field_values(field_types, [fields[name] for name in field_names])
+        self._group_rows.append(self._build_row_in_group(timeseries_key, field_values, time_in_us))
+
+    def add_columns(self, timeseries_key, timestamps, fields):
+        """
+        Add the points of one timeseries. ``timestamps`` is the time in microseconds of every point, and ``fields``
+        maps the field name to the values of every point. The arrays can be numpy arrays, array.array or lists.
+        """
+        if isinstance(timestamps, (numpy.ndarray, array.array)):
+            _check_int64('timestamps', numpy.asarray(timestamps))
+        timestamps = numpy.asarray(timestamps, dtype=numpy.int64)
+        if timestamps.ndim != 1:
+            raise OTSClientError("timestamps should be a one dimensional array.")
+        field_names = tuple(sorted(fields.keys()))
+        columns = []
+        for name in field_names:
+            field_type, values = _field_column(name, fields[name])
+            if len(values) != len(timestamps):
+                raise OTSClientError("the length of field %s is %d, but the length of timestamps is %d."
+                                     % (name, len(values), len(timestamps)))
+            columns.append((field_type, values))
+        if len(timestamps) == 0:
+            return
+        field_types = tuple(field_type for field_type, _ in columns)
+        self._switch_group(timeseries_key.measurement_name, field_names, field_types)
+
+        # one matrix of (points, fields) for every numeric type, the values of a point are one row of it
+        typed_columns = {}
+        for field_type, values in columns:
+            typed_columns.setdefault(field_type, []).append(values)
+        for field_type in typed_columns:
+            if field_type in _NUMPY_TYPES:
+                typed_columns[field_type] = numpy.ascontiguousarray(
+                    numpy.column_stack(typed_columns[field_type]), dtype=_NUMPY_TYPES[field_type])
+
+        for index in range(len(timestamps)):
+            typed_values = {}
+            for field_type, values in typed_columns.items():
+                if field_type in _NUMPY_TYPES:
+                    typed_values[field_type] = values[index]
+                else:
+                    typed_values[field_type] = [column[index] for column in values]
+            field_values = self._build_field_values_by_type(typed_values)
+            self._group_rows.append(self._build_row_in_group(timeseries_key, field_values, int(timestamps[index])))
+
+    def finish(self):
+        self._finish_group()
+        builder = self.builder
+        row_groups = self._build_offset_vector(FlatBufferRows.FlatBufferRowsStartRowGroupsVector, self._row_groups)
+        FlatBufferRows.FlatBufferRowsStart(builder)
+        FlatBufferRows.FlatBufferRowsAddRowGroups(builder, row_groups)
+        builder.Finish(FlatBufferRows.FlatBufferRowsEnd(builder))
+        return builder.Output()
+
+    def _get_field_names(self, fields):
+        keys = tuple(fields.keys())
+        field_names = self._field_names.get(keys)
+        if field_names is None:
+            field_names = tuple(sorted(keys))
+            self._field_names[keys] = field_names
+        return field_names
+
+    def _switch_group(self, measurement_name, field_names, field_types):
+        group = (measurement_name or "", field_names, field_types)
+        if group != self._group:
+            self._finish_group()
+            self._group = group
+
+    def _finish_group(self):
+        if not self._group_rows:
+            return
+        builder = self.builder
+        measurement_name, field_names, field_types = self._group
+        rows = self._build_offset_vector(FlatBufferRowGroup.FlatBufferRowGroupStartRowsVector, self._group_rows)
+        field_name_vector = self._field_name_vectors.get(field_names)
+        if field_name_vector is None:
+            field_name_vector = self._build_offset_vector(
+                FlatBufferRowGroup.FlatBufferRowGroupStartFieldNamesVector,
+                [self._string(name) for name in field_names])
+            self._field_name_vectors[field_names] = field_name_vector
+        field_type_vector = self._field_type_vectors.get(field_types)
+        if field_type_vector is None:
+            field_type_vector = builder.CreateNumpyVector(numpy.array(field_types, dtype=numpy.int8))
+            self._field_type_vectors[field_types] = field_type_vector
+        measurement_name = self._string(measurement_name)
+
+        FlatBufferRowGroup.FlatBufferRowGroupStart(builder)
+        FlatBufferRowGroup.FlatBufferRowGroupAddMeasurementName(builder, measurement_name)
+        FlatBufferRowGroup.FlatBufferRowGroupAddFieldNames(builder, field_name_vector)
+        FlatBufferRowGroup.FlatBufferRowGroupAddFieldTypes(builder, field_type_vector)
+        FlatBufferRowGroup.FlatBufferRowGroupAddRows(builder, rows)
+        self._row_groups.append(FlatBufferRowGroup.FlatBufferRowGroupEnd(builder))
+        self._group_rows = []
+
+    def _string(self, value):
+        offset = self._strings.get(value)
+        if offset is None:
+            offset = self.builder.CreateString(value)
+            self._strings[value] = offset
+        return offset
+
+    def _build_offset_vector(self, start_vector, offsets):
+        builder = self.builder
+        start_vector(builder, len(offsets))
+        for index in range(len(offsets) - 1, -1, -1):
+            builder.PrependUOffsetTRelative(offsets[index])
+        return builder.EndVector()
+
+    def _build_tag_list(self, tags):
+        tag_items = tuple(sorted(tags.items())) if tags else ()
+        tag_list = self._tag_lists.get(tag_items)
+        if tag_list is not None:
+            return tag_list
+        builder = self.builder
+        tag_offs = []
+        for name, value in tag_items:
+            name_off = self._string(name)
+            value_off = self._string(value)
+            Tag.TagStart(builder)
+            Tag.TagAddName(builder, name_off)
+            Tag.TagAddValue(builder, value_off)
+            tag_offs.append(Tag.TagEnd(builder))
+        tag_list = self._build_offset_vector(FlatBufferRowInGroup.FlatBufferRowInGroupStartTagListVector, tag_offs)
+        self._tag_lists[tag_items] = tag_list
+        return tag_list
+
+    def _build_field_values(self, field_types, values):
+        typed_values = {}
+        for field_type, value in zip(field_types, values):
+            typed_values.setdefault(field_type, []).append(value)
+        return self._build_field_values_by_type(typed_values)
+
+    def _build_field_values_by_type(self, typed_values):
+        # typed_values maps the type to the values of the row in the order of the field names,
+        # the long, double and bool values may be numpy arrays
+        builder = self.builder
+        vectors = {}
+        for field_type, values in typed_values.items():
+            if field_type in _NUMPY_TYPES:
+                vectors[field_type] = builder.CreateNumpyVector(
+                    numpy.asarray(values, dtype=_NUMPY_TYPES[field_type]))
+            elif field_type == DataType.STRING:
+                vectors[field_type] = self._build_offset_vector(
+                    FieldValues.FieldValuesStartStringValuesVector, [self._string(value) for value in values])
+            else:
+                binary_offs = []
+                for value in values:
+                    data = builder.CreateByteVector(bytes(value))
+                    BytesValue.BytesValueStart(builder)
+                    BytesValue.BytesValueAddValue(builder, data)
+                    binary_offs.append(BytesValue.BytesValueEnd(builder))
+                vectors[field_type] = self._build_offset_vector(
+                    FieldValues.FieldValuesStartBinaryValuesVector, binary_offs)
+
+        FieldValues.FieldValuesStart(builder)
+        if DataType.LONG in vectors:
+            FieldValues.FieldValuesAddLongValues(builder, vectors[DataType.LONG])
+        if DataType.BOOLEAN in vectors:
+            FieldValues.FieldValuesAddBoolValues(builder, vectors[DataType.BOOLEAN])
+        if DataType.DOUBLE in vectors:
+            FieldValues.FieldValuesAddDoubleValues(builder, vectors[DataType.DOUBLE])
+        if DataType.STRING in vectors:
+            FieldValues.FieldValuesAddStringValues(builder, vectors[DataType.STRING])
+        if DataType.BINARY in vectors:
+            FieldValues.FieldValuesAddBinaryValues(builder, vectors[DataType.BINARY])
+        return FieldValues.FieldValuesEnd(builder)
+
+    def _build_row_in_group(self, timeseries_key, field_values, time_in_us):
+        builder = self.builder
+        tag_list = self._build_tag_list(timeseries_key.tags)
+        data_source = self._string(timeseries_key.data_source or "")
+        tags = self._string("")
+        FlatBufferRowInGroup.FlatBufferRowInGroupStart(builder)
+        FlatBufferRowInGroup.FlatBufferRowInGroupAddDataSource(builder, data_source)
+        FlatBufferRowInGroup.FlatBufferRowInGroupAddTags(builder, tags)
+        FlatBufferRowInGroup.FlatBufferRowInGroupAddFieldValues(builder, field_values)
+        FlatBufferRowInGroup.FlatBufferRowInGroupAddTime(builder, time_in_us)
+        FlatBufferRowInGroup.FlatBufferRowInGroupAddTagList(builder, tag_list)
+        return FlatBufferRowInGroup.FlatBufferRowInGroupEnd(builder)
 
 
 def build_row_to_row_group_offset(timeseries_row, builder, timeseries_table_name):
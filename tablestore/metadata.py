@@ -1170,6 +1170,57 @@ class SearchQuery(DefaultJsonObject):
         self.highlight = highlight
 
 
+class PreparedGetRow(object):
+    """
+    A GetRow request without the primary key encoded once by ``prepare_get_row`` of the client, it is executed by ``execute_get_row``.
+    """
+
+    def __init__(self, table_name, columns_to_get, column_filter, max_version, request_bytes):
+        self.table_name = table_name
+        self.columns_to_get = columns_to_get
+        self.column_filter = column_filter
+        self.max_version = max_version
+        self.request_bytes = request_bytes
+
+    def __repr__(self):
+        return 'PreparedGetRow(table_name=%r, columns_to_get=%r, max_version=%r)' % (
+            self.table_name, self.columns_to_get, self.max_version)
+
+
+class PreparedPutRow(object):
+    """
+    A PutRow request without the row encoded once by ``prepare_put_row`` of the client, it is executed by ``execute_put_row``.
+    """
+
+    def __init__(self, table_name, condition, return_type, request_bytes):
+        self.table_name = table_name
+        self.condition = condition
+        self.return_type = return_type
+        self.request_bytes = request_bytes
+
+    def __repr__(self):
+        return 'PreparedPutRow(table_name=%r)' % self.table_name
+
+
+class PreparedSearchQuery(object):
+    """
+    A ``SearchQuery`` encoded once by ``prepare_search_query`` of the client, it is used in place of the SearchQuery in ``search``.
+    ``get_total_count``, ``next_token``, ``offset`` and ``limit`` are encoded on every search and can be changed
+    between the searches, the encoded bytes of the other parts of the query are reused as they are.
+    """
+
+    def __init__(self, query_bytes, get_total_count=False, next_token=None, offset=None, limit=None):
+        self.query_bytes = query_bytes
+        self.get_total_count = get_total_count
+        self.next_token = next_token
+        self.offset = offset
+        self.limit = limit
+
+    def __repr__(self):
+        return 'PreparedSearchQuery(%d bytes, get_total_count=%r, next_token=%r, offset=%r, limit=%r)' % (
+            len(self.query_bytes), self.get_total_count, self.next_token, self.offset, self.limit)
+
+
 class ScanQuery(DefaultJsonObject):
 
     def __init__(self, query, limit, next_token, current_parallel_id, max_parallel, alive_time=60):
@@ -1281,6 +1332,18 @@ class ParallelScanResponse(IterableResponse):
         self._add_response(self.rows, self.next_token)
 
 
+class ComputeSplitPointsBySizeResponse(IterableResponse):
+
+    def __init__(self, consumed, schema, split_points):
+        super(ComputeSplitPointsBySizeResponse, self).__init__()
+
+        self.consumed = consumed
+        self.schema = schema
+        self.split_points = split_points
+
+        self._add_response(self.consumed, self.schema, self.split_points)
+
+
 '''
     Search Hit
 '''
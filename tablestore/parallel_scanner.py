@@ -0,0 +1,314 @@
+# -*- coding: utf8 -*-
+# Implementation of ParallelScanner, a managed driver of ComputeSplits and ParallelScan
+
+__all__ = ['ParallelScanner', 'AsyncParallelScanner']
+
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from tablestore.error import *
+from tablestore.metadata import *
+
+# the number of pages buffered for each worker before the workers pause
+_PAGES_PER_WORKER = 2
+
+# the interval in seconds that a blocked worker checks whether the scan is stopped
+_POLL_INTERVAL = 0.1
+
+
+class _SplitFinished(object):
+    pass
+
+
+class _SplitFailure(object):
+    def __init__(self, error):
+        self.error = error
+
+
+_SPLIT_FINISHED = _SplitFinished()
+
+
+class _ParallelScannerBase(object):
+
+    def __init__(self, client, table_name, index_name, query, columns_to_get=None, max_workers=None,
+                 limit=None, alive_time=60, timeout_s=None, retry_policy=None):
+        if max_workers is not None and max_workers <= 0:
+            raise OTSClientError("max_workers should be greater than 0.")
+        if not isinstance(alive_time, int) or alive_time <= 0:
+            raise OTSClientError("alive_time should be a positive integer.")
+
+        self.client = client
+        self.table_name = table_name
+        self.index_name = index_name
+        self.query = query
+        self.columns_to_get = columns_to_get
+        self.max_workers = max_workers
+        self.limit = limit
+        self.alive_time = alive_time
+        self.timeout_s = timeout_s
+        self.retry_policy = retry_policy if retry_policy is not None else client.retry_policy
+
+        self.session_id = None
+        self.splits_size = None
+        self._started = False
+        self._last_request_time = 0
+
+    def _start(self, compute_splits_response):
+        if self._started:
+            raise OTSClientError("ParallelScanner can only be iterated once.")
+        self._started = True
+        self.session_id = compute_splits_response.session_id
+        self.splits_size = compute_splits_response.splits_size
+
+    def _workers(self):
+        if self.max_workers is None:
+            return self.splits_size
+        return min(self.max_workers, self.splits_size)
+
+    def _scan_query(self, split_id, token, limit):
+        return ScanQuery(self.query, limit, token, split_id, self.splits_size, self.alive_time)
+
+    def _is_session_idle(self):
+        # the session expires after alive_time seconds without any ParallelScan request
+        return time.time() - self._last_request_time >= self.alive_time / 2.0
+
+    def _get_retry_delay(self, retry_times, error):
+        if not isinstance(error, OTSServiceError):
+            return None
+        if not self.retry_policy.should_retry(retry_times, error, 'ParallelScan'):
+            return None
+        return self.retry_policy.get_retry_delay(retry_times, error, 'ParallelScan')
+
+    @staticmethod
+    def _check_page(item, finished_splits):
+        if item is _SPLIT_FINISHED:
+            return finished_splits + 1
+        if isinstance(item, _SplitFailure):
+            raise item.error
+        return finished_splits
+
+
+class ParallelScanner(_ParallelScannerBase):
+    """
+    ``ParallelScanner`` scans all rows matching a query of a search index through ``OTSClient.compute_splits`` and
+    ``OTSClient.parallel_scan``.
+
+    The splits are scanned concurrently by at most ``max_workers`` threads, and their rows are returned by a single
+    iterator in no particular order. Every row is a tuple of (primary_key_columns, attribute_columns), the same as
+    the rows of ``ParallelScanResponse``. When the iterator is not consumed for a while, a blocked worker fetches one
+    more row of its split to keep the session alive. A split that fails with a retryable error is restarted from
+    its last ``next_token`` according to the retry policy, the rows already returned are not scanned again.
+
+    Example:
+
+        scanner = ParallelScanner(client, 'myTable', 'myIndex', TermQuery('k', 'key000'),
+                                  ColumnsToGet(return_type=ColumnReturnType.ALL_FROM_INDEX), max_workers=4)
+        for primary_key, attribute_columns in scanner:
+            print(primary_key, attribute_columns)
+    """
+
+    def __init__(self, client, table_name, index_name, query, columns_to_get=None, max_workers=None,
+                 limit=None, alive_time=60, timeout_s=None, retry_policy=None):
+        """
+        ``client`` is the ``OTSClient`` used to send the requests.
+        ``table_name`` and ``index_name`` are the names of the table and its search index.
+        ``query`` is the query of the scan, such as ``MatchAllQuery()``.
+        ``columns_to_get`` is an instance of ``tablestore.metadata.ColumnsToGet``, it is the same as ``OTSClient.parallel_scan``.
+        ``max_workers`` is the maximum number of splits scanned at the same time, the default is the number of splits.
+        ``limit`` is the maximum number of rows in one ParallelScan response, the default is decided by the server.
+        ``alive_time`` is the alive time in seconds of the session, it is the same as ``ScanQuery``.
+        ``timeout_s`` is the timeout of each ParallelScan request.
+        ``retry_policy`` decides whether a failed split is restarted, the default is the retry policy of ``client``.
+        """
+        super(ParallelScanner, self).__init__(client, table_name, index_name, query, columns_to_get, max_workers,
+                                              limit, alive_time, timeout_s, retry_policy)
+        self._stop_event = threading.Event()
+
+    def __iter__(self):
+        return self.scan()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """
+        Stop the workers. The rows not returned yet are dropped.
+        """
+        self._stop_event.set()
+
+    def scan(self):
+        """
+        Compute the splits and return an iterator of all rows.
+        """
+        self._start(self.client.compute_splits(self.table_name, self.index_name))
+        if self.splits_size <= 0:
+            return
+
+        workers = self._workers()
+        pages = queue.Queue(_PAGES_PER_WORKER * workers)
+        executor = ThreadPoolExecutor(max_workers=workers)
+        try:
+            for split_id in range(self.splits_size):
+                executor.submit(self._run_split, split_id, pages)
+
+            finished_splits = 0
+            while finished_splits < self.splits_size:
+                item = pages.get()
+                finished_splits = self._check_page(item, finished_splits)
+                if isinstance(item, list):
+                    for row in item:
+                        yield row
+        finally:
+            self._stop_event.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run_split(self, split_id, pages):
+        try:
+            if self._scan_split(split_id, pages):
+                self._put(pages, _SPLIT_FINISHED)
+        except Exception as e:
+            self._put(pages, _SplitFailure(e))
+
+    def _put(self, pages, item):
+        while not self._stop_event.is_set():
+            try:
+                pages.put(item, timeout=_POLL_INTERVAL)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _scan_split(self, split_id, pages):
+        token = None
+        while True:
+            response = self._fetch(split_id, token, self.limit)
+            if response is None:
+                return False
+            token = response.next_token
+            rows = list(response.rows)
+
+            while rows:
+                try:
+                    pages.put(rows, timeout=_POLL_INTERVAL)
+                    break
+                except queue.Full:
+                    if self._stop_event.is_set():
+                        return False
+                    if token and self._is_session_idle():
+                        response = self._fetch(split_id, token, 1)
+                        if response is None:
+                            return False
+                        token = response.next_token
+                        rows.extend(response.rows)
+
+            if not token:
+                return True
+
+    def _fetch(self, split_id, token, limit):
+        retry_times = 0
+        while not self._stop_event.is_set():
+            try:
+                self._last_request_time = time.time()
+                return self.client.parallel_scan(
+                    self.table_name, self.index_name, self._scan_query(split_id, token, limit),
+                    self.session_id, self.columns_to_get, self.timeout_s
+                )
+            except OTSError as e:
+                retry_delay = self._get_retry_delay(retry_times, e)
+                if retry_delay is None:
+                    raise
+                retry_times += 1
+                self._stop_event.wait(retry_delay)
+        return None
+
+
+class AsyncParallelScanner(_ParallelScannerBase):
+    """
+    The asyncio version of ``ParallelScanner``, ``client`` is an ``AsyncOTSClient``.
+    Every split is scanned by its own task, and at most ``max_workers`` splits are scanned at the same time.
+
+    Example:
+
+        scanner = AsyncParallelScanner(client, 'myTable', 'myIndex', MatchAllQuery(), max_workers=4)
+        async for primary_key, attribute_columns in scanner:
+            print(primary_key, attribute_columns)
+    """
+
+    def __aiter__(self):
+        return self.scan()
+
+    async def scan(self):
+        """
+        Compute the splits and return an async iterator of all rows.
+        """
+        self._start(await self.client.compute_splits(self.table_name, self.index_name))
+        if self.splits_size <= 0:
+            return
+
+        workers = self._workers()
+        semaphore = asyncio.Semaphore(workers)
+        pages = asyncio.Queue(_PAGES_PER_WORKER * workers)
+        tasks = [asyncio.ensure_future(self._run_split(split_id, pages, semaphore))
+                 for split_id in range(self.splits_size)]
+        try:
+            finished_splits = 0
+            while finished_splits < self.splits_size:
+                item = await pages.get()
+                finished_splits = self._check_page(item, finished_splits)
+                if isinstance(item, list):
+                    for row in item:
+                        yield row
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _run_split(self, split_id, pages, semaphore):
+        try:
+            async with semaphore:
+                await self._scan_split(split_id, pages)
+            await pages.put(_SPLIT_FINISHED)
+        except Exception as e:
+            await pages.put(_SplitFailure(e))
+
+    async def _scan_split(self, split_id, pages):
+        keep_alive_interval = self.alive_time / 2.0
+        token = None
+        while True:
+            response = await self._fetch(split_id, token, self.limit)
+            token = response.next_token
+            rows = list(response.rows)
+
+            while rows:
+                try:
+                    await asyncio.wait_for(pages.put(rows), keep_alive_interval)
+                    break
+                except asyncio.TimeoutError:
+                    if token and self._is_session_idle():
+                        response = await self._fetch(split_id, token, 1)
+                        token = response.next_token
+                        rows.extend(response.rows)
+
+            if not token:
+                return
+
+    async def _fetch(self, split_id, token, limit):
+        retry_times = 0
+        while True:
+            try:
+                self._last_request_time = time.time()
+                return await self.client.parallel_scan(
+                    self.table_name, self.index_name, self._scan_query(split_id, token, limit),
+                    self.session_id, self.columns_to_get, self.timeout_s
+                )
+            except OTSError as e:
+                retry_delay = self._get_retry_delay(retry_times, e)
+                if retry_delay is None:
+                    raise
+                retry_times += 1
+                await asyncio.sleep(retry_delay)
@@ -9,6 +9,7 @@ from .plain_buffer_consts import *
 from .plain_buffer_crc8 import *
 from .plain_buffer_stream import *
 from .plain_buffer_coded_stream import *
+from .plain_buffer_fast_encoder import *
 
 
 class PlainBufferBuilder(object):
@@ -172,34 +173,11 @@ class PlainBufferBuilder(object):
 
     @staticmethod
     def serialize_primary_key(primary_key):
-        buf_size = const.LITTLE_ENDIAN_SIZE
-        buf_size += PlainBufferBuilder.compute_primary_key_size(primary_key)
-        buf_size += 2
-
-        output_stream = PlainBufferOutputStream(buf_size)
-        coded_output_stream = PlainBufferCodedOutputStream(output_stream)
-
-        row_checksum = 0
-        coded_output_stream.write_header()
-
-        row_checksum = coded_output_stream.write_primary_key(primary_key, row_checksum)
-        row_checksum = PlainBufferCrc8.crc_int8(row_checksum, 0)
-        coded_output_stream.write_row_checksum(row_checksum)
-        return output_stream.get_buffer()
+        return PlainBufferFastEncoder.serialize_primary_key(primary_key)
 
     @staticmethod
     def serialize_for_put_row(primary_key, attribute_columns):
-        buf_size = PlainBufferBuilder.compute_put_row_size(primary_key, attribute_columns)
-        output_stream = PlainBufferOutputStream(buf_size)
-        coded_output_stream = PlainBufferCodedOutputStream(output_stream)
-
-        row_checksum = 0
-        coded_output_stream.write_header()
-        row_checksum = coded_output_stream.write_primary_key(primary_key, row_checksum)
-        row_checksum = coded_output_stream.write_columns(attribute_columns, row_checksum)
-        row_checksum = PlainBufferCrc8.crc_int8(row_checksum, 0)
-        coded_output_stream.write_row_checksum(row_checksum)
-        return output_stream.get_buffer()
+        return PlainBufferFastEncoder.serialize_for_put_row(primary_key, attribute_columns)
 
     @staticmethod
     def serialize_for_update_row(primary_key, attribute_columns):
@@ -215,27 +193,8 @@ class PlainBufferBuilder(object):
                     raise OTSClientError("the cell of update-row must be tuple, but is %s" %
                                          str(type(cell)))
 
-        buf_size = PlainBufferBuilder.compute_update_row_size(primary_key, attribute_columns)
-        output_stream = PlainBufferOutputStream(buf_size)
-        coded_output_stream = PlainBufferCodedOutputStream(output_stream)
-
-        row_checksum = 0
-        coded_output_stream.write_header()
-        row_checksum = coded_output_stream.write_primary_key(primary_key, row_checksum)
-        row_checksum = coded_output_stream.write_update_columns(attribute_columns, row_checksum)
-        row_checksum = PlainBufferCrc8.crc_int8(row_checksum, 0)
-        coded_output_stream.write_row_checksum(row_checksum)
-        return output_stream.get_buffer()
+        return PlainBufferFastEncoder.serialize_for_update_row(primary_key, attribute_columns)
 
     @staticmethod
     def serialize_for_delete_row(primary_key):
-        buf_size = PlainBufferBuilder.compute_delete_row_size(primary_key)
-        output_stream = PlainBufferOutputStream(buf_size)
-        coded_output_stream = PlainBufferCodedOutputStream(output_stream)
-
-        row_checksum = 0
-        coded_output_stream.write_header()
-        row_checksum = coded_output_stream.write_primary_key(primary_key, row_checksum)
-        row_checksum = coded_output_stream.write_delete_marker(row_checksum)
-        coded_output_stream.write_row_checksum(row_checksum)
-        return output_stream.get_buffer()
+        return PlainBufferFastEncoder.serialize_for_delete_row(primary_key)
@@ -10,10 +10,30 @@ from tablestore.error import *
 from .plain_buffer_consts import *
 from .plain_buffer_crc8 import *
 from .plain_buffer_consts import *
+from .plain_buffer_fast_decoder import *
 
 class PlainBufferCodedInputStream(object):
-    def __init__(self, input_stream):
+    # Whole rows are decoded by PlainBufferFastDecoder when the stream is not read yet.
+    # Set it to False to decode byte by byte with the reference implementation below.
+    use_fast_decoder = True
+    # Set it to False to skip the checksums of rows and cells, e.g. on trusted links.
+    # The clients pass the ``verify_checksum`` option of their own to every stream instead.
+    verify_checksum = True
+
+    def __init__(self, input_stream, verify_checksum=None):
         self.input_stream = input_stream
+        if verify_checksum is not None:
+            self.verify_checksum = verify_checksum
+
+    def _can_use_fast_decoder(self):
+        return (self.use_fast_decoder and self.input_stream.cur_pos == 0
+                and isinstance(self.input_stream.buffer, six.binary_type))
+
+    def _fast_decode(self, decode):
+        result = decode(self.input_stream.buffer, self.verify_checksum)
+        self.input_stream.cur_pos = self.input_stream.len
+        self.input_stream.last_tag = 0
+        return result
 
     def get_last_tag(self):
         return self.input_stream.get_last_tag()
@@ -112,10 +132,9 @@ class PlainBufferCodedInputStream(object):
         if input_stream.last_tag != TAG_CELL_NAME:
             raise OTSClientError("Expect TAG_CELL_NAME but it was " + str(ord(self.get_last_tag())))
         
-        cell_check_sum = 0
         name_size = input_stream.read_raw_little_endian32()
         column_name = input_stream.read_utf_string(name_size)
-        cell_check_sum = PlainBufferCrc8.crc_string(cell_check_sum, column_name)
+        cell_check_sum = PlainBufferCrc8.crc_column_name(column_name)
         input_stream.read_tag()
         
         if input_stream.last_tag != TAG_CELL_VALUE:
@@ -125,7 +144,7 @@ class PlainBufferCodedInputStream(object):
         
         if self.get_last_tag() == TAG_CELL_CHECKSUM:
             check_sum = ord(input_stream.read_raw_byte())
-            if check_sum != cell_check_sum:
+            if self.verify_checksum and check_sum != cell_check_sum:
                 raise OTSClientError("Checksum mismatch. expected:" + str(check_sum) + ",actual:" + str(cell_check_sum))
             input_stream.read_tag()
         else:
@@ -147,7 +166,7 @@ class PlainBufferCodedInputStream(object):
         timestamp = None
         name_size = input_stream.read_raw_little_endian32()
         column_name = input_stream.read_utf_string(name_size)
-        cell_check_sum = PlainBufferCrc8.crc_string(cell_check_sum, column_name)
+        cell_check_sum = PlainBufferCrc8.crc_column_name(column_name)
         self.input_stream.read_tag()
     
         if self.get_last_tag() == TAG_CELL_VALUE:
@@ -164,7 +183,7 @@ class PlainBufferCodedInputStream(object):
 
         if self.get_last_tag() == TAG_CELL_CHECKSUM:
             check_sum = ord(input_stream.read_raw_byte())
-            if check_sum != cell_check_sum:                
+            if self.verify_checksum and check_sum != cell_check_sum:
                 raise OTSClientError("Checksum mismatch. expected:" + str(check_sum) + ",actual:" + str(cell_check_sum))
             self.input_stream.read_tag()
         else:
@@ -202,7 +221,7 @@ class PlainBufferCodedInputStream(object):
 
         if input_stream.last_tag == TAG_ROW_CHECKSUM:
             check_sum = ord(input_stream.read_raw_byte())
-            if check_sum != row_check_sum:
+            if self.verify_checksum and check_sum != row_check_sum:
                 raise OTSClientError("Checksum is mismatch.")
             self.input_stream.read_tag()
         else:
@@ -211,12 +230,16 @@ class PlainBufferCodedInputStream(object):
         return primary_key, attributes
 
     def read_row(self):
+        if self._can_use_fast_decoder():
+            return self._fast_decode(PlainBufferFastDecoder.read_row)
         if self.read_header() != HEADER:
             raise OTSClientError("Invalid header from plain buffer.")
         self.input_stream.read_tag()
         return self.read_row_without_header()
 
     def read_rows(self):
+        if self._can_use_fast_decoder():
+            return self._fast_decode(PlainBufferFastDecoder.read_rows)
         if self.read_header() != HEADER:
             raise OTSClientError("Invalid header from plain buffer.")
         self.input_stream.read_tag()
@@ -227,6 +250,13 @@ class PlainBufferCodedInputStream(object):
             row_list.append(Row(pk, attr))
         return row_list
 
+    def read_lazy_row(self):
+        # The attribute columns of a LazyRow are located in the buffer and decoded on access.
+        return self._fast_decode(PlainBufferFastDecoder.read_lazy_row)
+
+    def read_lazy_rows(self):
+        return self._fast_decode(PlainBufferFastDecoder.read_lazy_rows)
+
 class PlainBufferCodedOutputStream(object):
     def __init__(self, output_stream):
         self.output_stream = output_stream
@@ -241,7 +271,10 @@ class PlainBufferCodedOutputStream(object):
         self.write_tag(TAG_CELL_NAME)
         self.output_stream.write_raw_little_endian32(len(name))
         self.output_stream.write_bytes(name)
-        cell_check_sum = PlainBufferCrc8.crc_string(cell_check_sum, name)
+        if cell_check_sum == 0:
+            cell_check_sum = PlainBufferCrc8.crc_column_name(name)
+        else:
+            cell_check_sum = PlainBufferCrc8.crc_string(cell_check_sum, name)
         return cell_check_sum
 
     def write_primary_key_value(self, value, cell_check_sum):
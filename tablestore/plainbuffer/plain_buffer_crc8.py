@@ -36,27 +36,72 @@ CRC8_TABLE = [0x00, 0x07, 0x0e, 0x09, 0x1c, 0x1b, 0x12, 0x15,
               0xde, 0xd9, 0xd0, 0xd7, 0xc2, 0xc5, 0xcc, 0xcb,
               0xe6, 0xe1, 0xe8, 0xef, 0xfa, 0xfd, 0xf4, 0xf3]
 
+# the checksum of a column name only depends on the name, so it is computed once for every name
+_NAME_CHECKSUM_CACHE = {}
+_NAME_CHECKSUM_CACHE_SIZE = 4096
+
+
+# The inputs of at least _LONG_INPUT_SIZE bytes are processed _BLOCK_SIZE bytes per step. The checksum is linear, so
+# the checksum of a block from ``crc`` is _SHIFT_TABLES[_BLOCK_SIZE - 1][crc ^ block[0]] xor the checksums of the other
+# bytes of the block, _SHIFT_TABLES[z][byte] is the checksum of the byte followed by z zero bytes. The latter do not
+# depend on ``crc``, so they are computed for all blocks at once by bytes.translate and the xor of big integers.
+_BLOCK_SIZE = 64
+_LONG_INPUT_SIZE = 2048
+
+
+def _make_shift_tables():
+    tables = [bytes(CRC8_TABLE)]
+    for _ in range(_BLOCK_SIZE - 1):
+        tables.append(bytes(CRC8_TABLE[crc] for crc in tables[-1]))
+    return tables
+
+
+_SHIFT_TABLES = _make_shift_tables()
+
+
+def _crc_long_bytes(crc, bytes_):
+    data = bytes_ if isinstance(bytes_, (bytes, bytearray)) else bytes(bytes_)
+    blocks = len(data) // _BLOCK_SIZE
+    end = blocks * _BLOCK_SIZE
+    others = 0
+    for offset in range(1, _BLOCK_SIZE):
+        column = data[offset:end:_BLOCK_SIZE].translate(_SHIFT_TABLES[_BLOCK_SIZE - 1 - offset])
+        others ^= int.from_bytes(column, 'big')
+
+    first_table = _SHIFT_TABLES[_BLOCK_SIZE - 1]
+    for first, other in zip(data[0:end:_BLOCK_SIZE], others.to_bytes(blocks, 'big')):
+        crc = first_table[crc ^ first] ^ other
+    return _crc_short_bytes(crc, data[end:])
+
+
+def _crc_short_bytes(crc, bytes_, table=CRC8_TABLE):
+    for byte in bytes_:
+        crc = table[crc ^ byte]
+    return crc
+
+
+def _crc_bytes(crc, bytes_):
+    crc &= 0xff
+    if len(bytes_) >= _LONG_INPUT_SIZE:
+        return _crc_long_bytes(crc, bytes_)
+    return _crc_short_bytes(crc, bytes_)
+
+
 class PlainBufferCrc8(object):
     @staticmethod
     def crc_string(crc, bytes_):
         if isinstance(bytes_, six.text_type):
             bytes_ = bytes_.encode('utf-8')
-        elif not isinstance(bytes_, six.binary_type):
+        elif not isinstance(bytes_, (six.binary_type, bytearray, memoryview)):
             raise TypeError("must be string, actual:" + str(type(bytes_)))
 
         if sys.version_info[0] == 2:
             for byte in bytes_:
                 crc = CRC8_TABLE[((crc & 0xff) ^ ord(byte))]
-        else:
-            for byte in bytes_:
-                crc = CRC8_TABLE[((crc & 0xff) ^ byte)]
-        return crc
+            return crc
+        return _crc_bytes(crc, bytes_)
 
-    @staticmethod
-    def crc_bytes(crc, bytes_):
-        for byte in bytes_:
-            crc = CRC8_TABLE[((crc & 0xff) ^ byte)]
-        return crc
+    crc_bytes = staticmethod(_crc_bytes)
 
     @staticmethod
     def crc_int8(crc, byte):
@@ -64,14 +109,26 @@ class PlainBufferCrc8(object):
 
     @staticmethod
     def crc_int32(crc, byte):
-        for i in range(0, 4):
-            crc = PlainBufferCrc8.crc_int8(crc, (byte>>(i*8)) & 0xff)
-        return crc
+        return _crc_bytes(crc, (byte & 0xffffffff).to_bytes(4, 'little'))
 
     @staticmethod
     def crc_int64(crc, byte):
-        for i in range(0, 8):
-            crc = PlainBufferCrc8.crc_int8(crc, (byte>>(i*8)) & 0xff)
+        return _crc_bytes(crc, (byte & 0xffffffffffffffff).to_bytes(8, 'little'))
+
+    @staticmethod
+    def crc_column_name(name):
+        """
+        The checksum of a column name from the initial value 0, which is the beginning of every cell checksum.
+        ``name`` is a str or the utf-8 encoded bytes of it.
+        """
+        if isinstance(name, (bytearray, memoryview)):
+            return PlainBufferCrc8.crc_string(0, name)
+        crc = _NAME_CHECKSUM_CACHE.get(name)
+        if crc is None:
+            crc = PlainBufferCrc8.crc_string(0, name)
+            if len(_NAME_CHECKSUM_CACHE) >= _NAME_CHECKSUM_CACHE_SIZE:
+                _NAME_CHECKSUM_CACHE.clear()
+            _NAME_CHECKSUM_CACHE[name] = crc
         return crc
 
 __all__ = ['PlainBufferCrc8']
@@ -0,0 +1,343 @@
+# -*- coding: utf8 -*-
+# A PlainBuffer decoder working on a memoryview with precompiled structs.
+# It produces the same rows as PlainBufferCodedInputStream, which stays as the reference implementation.
+
+import struct
+
+from tablestore.metadata import *
+from tablestore.error import *
+from .plain_buffer_consts import *
+from tablestore.const_module import *
+from .plain_buffer_crc8 import *
+
+_INT32 = struct.Struct('<i')
+_INT64 = struct.Struct('<q')
+_DOUBLE = struct.Struct('<d')
+_BOOLEAN = struct.Struct('<?')
+
+_TAG_ROW_PK = ord(TAG_ROW_PK)
+_TAG_ROW_DATA = ord(TAG_ROW_DATA)
+_TAG_CELL = ord(TAG_CELL)
+_TAG_CELL_NAME = ord(TAG_CELL_NAME)
+_TAG_CELL_VALUE = ord(TAG_CELL_VALUE)
+_TAG_CELL_TYPE = ord(TAG_CELL_TYPE)
+_TAG_CELL_TIMESTAMP = ord(TAG_CELL_TIMESTAMP)
+_TAG_DELETE_ROW_MARKER = ord(TAG_DELETE_ROW_MARKER)
+_TAG_ROW_CHECKSUM = ord(TAG_ROW_CHECKSUM)
+_TAG_CELL_CHECKSUM = ord(TAG_CELL_CHECKSUM)
+
+
+def _tag_at(buf, pos, end):
+    # the tag is 0 at the end of the buffer, the same as PlainBufferInputStream.read_tag
+    return buf[pos] if pos < end else 0
+
+
+def _check_bound(pos, end):
+    if pos > end:
+        raise OTSClientError("Read bytes encountered EOF.")
+
+
+def _read_cell(buf, pos, end, is_primary_key, verify_checksum):
+    # pos is just after TAG_CELL
+    tag = _tag_at(buf, pos, end)
+    if tag != _TAG_CELL_NAME:
+        raise OTSClientError("Expect TAG_CELL_NAME but it was " + str(tag))
+    name_start = pos + 5
+    pos = name_start + _INT32.unpack_from(buf, pos + 1)[0]
+    _check_bound(pos, end)
+    column_name = str(buf[name_start:pos], 'utf-8')
+    cell_check_sum = PlainBufferCrc8.crc_column_name(column_name) if verify_checksum else 0
+
+    value = None
+    timestamp = None
+    tag = _tag_at(buf, pos, end)
+    if tag == _TAG_CELL_VALUE:
+        # skip the tag and the total size of the value
+        pos += 5
+        value_start = pos
+        column_type = buf[pos]
+        if column_type == VT_INTEGER:
+            value = _INT64.unpack_from(buf, pos + 1)[0]
+            pos += 9
+        elif column_type == VT_STRING or column_type == VT_BLOB:
+            data_start = pos + 5
+            pos = data_start + _INT32.unpack_from(buf, pos + 1)[0]
+            _check_bound(pos, end)
+            if column_type == VT_STRING:
+                value = str(buf[data_start:pos], 'utf-8')
+            else:
+                value = bytearray(buf[data_start:pos])
+        elif column_type == VT_BOOLEAN and not is_primary_key:
+            value = _BOOLEAN.unpack_from(buf, pos + 1)[0]
+            pos += 2
+        elif column_type == VT_DOUBLE and not is_primary_key:
+            value = _DOUBLE.unpack_from(buf, pos + 1)[0]
+            pos += 9
+        elif is_primary_key:
+            raise OTSClientError("Unsupported primary key type:" + str(column_type))
+        else:
+            raise OTSClientError("Unsupported column type: " + str(column_type))
+        if verify_checksum:
+            # the checksum covers the type and the little endian value, which are exactly the bytes in the buffer
+            cell_check_sum = PlainBufferCrc8.crc_bytes(cell_check_sum, buf[value_start:pos])
+        tag = _tag_at(buf, pos, end)
+    elif is_primary_key:
+        raise OTSClientError("Expect TAG_CELL_VALUE but it was " + str(tag))
+
+    if not is_primary_key:
+        if tag == _TAG_CELL_TYPE:
+            if verify_checksum:
+                cell_check_sum = PlainBufferCrc8.crc_int8(cell_check_sum, buf[pos + 1])
+            pos += 2
+            tag = _tag_at(buf, pos, end)
+        if tag == _TAG_CELL_TIMESTAMP:
+            timestamp = _INT64.unpack_from(buf, pos + 1)[0]
+            if verify_checksum:
+                cell_check_sum = PlainBufferCrc8.crc_bytes(cell_check_sum, buf[pos + 1:pos + 9])
+            pos += 9
+            tag = _tag_at(buf, pos, end)
+
+    if tag != _TAG_CELL_CHECKSUM:
+        raise OTSClientError("Expect TAG_CELL_CHECKSUM but it was " + str(tag))
+    check_sum = buf[pos + 1]
+    if verify_checksum and check_sum != cell_check_sum:
+        raise OTSClientError("Checksum mismatch. expected:" + str(check_sum) + ",actual:" + str(cell_check_sum))
+    return column_name, value, timestamp, check_sum, pos + 2
+
+
+def _read_row(buf, pos, end, verify_checksum):
+    # pos is at the first tag of the row
+    tag = _tag_at(buf, pos, end)
+    if tag != _TAG_ROW_PK:
+        raise OTSClientError("Expect TAG_ROW_PK but it was " + str(tag))
+    pos += 1
+
+    row_check_sum = 0
+    primary_key = []
+    attributes = []
+    tag = _tag_at(buf, pos, end)
+    while tag == _TAG_CELL:
+        name, value, _, cell_check_sum, pos = _read_cell(buf, pos + 1, end, True, verify_checksum)
+        primary_key.append((name, value))
+        row_check_sum = PlainBufferCrc8.crc_int8(row_check_sum, cell_check_sum)
+        tag = _tag_at(buf, pos, end)
+
+    if tag == _TAG_ROW_DATA:
+        pos += 1
+        tag = _tag_at(buf, pos, end)
+        while tag == _TAG_CELL:
+            name, value, timestamp, cell_check_sum, pos = _read_cell(buf, pos + 1, end, False, verify_checksum)
+            attributes.append((name, value, timestamp))
+            row_check_sum = PlainBufferCrc8.crc_int8(row_check_sum, cell_check_sum)
+            tag = _tag_at(buf, pos, end)
+
+    if tag == _TAG_DELETE_ROW_MARKER:
+        pos += 1
+        tag = _tag_at(buf, pos, end)
+        row_check_sum = PlainBufferCrc8.crc_int8(row_check_sum, 1)
+    else:
+        row_check_sum = PlainBufferCrc8.crc_int8(row_check_sum, 0)
+
+    if tag != _TAG_ROW_CHECKSUM:
+        raise OTSClientError("Expect TAG_ROW_CHECKSUM but it was " + str(tag))
+    if verify_checksum and buf[pos + 1] != row_check_sum:
+        raise OTSClientError("Checksum is mismatch.")
+    return primary_key, attributes, pos + 2
+
+
+def _skip_cell(buf, pos, end):
+    # pos is just after TAG_CELL, returns the checksum of the cell and the position after it without decoding it
+    if _tag_at(buf, pos, end) != _TAG_CELL_NAME:
+        raise OTSClientError("Expect TAG_CELL_NAME but it was " + str(_tag_at(buf, pos, end)))
+    pos += 5 + _INT32.unpack_from(buf, pos + 1)[0]
+    tag = _tag_at(buf, pos, end)
+    if tag == _TAG_CELL_VALUE:
+        pos += 5 + _INT32.unpack_from(buf, pos + 1)[0]
+        tag = _tag_at(buf, pos, end)
+    if tag == _TAG_CELL_TYPE:
+        pos += 2
+        tag = _tag_at(buf, pos, end)
+    if tag == _TAG_CELL_TIMESTAMP:
+        pos += 9
+        tag = _tag_at(buf, pos, end)
+    if tag != _TAG_CELL_CHECKSUM:
+        raise OTSClientError("Expect TAG_CELL_CHECKSUM but it was " + str(tag))
+    _check_bound(pos + 2, end)
+    return buf[pos + 1], pos + 2
+
+
+def _scan_row(buf, pos, end, verify_checksum):
+    # the same as _read_row, but only the primary key is decoded, the attribute cells are located
+    tag = _tag_at(buf, pos, end)
+    if tag != _TAG_ROW_PK:
+        raise OTSClientError("Expect TAG_ROW_PK but it was " + str(tag))
+    pos += 1
+
+    row_check_sum = 0
+    primary_key = []
+    cells = []
+    tag = _tag_at(buf, pos, end)
+    while tag == _TAG_CELL:
+        name, value, _, cell_check_sum, pos = _read_cell(buf, pos + 1, end, True, verify_checksum)
+        primary_key.append((name, value))
+        row_check_sum = PlainBufferCrc8.crc_int8(row_check_sum, cell_check_sum)
+        tag = _tag_at(buf, pos, end)
+
+    if tag == _TAG_ROW_DATA:
+        pos += 1
+        tag = _tag_at(buf, pos, end)
+        while tag == _TAG_CELL:
+            cells.append(pos + 1)
+            # the checksum of every cell is verified when the cell is decoded
+            cell_check_sum, pos = _skip_cell(buf, pos + 1, end)
+            row_check_sum = PlainBufferCrc8.crc_int8(row_check_sum, cell_check_sum)
+            tag = _tag_at(buf, pos, end)
+
+    if tag == _TAG_DELETE_ROW_MARKER:
+        pos += 1
+        tag = _tag_at(buf, pos, end)
+        row_check_sum = PlainBufferCrc8.crc_int8(row_check_sum, 1)
+    else:
+        row_check_sum = PlainBufferCrc8.crc_int8(row_check_sum, 0)
+
+    if tag != _TAG_ROW_CHECKSUM:
+        raise OTSClientError("Expect TAG_ROW_CHECKSUM but it was " + str(tag))
+    if verify_checksum and buf[pos + 1] != row_check_sum:
+        raise OTSClientError("Checksum is mismatch.")
+    return LazyRow(buf, primary_key, cells, verify_checksum), pos + 2
+
+
+class LazyRow(Row):
+    """
+    A row backed by the buffer of the response. ``primary_key`` is decoded when the row is created,
+    an attribute column is decoded when it is accessed.
+
+    ``attribute_columns`` decodes all attribute columns, it is the same as the one of ``Row``.
+    ``get_column(name)`` only decodes the versions of one column, and ``column_names()`` only decodes the names.
+    """
+
+    def __init__(self, buf, primary_key, cells, verify_checksum=True):
+        self.primary_key = primary_key
+        self._buf = buf
+        self._cells = cells
+        self._verify_checksum = verify_checksum
+        self._attribute_columns = None
+        self._name_index = None
+
+    @property
+    def attribute_columns(self):
+        if self._attribute_columns is None:
+            self._attribute_columns = [self._read(cell) for cell in self._cells]
+        return self._attribute_columns
+
+    @attribute_columns.setter
+    def attribute_columns(self, attribute_columns):
+        self._attribute_columns = attribute_columns
+
+    def _read(self, cell):
+        try:
+            name, value, timestamp, _, _ = _read_cell(self._buf, cell, len(self._buf), False, self._verify_checksum)
+        except (struct.error, IndexError):
+            raise OTSClientError("Read bytes encountered EOF.")
+        return name, value, timestamp
+
+    def _get_name_index(self):
+        if self._name_index is None:
+            self._name_index = {}
+            for cell in self._cells:
+                name_start = cell + 5
+                name_end = name_start + _INT32.unpack_from(self._buf, cell + 1)[0]
+                name = str(self._buf[name_start:name_end], 'utf-8')
+                self._name_index.setdefault(name, []).append(cell)
+        return self._name_index
+
+    def column_names(self):
+        """
+        Return the names of the attribute columns in the order of the row, every name is returned once.
+        """
+        if self._attribute_columns is not None:
+            return list(dict.fromkeys(column[0] for column in self._attribute_columns))
+        return list(self._get_name_index().keys())
+
+    def get_column(self, name):
+        """
+        Return the versions of the attribute column ``name`` as a list of (name, value, timestamp),
+        the list is empty if the row does not have the column.
+        """
+        if self._attribute_columns is not None:
+            return [column for column in self._attribute_columns if column[0] == name]
+        return [self._read(cell) for cell in self._get_name_index().get(name, [])]
+
+    def __repr__(self):
+        return repr(Row(self.primary_key, self.attribute_columns))
+
+
+def _read_header(buf):
+    if _INT32.unpack_from(buf, 0)[0] != HEADER:
+        raise OTSClientError("Invalid header from plain buffer.")
+    return const.LITTLE_ENDIAN_32_SIZE
+
+
+class PlainBufferFastDecoder(object):
+
+    @staticmethod
+    def read_row(data, verify_checksum=True):
+        """
+        Decode one row, returns (primary_key, attribute_columns) like PlainBufferCodedInputStream.read_row.
+        The checksums are not computed when ``verify_checksum`` is False.
+        """
+        buf = memoryview(data)
+        try:
+            primary_key, attributes, _ = _read_row(buf, _read_header(buf), len(buf), verify_checksum)
+        except (struct.error, IndexError):
+            raise OTSClientError("Read bytes encountered EOF.")
+        return primary_key, attributes
+
+    @staticmethod
+    def read_rows(data, verify_checksum=True):
+        """
+        Decode all rows, returns a list of Row like PlainBufferCodedInputStream.read_rows.
+        """
+        buf = memoryview(data)
+        end = len(buf)
+        row_list = []
+        try:
+            pos = _read_header(buf)
+            while pos != end:
+                primary_key, attributes, pos = _read_row(buf, pos, end, verify_checksum)
+                row_list.append(Row(primary_key, attributes))
+        except (struct.error, IndexError):
+            raise OTSClientError("Read bytes encountered EOF.")
+        return row_list
+
+    @staticmethod
+    def read_lazy_row(data, verify_checksum=True):
+        """
+        Decode the primary key of one row, returns a LazyRow.
+        """
+        buf = memoryview(data)
+        try:
+            row, _ = _scan_row(buf, _read_header(buf), len(buf), verify_checksum)
+        except (struct.error, IndexError):
+            raise OTSClientError("Read bytes encountered EOF.")
+        return row
+
+    @staticmethod
+    def read_lazy_rows(data, verify_checksum=True):
+        """
+        Decode the primary keys of all rows, returns a list of LazyRow.
+        """
+        buf = memoryview(data)
+        end = len(buf)
+        row_list = []
+        try:
+            pos = _read_header(buf)
+            while pos != end:
+                row, pos = _scan_row(buf, pos, end, verify_checksum)
+                row_list.append(row)
+        except (struct.error, IndexError):
+            raise OTSClientError("Read bytes encountered EOF.")
+        return row_list
+
+
+__all__ = ['PlainBufferFastDecoder', 'LazyRow']
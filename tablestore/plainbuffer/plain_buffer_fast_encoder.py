@@ -0,0 +1,216 @@
+# -*- coding: utf8 -*-
+# A single pass PlainBuffer encoder for rows.
+# Every string is encoded once, the fixed size parts of a cell are packed by precompiled structs,
+# and the checksums are computed over the packed bytes.
+
+import struct
+
+import six
+from builtins import int
+
+from tablestore.metadata import *
+from tablestore.error import *
+from .plain_buffer_consts import *
+from tablestore.const_module import *
+from .plain_buffer_crc8 import *
+from .plain_buffer_crc8 import CRC8_TABLE
+
+_HEADER = struct.pack('<i', HEADER)
+
+# TAG_CELL, TAG_CELL_NAME, the size of the name
+_CELL_NAME = struct.Struct('<BBi')
+# TAG_CELL_VALUE, the size of the value, the type of the value and the value
+_INTEGER_VALUE = struct.Struct('<BiBq')
+_DOUBLE_VALUE = struct.Struct('<BiBd')
+_BOOLEAN_VALUE = struct.Struct('<BiB?')
+_VARIANT_VALUE = struct.Struct('<BiB')
+# the same as above, followed by the size of the string
+_STRING_VALUE = struct.Struct('<BiBi')
+_TIMESTAMP = struct.Struct('<Bq')
+_TWO_BYTES = struct.Struct('<BB')
+
+_TAG_ROW_PK = ord(TAG_ROW_PK)
+_TAG_ROW_DATA = ord(TAG_ROW_DATA)
+_TAG_CELL = ord(TAG_CELL)
+_TAG_CELL_NAME = ord(TAG_CELL_NAME)
+_TAG_CELL_VALUE = ord(TAG_CELL_VALUE)
+_TAG_CELL_TYPE = ord(TAG_CELL_TYPE)
+_TAG_CELL_TIMESTAMP = ord(TAG_CELL_TIMESTAMP)
+_TAG_DELETE_ROW_MARKER = ord(TAG_DELETE_ROW_MARKER)
+_TAG_ROW_CHECKSUM = ord(TAG_ROW_CHECKSUM)
+_TAG_CELL_CHECKSUM = ord(TAG_CELL_CHECKSUM)
+
+_CELL_TYPE_OF_UPDATE = {
+    UpdateType.DELETE: const.DELETE_ONE_VERSION,
+    UpdateType.DELETE_ALL: const.DELETE_ALL_VERSION,
+    UpdateType.INCREMENT: const.INCREMENT,
+}
+
+_crc_bytes = PlainBufferCrc8.crc_bytes
+_crc_column_name = PlainBufferCrc8.crc_column_name
+
+
+def _write_cell_name(parts, name):
+    if isinstance(name, six.text_type):
+        name = name.encode('utf-8')
+    parts.append(_CELL_NAME.pack(_TAG_CELL, _TAG_CELL_NAME, len(name)))
+    parts.append(name)
+    return _crc_column_name(name)
+
+
+def _write_string(parts, value_type, value, cell_check_sum):
+    head = _STRING_VALUE.pack(_TAG_CELL_VALUE, len(value) + 5, value_type, len(value))
+    parts.append(head)
+    parts.append(value)
+    # the checksum covers everything after the size of the value
+    cell_check_sum = _crc_bytes(cell_check_sum, head[5:])
+    return _crc_bytes(cell_check_sum, value)
+
+
+def _write_primary_key_value(parts, value, cell_check_sum):
+    if value is INF_MIN or value is INF_MAX or value is PK_AUTO_INCR:
+        if value is INF_MIN:
+            value_type = VT_INF_MIN
+        elif value is INF_MAX:
+            value_type = VT_INF_MAX
+        else:
+            value_type = VT_AUTO_INCREMENT
+        parts.append(_VARIANT_VALUE.pack(_TAG_CELL_VALUE, 1, value_type))
+        return PlainBufferCrc8.crc_int8(cell_check_sum, value_type)
+    if isinstance(value, int):
+        packed = _INTEGER_VALUE.pack(_TAG_CELL_VALUE, 9, VT_INTEGER, value)
+        parts.append(packed)
+        return _crc_bytes(cell_check_sum, packed[5:])
+    if isinstance(value, six.text_type):
+        return _write_string(parts, VT_STRING, value.encode('utf-8'), cell_check_sum)
+    if isinstance(value, six.binary_type):
+        return _write_string(parts, VT_STRING, value, cell_check_sum)
+    if isinstance(value, bytearray):
+        return _write_string(parts, VT_BLOB, value, cell_check_sum)
+    raise OTSClientError("Unsupported primary key type: " + str(type(value)))
+
+
+def _write_column_value(parts, value, cell_check_sum):
+    if isinstance(value, bool):
+        packed = _BOOLEAN_VALUE.pack(_TAG_CELL_VALUE, 2, VT_BOOLEAN, value)
+    elif isinstance(value, int):
+        packed = _INTEGER_VALUE.pack(_TAG_CELL_VALUE, 9, VT_INTEGER, value)
+    elif isinstance(value, six.text_type):
+        return _write_string(parts, VT_STRING, value.encode('utf-8'), cell_check_sum)
+    elif isinstance(value, six.binary_type):
+        return _write_string(parts, VT_STRING, value, cell_check_sum)
+    elif isinstance(value, bytearray):
+        return _write_string(parts, VT_BLOB, value, cell_check_sum)
+    elif isinstance(value, float):
+        packed = _DOUBLE_VALUE.pack(_TAG_CELL_VALUE, 9, VT_DOUBLE, value)
+    else:
+        raise OTSClientError("Unsupported column type: " + str(type(value)))
+    parts.append(packed)
+    return _crc_bytes(cell_check_sum, packed[5:])
+
+
+def _write_primary_key(parts, primary_key):
+    if not isinstance(primary_key, list):
+        raise OTSClientError("Priamry key is not list, but is %s" % str(type(primary_key)))
+    row_check_sum = 0
+    parts.append(_TAG_ROW_PK.to_bytes(1, 'little'))
+    for pk in primary_key:
+        cell_check_sum = _write_cell_name(parts, pk[0])
+        cell_check_sum = _write_primary_key_value(parts, pk[1], cell_check_sum)
+        parts.append(_TWO_BYTES.pack(_TAG_CELL_CHECKSUM, cell_check_sum))
+        row_check_sum = CRC8_TABLE[row_check_sum ^ cell_check_sum]
+    return row_check_sum
+
+
+def _write_column(parts, name, value, timestamp, row_check_sum):
+    cell_check_sum = _write_cell_name(parts, name)
+    cell_check_sum = _write_column_value(parts, value, cell_check_sum)
+    if timestamp is not None:
+        packed = _TIMESTAMP.pack(_TAG_CELL_TIMESTAMP, timestamp)
+        parts.append(packed)
+        cell_check_sum = _crc_bytes(cell_check_sum, packed[1:])
+    parts.append(_TWO_BYTES.pack(_TAG_CELL_CHECKSUM, cell_check_sum))
+    return CRC8_TABLE[row_check_sum ^ cell_check_sum]
+
+
+def _write_update_column(parts, update_type, name, value, timestamp, row_check_sum):
+    cell_check_sum = _write_cell_name(parts, name)
+    if value is not None:
+        cell_check_sum = _write_column_value(parts, value, cell_check_sum)
+
+    cell_type = _CELL_TYPE_OF_UPDATE.get(update_type)
+    if cell_type is not None:
+        parts.append(_TWO_BYTES.pack(_TAG_CELL_TYPE, cell_type))
+    # the timestamp is written after the cell type, but it is checksummed before it
+    if timestamp is not None:
+        packed = _TIMESTAMP.pack(_TAG_CELL_TIMESTAMP, timestamp)
+        parts.append(packed)
+        cell_check_sum = _crc_bytes(cell_check_sum, packed[1:])
+    if cell_type is not None:
+        cell_check_sum = PlainBufferCrc8.crc_int8(cell_check_sum, cell_type)
+
+    parts.append(_TWO_BYTES.pack(_TAG_CELL_CHECKSUM, cell_check_sum))
+    return CRC8_TABLE[row_check_sum ^ cell_check_sum]
+
+
+def _finish_row(parts, row_check_sum, delete_marker=False):
+    if delete_marker:
+        parts.append(_TAG_DELETE_ROW_MARKER.to_bytes(1, 'little'))
+        row_check_sum = CRC8_TABLE[row_check_sum ^ 1]
+    else:
+        row_check_sum = CRC8_TABLE[row_check_sum ^ 0]
+    parts.append(_TWO_BYTES.pack(_TAG_ROW_CHECKSUM, row_check_sum))
+    return b''.join(parts)
+
+
+class PlainBufferFastEncoder(object):
+    """
+    Serialize rows into PlainBuffer in one pass. The results are bytes, which can be set to protobuf directly.
+    """
+
+    @staticmethod
+    def serialize_primary_key(primary_key):
+        parts = [_HEADER]
+        row_check_sum = _write_primary_key(parts, primary_key)
+        return _finish_row(parts, row_check_sum)
+
+    @staticmethod
+    def serialize_for_put_row(primary_key, attribute_columns):
+        parts = [_HEADER]
+        row_check_sum = _write_primary_key(parts, primary_key)
+        if attribute_columns is not None and len(attribute_columns) != 0:
+            parts.append(_TAG_ROW_DATA.to_bytes(1, 'little'))
+            for column in attribute_columns:
+                if len(column) == 2:
+                    row_check_sum = _write_column(parts, column[0], column[1], None, row_check_sum)
+                elif len(column) == 3:
+                    row_check_sum = _write_column(parts, column[0], column[1], column[2], row_check_sum)
+        return _finish_row(parts, row_check_sum)
+
+    @staticmethod
+    def serialize_for_update_row(primary_key, attribute_columns):
+        parts = [_HEADER]
+        row_check_sum = _write_primary_key(parts, primary_key)
+        if len(attribute_columns) != 0:
+            parts.append(_TAG_ROW_DATA.to_bytes(1, 'little'))
+            for update_type, columns in attribute_columns.items():
+                update_type = update_type.upper()
+                for column in columns:
+                    if isinstance(column, six.text_type) or isinstance(column, six.binary_type):
+                        row_check_sum = _write_update_column(parts, update_type, column, None, None, row_check_sum)
+                    elif len(column) == 2:
+                        row_check_sum = _write_update_column(parts, update_type, column[0], column[1], None, row_check_sum)
+                    elif len(column) == 3:
+                        row_check_sum = _write_update_column(parts, update_type, column[0], column[1], column[2], row_check_sum)
+                    else:
+                        raise OTSClientError("Unsupported column format: " + str(column))
+        return _finish_row(parts, row_check_sum)
+
+    @staticmethod
+    def serialize_for_delete_row(primary_key):
+        parts = [_HEADER]
+        row_check_sum = _write_primary_key(parts, primary_key)
+        return _finish_row(parts, row_check_sum, delete_marker=True)
+
+
+__all__ = ['PlainBufferFastEncoder']
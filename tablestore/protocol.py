@@ -7,11 +7,13 @@ import logging
 import sys
 import platform
 import datetime
+import zlib
 
 import google.protobuf.text_format as text_format
 
 import tablestore
 import tablestore.utils as utils
+import tablestore.consts as consts
 from tablestore.auth import SignBase
 from tablestore.error import *
 from tablestore.encoder import OTSProtoBufferEncoder
@@ -42,6 +44,7 @@ class OTSProtocol(object):
         'BatchGetRow',
         'BatchWriteRow',
         'GetRange',
+        'ComputeSplitPointsBySize',
         'ListSearchIndex',
         'CreateSearchIndex',
         'UpdateSearchIndex',
@@ -68,27 +71,78 @@ class OTSProtocol(object):
         'DeleteTimeseriesMeta',
     ]
 
-    def __init__(self, instance_name, encoding, logger):
+    # the compression methods of the request and response bodies, the decompress functions take the decompressed size
+    compressors = {
+        'deflate': (zlib.compress, lambda data, size: zlib.decompress(data, bufsize=size or zlib.DEF_BUF_SIZE)),
+    }
+
+    def __init__(self, instance_name, encoding, logger, request_compression=None, response_compression=None,
+                 compression_threshold=0, verify_checksum=True):
         self.instance_name = instance_name
         self.encoding = encoding
         self.encoder = OTSProtoBufferEncoder(encoding)
-        self.decoder = OTSProtoBufferDecoder(encoding)
+        self.decoder = OTSProtoBufferDecoder(encoding, verify_checksum)
         self.logger = logger
 
-    def _make_request_headers(self, body, query, signer: SignBase):
+        for compression in [request_compression, response_compression]:
+            if compression is not None and compression not in self.compressors:
+                raise OTSClientError('Compression %s is not supported, the supported are %s.' % (
+                    compression, ', '.join(sorted(self.compressors))))
+        self.request_compression = request_compression
+        self.response_compression = response_compression
+        self.compression_threshold = compression_threshold
+        # the second and the x-ots-date header of it, which is formatted once per second
+        self._header_date = (None, None)
+
+    def _compress_request(self, body, headers):
+        # Compress the request body if it is large enough and the compression makes it smaller.
+        if self.request_compression is None or len(body) < self.compression_threshold:
+            return body
+        compressed = self.compressors[self.request_compression][0](body)
+        if len(compressed) >= len(body):
+            return body
+        headers[consts.OTS_HEADER_REQUEST_COMPRESS_TYPE] = self.request_compression
+        headers[consts.OTS_HEADER_REQUEST_COMPRESS_SIZE] = str(len(body))
+        return compressed
+
+    def _decompress_response(self, headers, body):
+        compression = headers.get(consts.OTS_HEADER_RESPONSE_COMPRESS_TYPE)
+        if compression is None:
+            return body
+        if compression not in self.compressors:
+            raise OTSClientError('Compression %s of the response is not supported.' % compression)
+
+        size = headers.get(consts.OTS_HEADER_RESPONSE_COMPRESS_SIZE)
+        try:
+            size = None if size is None else int(size)
+            body = self.compressors[compression][1](body, size)
+        except (ValueError, zlib.error) as e:
+            raise OTSClientError('Failed to decompress the response, %s.' % e)
+        if size is not None and len(body) != size:
+            raise OTSClientError('Size mismatch of the decompressed response.')
+        return body
+
+    def _make_request_headers(self, body, query, signer: SignBase, extra_headers=None):
         # Compose request headers and process request body if needed.
         # Decode the byte type md5 in order to fit the signature method.
         md5 = base64.b64encode(hashlib.md5(body).digest()).decode(self.encoding)
-        header_date = utils.get_now_utc_datetime().strftime('%Y-%m-%dT%H:%M:%S.000Z')
+        now = int(time.time())
+        header_time, header_date = self._header_date
+        if header_time != now:
+            header_date = time.strftime('%Y-%m-%dT%H:%M:%S.000Z', time.gmtime(now))
+            self._header_date = (now, header_date)
+        credentials = signer.get_credentials_provider().get_credentials()
         headers = {
             'x-ots-date': header_date,
             'x-ots-apiversion': self.api_version,
-            'x-ots-accesskeyid': signer.get_credentials_provider().get_credentials().get_access_key_id(),
+            'x-ots-accesskeyid': credentials.get_access_key_id(),
             'x-ots-instancename': self.instance_name,
             'x-ots-contentmd5': md5,
         }
+        if extra_headers:
+            headers.update(extra_headers)
         # extra headers
-        sts_token = signer.get_credentials_provider().get_credentials().get_security_token()
+        sts_token = credentials.get_security_token()
         if sts_token is not None:
             headers['x-ots-ststoken'] = sts_token
 
@@ -129,7 +183,10 @@ class OTSProtocol(object):
         # 2, check md5
         if 'x-ots-contentmd5' in headers:
             # have to decode the byte string inorder to fit the header
-            md5 = base64.b64encode(hashlib.md5(body).digest()).decode(self.encoding)
+            digest = getattr(body, 'content_md5', None)
+            if digest is None:
+                digest = hashlib.md5(body).digest()
+            md5 = base64.b64encode(digest).decode(self.encoding)
             if md5 != headers['x-ots-contentmd5']:
                 raise OTSClientError('MD5 mismatch in response.')
 
@@ -173,15 +230,22 @@ class OTSProtocol(object):
             raise OTSClientError('API %s is not supported.' % api_name)
 
         proto = self.encoder.encode_request(api_name, *args, **kwargs)
-        body = proto.SerializeToString()
+        # the requests of the prepared templates are encoded to bytes by the encoder
+        body = proto if isinstance(proto, bytes) else proto.SerializeToString()
         query = '/' + api_name
-        headers = self._make_request_headers(body, query, signer)
-
-        if self.logger.level <= logging.DEBUG:
+        # the compression headers are signed, and the MD5 is of the compressed body
+        compression_headers = {}
+        if self.response_compression is not None:
+            compression_headers[consts.OTS_HEADER_RESPONSE_COMPRESS_TYPE] = self.response_compression
+        raw_body = body
+        body = self._compress_request(body, compression_headers)
+        headers = self._make_request_headers(body, query, signer, compression_headers)
+
+        if self.logger.isEnabledFor(logging.DEBUG):
             # prevent to generate formatted message which is time-consuming
             self.logger.debug("OTS request, API: %s, Headers: %s, Protobuf: %s" % (
                 api_name, headers,
-                text_format.MessageToString(proto, as_utf8=True, as_one_line=True)
+                raw_body if isinstance(proto, bytes) else text_format.MessageToString(proto, as_utf8=True, as_one_line=True)
             ))
         return query, headers, body
 
@@ -192,15 +256,16 @@ class OTSProtocol(object):
             request_id = ""
         return request_id
 
-    def parse_response(self, api_name, status, headers, body):
+    def parse_response(self, api_name, status, headers, body, decode_options=None):
         if api_name not in self.api_list:
             raise OTSClientError("API %s is not supported." % api_name)
 
         headers = self._convert_urllib3_headers(headers)
         request_id = self._get_request_id_string(headers)
+        body = self._decompress_response(headers, body)
 
         try:
-            ret, proto = self.decoder.decode_response(api_name, body, request_id)
+            ret, proto = self.decoder.decode_response(api_name, body, request_id, decode_options)
         except Exception as e:
             error_message = 'Response format is invalid, %s, RequestID: %s, " \
                 "HTTP status: %s, Body: %s.' % (str(e), request_id, status, body)
@@ -213,7 +278,7 @@ class OTSProtocol(object):
         # convert headers according to different urllib3 versions.
         std_headers = self._convert_urllib3_headers(headers)
 
-        if self.logger.level <= logging.DEBUG:
+        if self.logger.isEnabledFor(logging.DEBUG):
             # prevent to generate formatted message which is time-consuming
             self.logger.debug("OTS response, API: %s, Status: %s, Reason: %s, " \
                               "Headers: %s" % (api_name, status, reason, std_headers))
@@ -237,7 +302,7 @@ class OTSProtocol(object):
 
             try:
                 error_proto = pb2.Error()
-                error_proto.ParseFromString(body)
+                error_proto.ParseFromString(self._decompress_response(std_headers, body))
                 error_code = error_proto.code
                 error_message = error_proto.message
             except:
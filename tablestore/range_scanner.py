@@ -0,0 +1,192 @@
+# -*- coding: utf8 -*-
+# Helpers to scan a primary key range of a table concurrently.
+
+import asyncio
+import functools
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import six
+
+from tablestore.error import *
+from tablestore.metadata import *
+
+_END_OF_RANGE = object()
+
+# the number of pages buffered for each range before its scanning pauses
+_PAGES_PER_RANGE = 2
+
+
+def _compare_primary_key_value(left, right):
+    if left is right:
+        return 0
+    if left is INF_MIN or right is INF_MAX:
+        return -1
+    if left is INF_MAX or right is INF_MIN:
+        return 1
+    # the server compares strings by their utf-8 bytes
+    if isinstance(left, six.text_type):
+        left = left.encode('utf-8')
+    if isinstance(right, six.text_type):
+        right = right.encode('utf-8')
+    if isinstance(left, bytearray):
+        left = bytes(left)
+    if isinstance(right, bytearray):
+        right = bytes(right)
+    return (left > right) - (left < right)
+
+
+def compare_primary_key(left, right):
+    """
+    Compare two primary keys, both are lists like [('gid', 1), ('uid', INF_MIN)].
+    Returns a negative number, zero or a positive number like ``cmp``.
+    """
+    for left_column, right_column in zip(left, right):
+        ret = _compare_primary_key_value(left_column[1], right_column[1])
+        if ret != 0:
+            return ret
+    return len(left) - len(right)
+
+
+def complete_split_point(split_point, schema):
+    """
+    Fill the tailing primary key columns omitted by the server with INF_MIN.
+    ``schema`` is the primary key schema returned by compute_split_points_by_size.
+    """
+    primary_key = list(split_point)
+    for column in schema[len(primary_key):]:
+        primary_key.append((column[0], INF_MIN))
+    return primary_key
+
+
+def make_scan_ranges(direction, inclusive_start_primary_key, exclusive_end_primary_key, split_points):
+    """
+    Split the range into consecutive sub-ranges at the split points which fall inside the range.
+    Returns a list of (inclusive_start_primary_key, exclusive_end_primary_key) in the scan direction.
+    """
+    sign = 1 if direction == Direction.FORWARD else -1
+    if sign * compare_primary_key(inclusive_start_primary_key, exclusive_end_primary_key) >= 0:
+        raise OTSClientError("The start primary key should be %s than the end primary key in direction %s." % (
+            'less' if sign > 0 else 'greater', direction))
+
+    points = [point for point in split_points
+              if sign * compare_primary_key(inclusive_start_primary_key, point) < 0
+              and sign * compare_primary_key(point, exclusive_end_primary_key) < 0]
+    points.sort(key=functools.cmp_to_key(lambda a, b: sign * compare_primary_key(a, b)))
+
+    bounds = [inclusive_start_primary_key]
+    for point in points:
+        if compare_primary_key(bounds[-1], point) != 0:
+            bounds.append(point)
+    bounds.append(exclusive_end_primary_key)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def iter_ranges_in_parallel(get_range, ranges, consumed_counter, max_concurrency, ordered):
+    """
+    Scan the ranges on a thread pool of ``max_concurrency`` threads and yield their rows.
+
+    ``get_range`` is called as get_range(inclusive_start_primary_key, exclusive_end_primary_key) and returns
+    the same tuple as OTSClient.get_range. Each thread has at most one request in flight.
+    """
+    stop_event = threading.Event()
+    counter_lock = threading.Lock()
+    if ordered:
+        queues = [queue.Queue(_PAGES_PER_RANGE) for _ in ranges]
+    else:
+        queues = [queue.Queue(_PAGES_PER_RANGE * max_concurrency)] * len(ranges)
+
+    def put(page_queue, item):
+        while not stop_event.is_set():
+            try:
+                page_queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def scan(index, inclusive_start_primary_key, exclusive_end_primary_key):
+        page_queue = queues[index]
+        try:
+            next_start_pk = inclusive_start_primary_key
+            while next_start_pk and not stop_event.is_set():
+                consumed, next_start_pk, row_list, next_token = get_range(next_start_pk, exclusive_end_primary_key)
+                with counter_lock:
+                    consumed_counter.read += consumed.read
+                if row_list and not put(page_queue, row_list):
+                    return
+            put(page_queue, _END_OF_RANGE)
+        except Exception as e:
+            put(page_queue, e)
+
+    executor = ThreadPoolExecutor(max_workers=max_concurrency)
+    try:
+        for index, (start_pk, end_pk) in enumerate(ranges):
+            executor.submit(scan, index, start_pk, end_pk)
+
+        pending_ranges = len(ranges)
+        page_queues = queues if ordered else queues[:1]
+        for page_queue in page_queues:
+            while pending_ranges > 0:
+                item = page_queue.get()
+                if item is _END_OF_RANGE:
+                    pending_ranges -= 1
+                    if ordered:
+                        break
+                    continue
+                if isinstance(item, Exception):
+                    raise item
+                for row in item:
+                    yield row
+    finally:
+        stop_event.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def aiter_ranges_in_parallel(get_range, ranges, consumed_counter, max_concurrency, ordered):
+    """
+    The asyncio version of iter_ranges_in_parallel, ``get_range`` is a coroutine function.
+    All ranges are scanned by their own tasks, and at most ``max_concurrency`` requests are in flight.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    if ordered:
+        queues = [asyncio.Queue(_PAGES_PER_RANGE) for _ in ranges]
+    else:
+        queues = [asyncio.Queue(_PAGES_PER_RANGE * max_concurrency)] * len(ranges)
+
+    async def scan(index, inclusive_start_primary_key, exclusive_end_primary_key):
+        page_queue = queues[index]
+        try:
+            next_start_pk = inclusive_start_primary_key
+            while next_start_pk:
+                async with semaphore:
+                    consumed, next_start_pk, row_list, next_token = await get_range(
+                        next_start_pk, exclusive_end_primary_key)
+                consumed_counter.read += consumed.read
+                if row_list:
+                    await page_queue.put(row_list)
+            await page_queue.put(_END_OF_RANGE)
+        except Exception as e:
+            await page_queue.put(e)
+
+    tasks = [asyncio.ensure_future(scan(index, start_pk, end_pk))
+             for index, (start_pk, end_pk) in enumerate(ranges)]
+    try:
+        pending_ranges = len(ranges)
+        page_queues = queues if ordered else queues[:1]
+        for page_queue in page_queues:
+            while pending_ranges > 0:
+                item = await page_queue.get()
+                if item is _END_OF_RANGE:
+                    pending_ranges -= 1
+                    if ordered:
+                        break
+                    continue
+                if isinstance(item, Exception):
+                    raise item
+                for row in item:
+                    yield row
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,90 @@
+# -*- coding: utf8 -*-
+# Coalescing of the concurrent calls with the same key into one call
+
+__all__ = ['SingleFlight', 'AsyncSingleFlight']
+
+import asyncio
+import threading
+
+
+class _Call(object):
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight(object):
+    """
+    Coalesces the concurrent calls of ``do`` with the same key of the threads. The first call runs the function,
+    the calls made before it returns wait for it and share its result or exception.
+
+    ``shared`` counts the calls which did not run the function.
+    """
+
+    def __init__(self):
+        self.shared = 0
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._calls)
+
+    def do(self, key, func):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.shared += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+class AsyncSingleFlight(object):
+    """
+    Coalesces the concurrent calls of ``do`` with the same key of the coroutines. The coroutine function runs in a task
+    shared by the calls, cancelling one of the calls does not cancel the task of the others.
+
+    ``shared`` counts the calls which did not run the coroutine function.
+    """
+
+    def __init__(self):
+        self.shared = 0
+        self._tasks = {}
+
+    def __len__(self):
+        return len(self._tasks)
+
+    def _done(self, key, task):
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        # the exception is raised to the callers, the callers might all have been cancelled
+        if not task.cancelled():
+            task.exception()
+
+    async def do(self, key, coroutine_func):
+        task = self._tasks.get(key)
+        if task is not None and task.get_loop() is asyncio.get_running_loop():
+            self.shared += 1
+        else:
+            task = asyncio.ensure_future(coroutine_func())
+            self._tasks[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+        return await asyncio.shield(task)
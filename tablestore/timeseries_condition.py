@@ -3,6 +3,7 @@
 import six
 from enum import IntEnum
 from tablestore.protobuf import timeseries_pb2
+from tablestore.error import OTSClientError
 
 
 class MetaQueryCompositeOperator(IntEnum):
@@ -99,4 +100,35 @@ class CompositeMetaQueryCondition(object):
         return timeseries_pb2.MetaQueryConditionType.COMPOSITE_CONDITION
 
 
-
+def canonicalize_meta_condition(condition):
+    """
+    Return a hashable form of a meta query condition, the conditions which select the same timeseries
+    have the same form, e.g. the sub conditions of AND and OR are sorted and nested ANDs or ORs are flattened.
+    """
+    if condition is None:
+        return None
+    if isinstance(condition, MeasurementMetaQueryCondition):
+        return ('measurement', int(condition.operator), condition.value)
+    if isinstance(condition, DataSourceMetaQueryCondition):
+        return ('data_source', int(condition.operator), condition.value)
+    if isinstance(condition, TagMetaQueryCondition):
+        return ('tag', int(condition.operator), condition.tag_name, condition.value)
+    if isinstance(condition, UpdateTimeMetaQueryCondition):
+        return ('update_time', int(condition.operator), condition.time_in_us)
+    if isinstance(condition, AttributeMetaQueryCondition):
+        return ('attribute', int(condition.operator), condition.attribute_name, condition.value)
+    if isinstance(condition, CompositeMetaQueryCondition):
+        operator = int(condition.operator)
+        sub_conditions = [canonicalize_meta_condition(sub) for sub in condition.subConditions]
+        if condition.operator == MetaQueryCompositeOperator.OP_NOT:
+            return ('composite', operator, tuple(sub_conditions))
+        flattened = set()
+        for sub in sub_conditions:
+            if sub[0] == 'composite' and sub[1] == operator:
+                flattened.update(sub[2])
+            else:
+                flattened.add(sub)
+        if len(flattened) == 1:
+            return flattened.pop()
+        return ('composite', operator, tuple(sorted(flattened, key=repr)))
+    raise OTSClientError("timeseries meta condition type wrong, %s" % condition.__class__.__name__)
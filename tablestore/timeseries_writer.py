@@ -0,0 +1,343 @@
+# -*- coding: utf8 -*-
+# Implementation of TimeseriesWriter, a buffered writer of PutTimeseriesData
+
+__all__ = ['TimeseriesWriter', 'AsyncTimeseriesWriter']
+
+import asyncio
+import collections
+import time
+from concurrent.futures import Future
+
+import six
+
+from tablestore.buffered_writer import BufferedWriterBase, BufferedWriter
+from tablestore.error import *
+from tablestore.metadata import *
+
+
+class _PendingPoint(object):
+
+    def __init__(self, row, size, future):
+        self.row = row
+        self.size = size
+        self.future = future
+        self.enqueue_time = time.time()
+        self.retry_times = 0
+        self.retry_delay = 0
+
+
+class _TimeseriesWriterBase(BufferedWriterBase):
+
+    MAX_BATCH_ROWS = 1000
+    MAX_BATCH_BYTES = 4 * 1024 * 1024
+    DEFAULT_BATCH_ROWS = 200
+    DEFAULT_LINGER_TIME = 0.1
+    DEFAULT_MAX_PENDING_ROWS = 10000
+
+    def __init__(self, client, table_name, max_batch_rows, max_batch_bytes, linger_time, max_pending_rows,
+                 retry_policy):
+        if max_batch_rows <= 0 or max_batch_rows > self.MAX_BATCH_ROWS:
+            raise OTSClientError("max_batch_rows should be in range (0, %d]." % self.MAX_BATCH_ROWS)
+        if max_batch_bytes <= 0 or max_batch_bytes > self.MAX_BATCH_BYTES:
+            raise OTSClientError("max_batch_bytes should be in range (0, %d]." % self.MAX_BATCH_BYTES)
+        if linger_time < 0:
+            raise OTSClientError("linger_time should not be negative.")
+        if max_pending_rows < max_batch_rows:
+            raise OTSClientError("max_pending_rows should not be less than max_batch_rows.")
+
+        BufferedWriterBase.__init__(self)
+        self.client = client
+        self.table_name = table_name
+        self.max_batch_rows = max_batch_rows
+        self.max_batch_bytes = max_batch_bytes
+        self.linger_time = linger_time
+        self.max_pending_rows = max_pending_rows
+        self.retry_policy = retry_policy if retry_policy is not None else client.retry_policy
+
+        # the pending points of every timeseries in the order of arrival, the series are kept in the order
+        # of their first pending point, so a batch takes the points of one series together
+        self._series = collections.OrderedDict()
+        self._pending_rows = 0
+        self._pending_bytes = 0
+
+    @staticmethod
+    def _series_identity(timeseries_key):
+        tags = timeseries_key.tags or {}
+        return timeseries_key.measurement_name, timeseries_key.data_source, tuple(sorted(tags.items()))
+
+    @staticmethod
+    def _compute_row_size(row):
+        # an estimation of the encoded size, which is only used to bound the batches
+        key = row.timeseries_key
+        size = 32 + len(key.measurement_name or '') + len(key.data_source or '')
+        for name, value in (key.tags or {}).items():
+            size += len(name) + len(value) + 8
+        for name, value in row.fields.items():
+            size += len(name) + 8
+            if isinstance(value, (six.text_type, six.binary_type, bytearray)):
+                size += len(value)
+        return size
+
+    def _check_row(self, row):
+        if not isinstance(row, TimeseriesRow):
+            raise OTSClientError(
+                "The input row should be an instance of TimeseriesRow, not %s" % row.__class__.__name__
+            )
+        if self._closed:
+            raise OTSClientError("%s is closed." % self.__class__.__name__)
+
+    def _is_full(self):
+        return self._pending_rows >= self.max_pending_rows
+
+    def _append(self, pending_point):
+        identity = self._series_identity(pending_point.row.timeseries_key)
+        points = self._series.get(identity)
+        if points is None:
+            points = self._series[identity] = collections.deque()
+        points.append(pending_point)
+        self._pending_rows += 1
+        self._pending_bytes += pending_point.size
+        # whether the background worker should be woken up to start the linger timer or to commit a full batch
+        return (self._pending_rows == 1 or self._pending_rows >= self.max_batch_rows
+                or self._pending_bytes >= self.max_batch_bytes)
+
+    def _oldest_enqueue_time(self):
+        return min(points[0].enqueue_time for points in self._series.values())
+
+    def _has_pending(self):
+        return self._pending_rows > 0
+
+    def _is_batch_ready(self):
+        if not self._pending_rows:
+            return False
+        if self._closed or self._flush_requested:
+            return True
+        if self._pending_rows >= self.max_batch_rows or self._pending_bytes >= self.max_batch_bytes:
+            return True
+        return time.time() - self._oldest_enqueue_time() >= self.linger_time
+
+    def _linger_timeout(self):
+        if not self._pending_rows:
+            return None
+        return self._oldest_enqueue_time() + self.linger_time - time.time()
+
+    def _take_batch(self):
+        batch = []
+        batch_bytes = 0
+        while self._series and len(batch) < self.max_batch_rows:
+            identity, points = next(iter(self._series.items()))
+            while points and len(batch) < self.max_batch_rows:
+                if batch and batch_bytes + points[0].size > self.max_batch_bytes:
+                    break
+                pending_point = points.popleft()
+                batch_bytes += pending_point.size
+                batch.append(pending_point)
+            if points:
+                break
+            del self._series[identity]
+        self._pending_rows -= len(batch)
+        self._pending_bytes -= batch_bytes
+        if not self._pending_rows:
+            self._flush_requested = False
+        return batch
+
+    def _handle_response(self, batch, response):
+        # only the rows in failedRows are sent again, the index is the position of the row in the request
+        failed_rows = dict((failed.index, failed.error) for failed in response.failedRows or [])
+        retry_points = []
+        for index, pending_point in enumerate(batch):
+            failed = failed_rows.get(index)
+            if failed is None:
+                self._set_result(pending_point.future, None)
+                continue
+            error = OTSServiceError(None, failed.code, failed.message)
+            if self.retry_policy.should_retry(pending_point.retry_times, error, 'PutTimeseriesData'):
+                pending_point.retry_delay = self.retry_policy.get_retry_delay(
+                    pending_point.retry_times, error, 'PutTimeseriesData')
+                pending_point.retry_times += 1
+                retry_points.append(pending_point)
+            else:
+                self._set_exception(pending_point.future, error)
+        return retry_points
+
+
+class TimeseriesWriter(_TimeseriesWriterBase, BufferedWriter):
+    """
+    ``TimeseriesWriter`` buffers the points written by many threads and sends them to one timeseries table
+    through ``OTSClient.put_timeseries_data``.
+
+    The buffered points are grouped by their TimeseriesKey, so the points of one timeseries are sent together
+    and share one row group in the request. A batch is committed by a background thread when it reaches
+    ``max_batch_rows`` rows or ``max_batch_bytes`` bytes, or when the oldest buffered point has waited for
+    ``linger_time`` seconds. Only the rows in ``failedRows`` of the response are retried according to the retry
+    policy. While the background thread is waiting to retry, for example when the server is throttling, the
+    points are buffered up to ``max_pending_rows`` and then ``write`` blocks until there is room.
+
+    Every write returns a ``concurrent.futures.Future``, whose result is None on success, otherwise it holds
+    the ``OTSServiceError`` or ``OTSClientError`` of the point.
+
+    Example:
+
+        with TimeseriesWriter(client, 'myTimeseriesTable') as writer:
+            key = TimeseriesKey('cpu', 'host1', {'region': 'hz'})
+            future = writer.write(TimeseriesRow(key, {'usage': 0.5}, int(time.time() * 1000000)))
+        future.result()
+    """
+
+    def __init__(self, client, table_name, max_batch_rows=_TimeseriesWriterBase.DEFAULT_BATCH_ROWS,
+                 max_batch_bytes=_TimeseriesWriterBase.MAX_BATCH_BYTES,
+                 linger_time=_TimeseriesWriterBase.DEFAULT_LINGER_TIME,
+                 max_pending_rows=_TimeseriesWriterBase.DEFAULT_MAX_PENDING_ROWS, retry_policy=None):
+        """
+        ``client`` is the ``OTSClient`` used to send the PutTimeseriesData requests.
+        ``table_name`` is the name of the timeseries table.
+        ``max_batch_rows`` is the maximum number of rows in one request, no more than 1000.
+        ``max_batch_bytes`` is the maximum estimated size of the rows in one request, no more than 4MB.
+        ``linger_time`` is the maximum time in seconds that a point is buffered before its batch is committed.
+        ``max_pending_rows`` is the maximum number of buffered points, ``write`` blocks when it is reached.
+        ``retry_policy`` decides whether a failed row is sent again, the default is the retry policy of ``client``.
+        """
+        BufferedWriter.__init__(self)
+        _TimeseriesWriterBase.__init__(self, client, table_name, max_batch_rows, max_batch_bytes, linger_time,
+                                       max_pending_rows, retry_policy)
+        self._start('tablestore-timeseries-writer')
+
+    def write(self, row, timeout=None):
+        """
+        Buffer a TimeseriesRow, blocks while ``max_pending_rows`` points are buffered. Returns a Future.
+
+        ``timeout`` is the maximum time in seconds to block, OTSClientError is raised when it expires.
+        The default is None, which blocks until there is room.
+        """
+        self._check_row(row)
+        pending_point = _PendingPoint(row, self._compute_row_size(row), Future())
+        deadline = None if timeout is None else time.time() + timeout
+        with self._cond:
+            while self._is_full() and not self._closed:
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    raise OTSClientError("Timeout when waiting for the buffer of TimeseriesWriter.")
+                self._cond.wait(remaining)
+            self._check_row(row)
+            if self._append(pending_point):
+                self._cond.notify_all()
+        return pending_point.future
+
+    def _send_batch(self, batch):
+        return self.client.put_timeseries_data(self.table_name, [p.row for p in batch])
+
+
+class AsyncTimeseriesWriter(_TimeseriesWriterBase):
+    """
+    The asyncio version of ``TimeseriesWriter``, ``client`` is an ``AsyncOTSClient``.
+    The batches are committed by a background task, which is started by the first write.
+    ``write`` is a coroutine, it waits while ``max_pending_rows`` points are buffered and returns an
+    ``asyncio.Future`` of the point.
+
+    Example:
+
+        async with AsyncTimeseriesWriter(client, 'myTimeseriesTable') as writer:
+            future = await writer.write(TimeseriesRow(key, {'usage': 0.5}, int(time.time() * 1000000)))
+        await future
+    """
+
+    def __init__(self, client, table_name, max_batch_rows=_TimeseriesWriterBase.DEFAULT_BATCH_ROWS,
+                 max_batch_bytes=_TimeseriesWriterBase.MAX_BATCH_BYTES,
+                 linger_time=_TimeseriesWriterBase.DEFAULT_LINGER_TIME,
+                 max_pending_rows=_TimeseriesWriterBase.DEFAULT_MAX_PENDING_ROWS, retry_policy=None):
+        """
+        The parameters are the same as ``TimeseriesWriter``.
+        """
+        _TimeseriesWriterBase.__init__(self, client, table_name, max_batch_rows, max_batch_bytes, linger_time,
+                                       max_pending_rows, retry_policy)
+        self._cond = None
+        self._task = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    def _start(self):
+        if self._task is None:
+            self._cond = asyncio.Condition()
+            self._task = asyncio.ensure_future(self._run())
+
+    async def write(self, row):
+        """
+        Buffer a TimeseriesRow, waits while ``max_pending_rows`` points are buffered. Returns an asyncio.Future.
+        """
+        self._check_row(row)
+        self._start()
+        pending_point = _PendingPoint(row, self._compute_row_size(row), asyncio.get_running_loop().create_future())
+        async with self._cond:
+            while self._is_full() and not self._closed:
+                await self._cond.wait()
+            self._check_row(row)
+            if self._append(pending_point):
+                self._cond.notify_all()
+        return pending_point.future
+
+    async def flush(self):
+        """
+        Commit all buffered points and wait until they are finished.
+        """
+        if self._task is None:
+            return
+        async with self._cond:
+            self._flush_requested = True
+            self._cond.notify_all()
+            while self._pending_rows or self._inflight:
+                await self._cond.wait()
+
+    async def close(self):
+        """
+        Commit all buffered points and stop the background task. Points can not be written after close.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        if self._task is None:
+            return
+        async with self._cond:
+            self._cond.notify_all()
+        await self._task
+
+    async def _run(self):
+        while True:
+            async with self._cond:
+                while not self._is_batch_ready():
+                    if self._closed:
+                        return
+                    try:
+                        await asyncio.wait_for(self._cond.wait(), self._linger_timeout())
+                    except asyncio.TimeoutError:
+                        pass
+                batch = self._take_batch()
+                self._inflight += len(batch)
+                self._cond.notify_all()
+
+            try:
+                await self._commit(batch)
+            except Exception as e:
+                # an unexpected error fails the batch instead of stopping the background task
+                self._fail_batch(batch, e)
+            finally:
+                async with self._cond:
+                    self._inflight -= len(batch)
+                    self._cond.notify_all()
+
+    async def _commit(self, batch):
+        while batch:
+            try:
+                response = await self.client.put_timeseries_data(self.table_name, [p.row for p in batch])
+            except Exception as e:
+                self._fail_batch(batch, e)
+                return
+
+            batch = self._handle_response(batch, response)
+            if batch:
+                retry_delay = self._retry_delay(batch)
+                if retry_delay > 0:
+                    await asyncio.sleep(retry_delay)
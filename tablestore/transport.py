@@ -0,0 +1,130 @@
+# -*- coding: utf8 -*-
+# The interface of the HTTP transports of the clients, and the transports based on httpx
+
+__all__ = ['Transport', 'AsyncTransport', 'ResponseBody', 'HttpxTransport', 'AsyncHttpxTransport']
+
+import ssl
+from abc import ABC, abstractmethod
+
+import certifi
+
+from tablestore.error import *
+
+
+class ResponseBody(bytearray):
+    """
+    A response body received into one buffer, ``content_md5`` is the MD5 digest of the body computed while it is received.
+    The response MD5 check of the client uses ``content_md5`` instead of hashing the body again.
+    """
+
+    content_md5 = None
+
+
+class Transport(ABC):
+    """
+    The HTTP transport of OTSClient, which sends the requests to one endpoint. It is used by the threads of the client concurrently.
+
+    A transport is passed to the client by the ``transport`` parameter, the client does not close it.
+    """
+
+    @abstractmethod
+    def send_receive(self, url, request_headers, request_body):
+        """
+        Send a POST request to ``url``, the path of the API under the endpoint such as '/GetRow'.
+
+        Return: the HTTP status, reason, the headers as a dict and the body as bytes or ResponseBody of the response.
+        """
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class AsyncTransport(ABC):
+    """
+    The HTTP transport of AsyncOTSClient, the async version of ``Transport``.
+    """
+
+    @abstractmethod
+    async def send_receive(self, url, request_headers, request_body):
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+
+def _import_httpx():
+    try:
+        import httpx
+    except ImportError:
+        raise OTSClientError("httpx is required by the httpx transports, please install it by 'pip install tablestore[http2]'.")
+    return httpx
+
+
+def _make_httpx_options(httpx, timeout, maxsize, http2, client_ssl_version):
+    if isinstance(timeout, (list, tuple)):
+        conn_timeout, read_timeout = timeout
+    else:
+        conn_timeout = read_timeout = timeout
+
+    ssl_context = ssl.create_default_context(cafile=certifi.where())
+    if client_ssl_version is not None:
+        ssl_context.minimum_version = client_ssl_version
+
+    if http2:
+        try:
+            import h2
+        except ImportError:
+            raise OTSClientError("h2 is required by HTTP/2, please install it by 'pip install tablestore[http2]'.")
+
+    return dict(
+        http2=http2,
+        verify=ssl_context,
+        timeout=httpx.Timeout(read_timeout, connect=conn_timeout),
+        limits=httpx.Limits(max_connections=maxsize, max_keepalive_connections=maxsize),
+    )
+
+
+def _parse_httpx_response(response):
+    return response.status_code, response.reason_phrase, dict(response.headers), response.content
+
+
+class HttpxTransport(Transport):
+    """
+    A transport based on httpx, the concurrent requests are multiplexed over the connections by HTTP/2 when ``http2`` is True.
+
+    ``maxsize`` is the maximum number of connections, with HTTP/2 a connection carries many concurrent requests.
+    The other parameters are the same as those of ``ConnectionPool``.
+    """
+
+    def __init__(self, host, path='', timeout=50, maxsize=50, http2=True, client_ssl_version=None):
+        httpx = _import_httpx()
+        self.host = host
+        self.path = path
+        self.pool = httpx.Client(**_make_httpx_options(httpx, timeout, maxsize, http2, client_ssl_version))
+
+    def send_receive(self, url, request_headers, request_body):
+        response = self.pool.post(self.host + self.path + url, content=request_body, headers=request_headers)
+        return _parse_httpx_response(response)
+
+    def close(self):
+        self.pool.close()
+
+
+class AsyncHttpxTransport(AsyncTransport):
+    """
+    The async version of ``HttpxTransport``.
+    """
+
+    def __init__(self, host, path='', timeout=50, maxsize=50, http2=True, client_ssl_version=None):
+        httpx = _import_httpx()
+        self.host = host
+        self.path = path
+        self.pool = httpx.AsyncClient(**_make_httpx_options(httpx, timeout, maxsize, http2, client_ssl_version))
+
+    async def send_receive(self, url, request_headers, request_body):
+        response = await self.pool.post(self.host + self.path + url, content=request_body, headers=request_headers)
+        return _parse_httpx_response(response)
+
+    async def close(self):
+        await self.pool.aclose()
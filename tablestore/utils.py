@@ -1,7 +1,10 @@
 # -*- coding: utf8 -*-
 
+import asyncio
 import json
 import datetime
+import queue
+import threading
 from enum import Enum
 import struct
 
@@ -43,3 +46,79 @@ class VectorUtils:
 
 def get_now_utc_datetime():
     return datetime.datetime.now(datetime.timezone.utc)
+
+
+class _PrefetchFailure(object):
+    def __init__(self, error):
+        self.error = error
+
+
+_PREFETCH_END = object()
+
+
+def prefetch_iterator(iterable, prefetch_depth):
+    """
+    Iterate ``iterable`` on a background thread and keep up to ``prefetch_depth`` items ready,
+    so that producing the next item overlaps with processing the current one.
+    """
+    items = queue.Queue(prefetch_depth)
+    stop_event = threading.Event()
+
+    def put(item):
+        while not stop_event.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce():
+        try:
+            for item in iterable:
+                if not put(item):
+                    return
+            put(_PREFETCH_END)
+        except Exception as e:
+            put(_PrefetchFailure(e))
+
+    thread = threading.Thread(target=produce, name='tablestore-prefetch')
+    thread.daemon = True
+    thread.start()
+    try:
+        while True:
+            item = items.get()
+            if item is _PREFETCH_END:
+                return
+            if isinstance(item, _PrefetchFailure):
+                raise item.error
+            yield item
+    finally:
+        stop_event.set()
+
+
+async def aprefetch_iterator(async_iterable, prefetch_depth):
+    """
+    The asyncio version of prefetch_iterator, ``async_iterable`` is consumed by a background task.
+    """
+    items = asyncio.Queue(prefetch_depth)
+
+    async def produce():
+        try:
+            async for item in async_iterable:
+                await items.put(item)
+            await items.put(_PREFETCH_END)
+        except Exception as e:
+            await items.put(_PrefetchFailure(e))
+
+    task = asyncio.ensure_future(produce())
+    try:
+        while True:
+            item = await items.get()
+            if item is _PREFETCH_END:
+                return
+            if isinstance(item, _PrefetchFailure):
+                raise item.error
+            yield item
+    finally:
+        task.cancel()
@@ -1,4 +1,5 @@
 import asyncio
+import inspect
 import logging
 import random
 from collections.abc import AsyncGenerator
@@ -46,8 +47,12 @@ class RandomOTSClient:
         return result
 
     def generate_func_by_name(self, func_name):
+        # the methods which are not coroutines, such as prepare_search_query, are the same for both clients
+        async_func = getattr(AsyncOTSClient, func_name, None)
+        is_async = inspect.iscoroutinefunction(async_func) or inspect.isasyncgenfunction(async_func)
+
         def generated_func(*args, **kwargs):
-            if random.choice([True, False]):
+            if not is_async or random.choice([True, False]):
                 self.logger.info(f'use sync_client for {func_name}')
                 return getattr(self.sync_client, func_name)(*args, **kwargs)
             else:
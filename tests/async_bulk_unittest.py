@@ -0,0 +1,95 @@
+# -*- coding: utf8 -*-
+
+import asyncio
+import unittest
+
+from tablestore.client import AsyncOTSClient
+from tablestore.metadata import *
+
+
+class AsyncBulkTest(unittest.TestCase):
+
+    def setUp(self):
+        self.client = AsyncOTSClient('http://test.endpoint', 'test_id', 'test_key', 'test-inst', max_connection=4)
+        self.inflight = 0
+        self.max_inflight = 0
+        self.requests = []
+
+    async def enter(self, request):
+        self.requests.append(request)
+        self.inflight += 1
+        self.max_inflight = max(self.max_inflight, self.inflight)
+        await asyncio.sleep(0.001)
+        self.inflight -= 1
+
+    def test_get_rows_many(self):
+        async def batch_get_row(request):
+            await self.enter(request)
+            item = request.items['t']
+            if item.primary_keys[0][0][1] == 100:
+                raise OTSServiceError(503, 'OTSServerBusy', 'mock error')
+            rows = [RowDataItem(True, None, None, 't', CapacityUnit(1, 0), pk, [('col', pk[0][1])])
+                    for pk in item.primary_keys]
+            return BatchGetRowResponse({'t': rows})
+
+        self.client.batch_get_row = batch_get_row
+        primary_keys = [[('pk', i)] for i in range(250)]
+        items = asyncio.run(self.client.get_rows_many('t', primary_keys, columns_to_get=['col'], batch_size=50))
+
+        self.assertEqual(5, len(self.requests))
+        self.assertEqual(['col'], self.requests[0].items['t'].columns_to_get)
+        self.assertTrue(self.max_inflight <= 4)
+        self.assertEqual(250, len(items))
+        for i, item in enumerate(items):
+            if 100 <= i < 150:
+                self.assertFalse(item.is_ok)
+                self.assertEqual('OTSServerBusy', item.error_code)
+            else:
+                self.assertTrue(item.is_ok)
+                self.assertEqual([('pk', i)], item.row.primary_key)
+
+        with self.assertRaisesRegex(OTSClientError, 'batch_size'):
+            asyncio.run(self.client.get_rows_many('t', primary_keys, batch_size=101))
+
+    def test_put_rows_many(self):
+        async def batch_write_row(request):
+            await self.enter(request)
+            items = []
+            for row_item in request.items['t'].row_items:
+                if row_item.row.primary_key[0][1] == 7:
+                    items.append(BatchWriteRowResponseItem(False, 'OTSConditionCheckFail', 'mock error', None, None))
+                else:
+                    items.append(BatchWriteRowResponseItem(True, None, None, CapacityUnit(0, 1), None))
+            return BatchWriteRowResponse(request, {'t': items})
+
+        self.client.batch_write_row = batch_write_row
+        rows = [Row([('pk', i % 15)], [('col', i)]) for i in range(40)]
+        items = asyncio.run(self.client.put_rows_many('t', rows, batch_size=20, max_concurrency=100))
+
+        # every 15 rows the primary keys repeat
+        self.assertEqual([15, 15, 10], [len(r.items['t'].row_items) for r in self.requests])
+        self.assertTrue(self.max_inflight <= 4)
+        self.assertEqual(list(range(40)), [item.index for item in items])
+        self.assertEqual([7, 22, 37], [item.index for item in items if not item.is_ok])
+
+    def test_search_pages(self):
+        async def search(table_name, index_name, search_query, *args):
+            await self.enter(search_query)
+            page = int(search_query.next_token) if search_query.next_token else 0
+            next_token = str(page + 1).encode('utf-8') if page < 4 else b''
+            return SearchResponse([page], None, None, next_token, True, None, None)
+
+        self.client.search = search
+        query = SearchQuery(MatchAllQuery(), limit=10)
+
+        async def pages(prefetch_depth):
+            return [response.rows[0] async for response in self.client.search_pages(
+                't', 'i', query, prefetch_depth=prefetch_depth)]
+
+        self.assertEqual(list(range(5)), asyncio.run(pages(1)))
+        self.assertEqual(list(range(5)), asyncio.run(pages(0)))
+        self.assertEqual(None, query.next_token)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,7 @@
 # -*- coding: utf8 -*-
 
+import datetime
+
 from tests.lib.api_test_base import APITestBase
 from tablestore.credentials import StaticCredentialsProvider
 from tablestore.auth import *
@@ -81,3 +83,38 @@ class AuthTest(APITestBase):
             v4_signer.make_response_signature(self.test_query, self.headers)
         )
         v2_signer.signing_key = origin_v2_signing_key
+
+    def test_signature_cache(self):
+        cred = StaticCredentialsProvider(self.test_ak_id, self.test_ak_secret)
+        for signer in [SignV2(cred, self.test_encoding), SignV4(cred, self.test_encoding, region=self.test_region)]:
+            signer.gen_signing_key()
+            signatures = []
+            for query in ['/GetRow', '/GetRow', '/PutRow?b=2&a=1']:
+                headers = self.headers.copy()
+                signer.make_request_signature_and_add_headers(query, headers)
+                signatures.append((headers, signer.make_response_signature(query, self.headers)))
+                # the cached prefix of the query gives the same signature string as parsing it
+                uri, _, query_string = urlparse(query)[2:5]
+                expected = uri + '\nPOST\n' + urlencode(sorted(parse_qsl(query_string))) + '\n'
+                self.assertEqual(expected, signer._get_query_signature_prefix(query)[1])
+            self.assertEqual(signatures[0], signatures[1])
+            # only the queries without parameters are cached
+            self.assertEqual(['/GetRow'], list(signer._query_signature_prefixes))
+
+    def test_v4_signing_key_cache(self):
+        cred = StaticCredentialsProvider(self.test_ak_id, self.test_ak_secret)
+        signer = SignV4(cred, self.test_encoding, region=self.test_region)
+        signer.gen_signing_key()
+        signing_key = signer.signing_key
+        signer.gen_signing_key()
+        self.assertIs(signing_key, signer.signing_key)
+
+        # the signing key is derived again when the date or the secret changes
+        signer.sign_date = '20000101'
+        signer._sign_date_expire_time = 0
+        signer.gen_signing_key()
+        self.assertEqual(signing_key, signer.signing_key)
+        self.assertEqual(datetime.datetime.now(datetime.timezone.utc).strftime('%Y%m%d'), signer.sign_date)
+        cred._credentials._access_key_secret = 'new_key'
+        signer.gen_signing_key()
+        self.assertNotEqual(signing_key, signer.signing_key)
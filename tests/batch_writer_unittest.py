@@ -0,0 +1,137 @@
+# -*- coding: utf8 -*-
+
+import unittest
+
+from tablestore import *
+from tests.lib.fake_client import FakeClient
+
+
+class FakeBatchWriteClient(FakeClient):
+    """Records BatchWriteRow requests and fails each row in ``fail_times`` that many times."""
+
+    def batch_write_row(self, request):
+        with self.lock:
+            self.requests.append(request)
+            response = {}
+            for table_name, table_item in request.items.items():
+                response[table_name] = []
+                for row_item in table_item.row_items:
+                    if self.fail((table_name, row_item.row.primary_key[0][1])):
+                        item = BatchWriteRowResponseItem(False, self.error_code, self.ERROR_MESSAGE, None, None)
+                    else:
+                        item = BatchWriteRowResponseItem(True, None, None, CapacityUnit(0, 1), None)
+                    response[table_name].append(item)
+            return BatchWriteRowResponse(request, response)
+
+
+class BatchWriterTest(unittest.TestCase):
+
+    def test_flush_by_row_count(self):
+        client = FakeBatchWriteClient()
+        with BatchWriter(client, max_batch_rows=10, linger_time=60) as writer:
+            futures = [writer.put_row('t', Row([('pk', i)], [('col', 'v')])) for i in range(25)]
+            writer.flush()
+        for future in futures:
+            self.assertTrue(future.result().is_ok)
+        self.assertEqual([10, 10, 5], [len(r.items['t'].row_items) for r in client.requests])
+
+    def test_flush_by_bytes(self):
+        client = FakeBatchWriteClient()
+        with BatchWriter(client, max_batch_bytes=1024, linger_time=60) as writer:
+            for i in range(10):
+                writer.put_row('t', Row([('pk', i)], [('col', 'x' * 300)]))
+        self.assertTrue(len(client.requests) >= 4)
+        for request in client.requests:
+            self.assertTrue(len(request.items['t'].row_items) <= 3)
+
+    def test_linger_time(self):
+        client = FakeBatchWriteClient()
+        writer = BatchWriter(client, linger_time=0.01)
+        future = writer.update_row('t', Row([('pk', 1)], {'put': [('col', 1)]}))
+        self.assertTrue(future.result(timeout=5).is_ok)
+        writer.close()
+
+    def test_mixed_tables_and_types(self):
+        client = FakeBatchWriteClient()
+        with BatchWriter(client, linger_time=60) as writer:
+            f1 = writer.put_row('t1', Row([('pk', 1)], [('col', 1)]))
+            f2 = writer.delete_row('t2', [('pk', 2)])
+            f3 = writer.update_row('t1', Row([('pk', 3)], {'delete_all': ['col']}))
+        self.assertEqual(1, len(client.requests))
+        self.assertEqual(['t1', 't2'], sorted(client.requests[0].items.keys()))
+        self.assertTrue(f1.result().is_ok and f2.result().is_ok and f3.result().is_ok)
+
+    def test_duplicated_row_split_batch(self):
+        client = FakeBatchWriteClient()
+        with BatchWriter(client, linger_time=60) as writer:
+            writer.put_row('t', Row([('pk', 1)], [('col', 1)]))
+            writer.put_row('t', Row([('pk', 1)], [('col', 2)]))
+        self.assertEqual(2, len(client.requests))
+
+    def test_retry_failed_rows_only(self):
+        client = FakeBatchWriteClient(fail_times={('t', 1): 2})
+        with BatchWriter(client, linger_time=60) as writer:
+            futures = [writer.put_row('t', Row([('pk', i)], [('col', i)])) for i in range(3)]
+        for future in futures:
+            self.assertTrue(future.result().is_ok)
+        self.assertEqual(3, len(client.requests))
+        self.assertEqual(3, len(client.requests[0].items['t'].row_items))
+        self.assertEqual([('pk', 1)], client.requests[1].items['t'].row_items[0].row.primary_key)
+        self.assertEqual(1, len(client.requests[2].items['t'].row_items))
+
+    def test_not_retryable_error(self):
+        client = FakeBatchWriteClient(fail_times={('t', 0): 1}, error_code='OTSConditionCheckFail')
+        with BatchWriter(client, linger_time=60) as writer:
+            failed = writer.put_row('t', Row([('pk', 0)], [('col', 0)]))
+            succeed = writer.put_row('t', Row([('pk', 1)], [('col', 1)]))
+        self.assertTrue(succeed.result().is_ok)
+        with self.assertRaises(OTSServiceError) as cm:
+            failed.result()
+        self.assertEqual('OTSConditionCheckFail', cm.exception.code)
+        self.assertEqual(1, len(client.requests))
+
+    def test_request_error(self):
+        client = FakeBatchWriteClient()
+
+        def raise_error(request):
+            raise OTSClientError('network error')
+
+        client.batch_write_row = raise_error
+        with BatchWriter(client, linger_time=60) as writer:
+            future = writer.put_row('t', Row([('pk', 0)], [('col', 0)]))
+        self.assertRaisesRegex(OTSClientError, 'network error', future.result)
+
+    def test_cancelled_future(self):
+        client = FakeBatchWriteClient(fail_times={('t', 1): 1})
+        with BatchWriter(client, linger_time=60) as writer:
+            futures = [writer.put_row('t', Row([('pk', i)], [('col', i)])) for i in range(3)]
+            # a cancelled row is still sent, but its result is dropped
+            self.assertTrue(futures[0].cancel() and futures[1].cancel())
+            writer.flush()
+            self.assertTrue(futures[2].result(timeout=5).is_ok)
+            future = writer.put_row('t', Row([('pk', 3)], [('col', 3)]))
+            writer.flush()
+            self.assertTrue(future.result(timeout=5).is_ok)
+        self.assertEqual(3, len(client.requests))
+
+    def test_unexpected_error(self):
+        client = FakeBatchWriteClient()
+        client.batch_write_row = lambda request: None
+        with BatchWriter(client, linger_time=60) as writer:
+            future = writer.put_row('t', Row([('pk', 0)], [('col', 0)]))
+            writer.flush()
+            self.assertRaises(AttributeError, future.result, 5)
+            # the background thread keeps running after the error
+            self.assertTrue(writer._thread.is_alive())
+
+    def test_closed(self):
+        writer = BatchWriter(FakeBatchWriteClient())
+        writer.close()
+        with self.assertRaisesRegex(OTSClientError, 'BatchWriter is closed.'):
+            writer.put_row('t', Row([('pk', 0)], [('col', 0)]))
+        with self.assertRaisesRegex(OTSClientError, 'max_batch_rows'):
+            BatchWriter(FakeBatchWriteClient(), max_batch_rows=201)
+
+
+if __name__ == '__main__':
+    unittest.main()
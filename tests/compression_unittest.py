@@ -0,0 +1,107 @@
+# -*- coding: utf8 -*-
+
+import base64
+import hashlib
+import unittest
+import zlib
+
+import tablestore.protobuf.table_store_pb2 as pb2
+from tablestore import utils
+from tablestore.client import OTSClient
+from tablestore.error import OTSClientError
+from tablestore.metadata import *
+from tablestore.transport import Transport
+
+
+class CompressionServer(Transport):
+    """Answers PutRow and ListTable as the server does, with the bodies compressed by deflate if they are asked to."""
+
+    def __init__(self, tables=()):
+        self.tables = tables
+        self.client = None
+        self.requests = []
+
+    def send_receive(self, url, request_headers, request_body):
+        # the MD5 is of the body sent, and the compression headers are signed
+        md5 = base64.b64encode(hashlib.md5(request_body).digest()).decode('utf8')
+        assert md5 == request_headers['x-ots-contentmd5']
+        signed_headers = dict((k, v) for k, v in request_headers.items() if k not in ('x-ots-signature', 'User-Agent'))
+        self.client._signer.make_request_signature_and_add_headers(url, signed_headers)
+        assert request_headers['x-ots-signature'] == signed_headers['x-ots-signature']
+
+        raw_body = request_body
+        if request_headers.get('x-ots-request-compress-type') == 'deflate':
+            raw_body = zlib.decompress(request_body)
+            assert len(raw_body) == int(request_headers['x-ots-request-compress-size'])
+        self.requests.append((url, len(request_body), raw_body))
+
+        if url == '/PutRow':
+            proto = pb2.PutRowResponse()
+            proto.consumed.capacity_unit.write = 1
+        else:
+            proto = pb2.ListTableResponse()
+            proto.table_names.extend(self.tables)
+        body = proto.SerializeToString()
+
+        headers = {
+            'x-ots-date': utils.get_now_utc_datetime().strftime('%Y-%m-%dT%H:%M:%S.000Z'),
+            'x-ots-requestid': 'request-id',
+            'x-ots-contenttype': 'protocol buffer',
+        }
+        if request_headers.get('x-ots-response-compress-type') == 'deflate':
+            headers['x-ots-response-compress-type'] = 'deflate'
+            headers['x-ots-response-compress-size'] = str(len(body))
+            body = zlib.compress(body)
+        headers['x-ots-contentmd5'] = base64.b64encode(hashlib.md5(body).digest()).decode('utf8')
+        headers['authorization'] = 'OTS test_id:%s' % self.client._signer.make_response_signature(url, headers)
+        return 200, 'OK', headers, body
+
+
+class CompressionTest(unittest.TestCase):
+
+    def make_client(self, server, **kwargs):
+        client = OTSClient('http://test.endpoint', 'test_id', 'test_key', 'test-inst', transport=server, **kwargs)
+        server.client = client
+        return client
+
+    def test_request_compression(self):
+        server = CompressionServer()
+        client = self.make_client(server, request_compression='deflate', compression_threshold=100)
+        small_row = Row([('pk', 1)], [('col', 'v')])
+        large_row = Row([('pk', 1)], [('col%d' % i, 'value' * 10) for i in range(100)])
+        client.put_row('t', small_row)
+        consumed, _ = client.put_row('t', large_row)
+        self.assertEqual(1, consumed.write)
+
+        (_, small_size, small_body), (_, large_size, large_body) = server.requests
+        # the small body is sent as it is, the large one is compressed
+        self.assertEqual(small_size, len(small_body))
+        self.assertLess(large_size * 10, len(large_body))
+        expected = client.protocol.encoder.encode_request('PutRow', 't', large_row, None, None, None)
+        self.assertEqual(expected, pb2.PutRowRequest.FromString(large_body))
+
+    def test_response_compression(self):
+        tables = tuple('table_%d' % i for i in range(100))
+        server = CompressionServer(tables)
+        client = self.make_client(server, response_compression='deflate')
+        self.assertEqual(tables, client.list_table())
+        self.assertEqual(tables, self.make_client(server).list_table())
+
+    def test_invalid_response(self):
+        client = self.make_client(CompressionServer(), response_compression='deflate')
+        headers = {'x-ots-response-compress-type': 'deflate', 'x-ots-response-compress-size': '3'}
+        self.assertEqual(b'abc', client.protocol._decompress_response(headers, zlib.compress(b'abc')))
+        self.assertRaisesRegex(OTSClientError, 'Size mismatch', client.protocol._decompress_response,
+                               headers, zlib.compress(b'abcd'))
+        self.assertRaisesRegex(OTSClientError, 'Failed to decompress', client.protocol._decompress_response,
+                               headers, b'abc')
+        self.assertRaisesRegex(OTSClientError, 'not supported', client.protocol._decompress_response,
+                               {'x-ots-response-compress-type': 'lz4'}, b'abc')
+
+    def test_unsupported(self):
+        self.assertRaisesRegex(OTSClientError, 'Compression zstd is not supported', OTSClient, 'http://test.endpoint',
+                               'test_id', 'test_key', 'test-inst', request_compression='zstd')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,288 @@
+# -*- coding: utf8 -*-
+
+import asyncio
+import gc
+import hashlib
+import logging
+import os
+import ssl
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from tablestore.client import OTSClient, AsyncOTSClient
+from tablestore.connection import ConnectionPool, AsyncConnectionPool
+from tablestore.error import OTSClientError
+from tablestore.transport import ResponseBody
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        BaseHTTPRequestHandler.setup(self)
+        self.server.connections += 1
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers['Content-Length']))
+        self.send_response(200)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'ok')
+
+    def log_message(self, *args):
+        pass
+
+
+class BodyHandler(KeepAliveHandler):
+    """Answers with ``server.body``, in chunks of 1000 bytes if ``server.chunked`` is True."""
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers['Content-Length']))
+        body = self.server.body
+        self.send_response(200)
+        if self.server.chunked:
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            for i in range(0, len(body), 1000):
+                chunk = body[i:i + 1000]
+                self.wfile.write(b'%x\r\n%s\r\n' % (len(chunk), chunk))
+            self.wfile.write(b'0\r\n\r\n')
+        else:
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+
+class HTTPServerTestCase(unittest.TestCase):
+    handler = KeepAliveHandler
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), self.handler)
+        self.server.daemon_threads = True
+        self.server.connections = 0
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.host = 'http://127.0.0.1:%d' % self.server.server_address[1]
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class ConnectionPoolTest(HTTPServerTestCase):
+
+    def send(self, pool):
+        status, _, _, body = pool.send_receive('/ListTable', {}, b'body')
+        self.assertEqual((200, b'ok'), (status, body))
+
+    def test_warm_up(self):
+        pool = ConnectionPool(self.host, '', timeout=5, maxsize=5, warm_up=3)
+        self.assertEqual(3, pool.warm_up())
+        self.assertEqual(0, pool.warm_up())
+        self.assertEqual({'idle': 3, 'active': 0, 'created': 3, 'discarded': 0, 'tls_resumed': 0}, pool.stats())
+        for _ in range(3):
+            self.send(pool)
+        self.assertEqual(3, pool.stats()['created'])
+        self.assertEqual(3, self.server.connections)
+        pool.close()
+
+    def test_idle_timeout(self):
+        pool = ConnectionPool(self.host, '', timeout=5, idle_timeout=0.05)
+        self.send(pool)
+        self.send(pool)
+        time.sleep(0.1)
+        # the idle connection is closed when it is taken out of the pool
+        self.send(pool)
+        self.assertEqual({'idle': 1, 'active': 0, 'created': 2, 'discarded': 1, 'tls_resumed': 0}, pool.stats())
+
+        time.sleep(0.1)
+        self.assertEqual(1, pool.reap_idle_connections())
+        self.assertEqual(0, pool.stats()['idle'])
+        self.send(pool)
+        self.assertEqual(3, self.server.connections)
+        pool.close()
+
+    def test_keepalive(self):
+        pool = ConnectionPool(self.host, '', timeout=5, idle_timeout=0.05, keepalive_interval=0.02, warm_up=2)
+        deadline = time.time() + 5
+        while pool.stats()['discarded'] < 2 and time.time() < deadline:
+            time.sleep(0.01)
+        stats = pool.stats()
+        self.assertGreaterEqual(stats['discarded'], 2)
+        self.assertGreaterEqual(stats['created'], 4)
+        pool.close()
+        self.assertFalse(pool._keepalive_thread.join(1) or pool._keepalive_thread.is_alive())
+
+    def test_warm_up_busy_pool(self):
+        pool = ConnectionPool(self.host, '', timeout=5, maxsize=2)
+        url_pool = pool.pool.connection_from_url(self.host)
+        conns = [url_pool._get_conn(), url_pool._get_conn()]
+        # the warm-up does not wait for the connections taken by the requests
+        self.assertEqual(0, pool.warm_up(2))
+        for conn in conns:
+            url_pool._put_conn(conn)
+        self.assertEqual(2, pool.warm_up(2))
+        self.assertEqual(0, pool.warm_up(2))
+        self.assertEqual(2, pool.stats()['idle'])
+        pool.close()
+
+    def test_keepalive_error(self):
+        logger = logging.getLogger('tablestore-connection-test')
+        with self.assertLogs(logger, 'WARNING') as logs:
+            pool = ConnectionPool('http://127.0.0.1:1', '', timeout=5, keepalive_interval=0.01, warm_up=1, logger=logger)
+            deadline = time.time() + 5
+            while not logs.records and time.time() < deadline:
+                time.sleep(0.01)
+            pool.close()
+        self.assertIn('Failed to keep the connections', logs.output[0])
+
+    def test_tls_session_resumption_ssl_version(self):
+        # the protocol constants pin the TLS version, a TLSVersion is the minimum version
+        pool = ConnectionPool(self.host, '', client_ssl_version=ssl.PROTOCOL_TLSv1_2, tls_session_resumption=True)
+        self.assertEqual((ssl.TLSVersion.TLSv1_2, ssl.TLSVersion.TLSv1_2),
+                         (pool.ssl_context.minimum_version, pool.ssl_context.maximum_version))
+        pool.close()
+        pool = ConnectionPool(self.host, '', client_ssl_version=ssl.TLSVersion.TLSv1_3, tls_session_resumption=True)
+        self.assertEqual((ssl.TLSVersion.TLSv1_3, ssl.TLSVersion.MAXIMUM_SUPPORTED),
+                         (pool.ssl_context.minimum_version, pool.ssl_context.maximum_version))
+        pool.close()
+        pool = ConnectionPool(self.host, '', client_ssl_version=ssl.PROTOCOL_TLS, tls_session_resumption=True)
+        self.assertEqual(ssl.TLSVersion.MAXIMUM_SUPPORTED, pool.ssl_context.maximum_version)
+        pool.close()
+        self.assertRaises(OTSClientError, ConnectionPool, self.host, '', client_ssl_version=ssl.PROTOCOL_TLS_SERVER,
+                          tls_session_resumption=True)
+
+    def test_client(self):
+        with OTSClient(self.host, 'test_id', 'test_key', 'test-inst', connection_warm_up=2) as client:
+            self.assertEqual(2, client.connection.stats()['idle'])
+        # a failed warm-up does not fail the client
+        client = OTSClient('http://127.0.0.1:1', 'test_id', 'test_key', 'test-inst', connection_warm_up=2)
+        self.assertEqual(0, client.connection.stats()['idle'])
+
+
+class AsyncConnectionPoolTest(HTTPServerTestCase):
+
+    def test_shared_pool(self):
+        clients = [AsyncOTSClient(self.host, 'id%d' % i, 'key%d' % i, 'test-inst', share_connection_pool=True,
+                                  max_connection=20, max_connection_per_host=5, dns_cache_ttl=60) for i in range(3)]
+        other = AsyncOTSClient(self.host, 'id', 'key', 'test-inst', share_connection_pool=True, max_connection=10)
+
+        async def run():
+            pools = [client._get_or_create_connection() for client in clients]
+            self.assertTrue(all(pool is pools[0] for pool in pools))
+            self.assertIsNot(pools[0], other._get_or_create_connection())
+            connector = pools[0].pool.connector
+            self.assertEqual((20, 5), (connector.limit, connector.limit_per_host))
+
+            for pool in pools:
+                status, _, _, body = await pool.send_receive('/ListTable', {}, b'body')
+                self.assertEqual((200, b'ok'), (status, body))
+            await clients[0].close()
+            await clients[1].close()
+            self.assertFalse(pools[0].pool.closed)
+            await clients[2].close()
+            self.assertTrue(pools[0].pool.closed)
+            await other.close()
+            return pools[0]
+
+        pool = asyncio.run(run())
+        # the requests of the clients are sent through one connection
+        self.assertEqual(1, self.server.connections)
+        self.assertNotIn(pool.loop, AsyncConnectionPool._shared_pools)
+
+    def test_shared_pool_of_closed_loop(self):
+        client = AsyncOTSClient(self.host, 'id', 'key', 'test-inst', share_connection_pool=True)
+
+        async def get_pool():
+            pool = client._get_or_create_connection()
+            # let the pool of the previous event loop be closed
+            await asyncio.sleep(0)
+            return pool
+
+        first = asyncio.run(get_pool())
+        second = asyncio.run(get_pool())
+        self.assertIsNot(first, second)
+        self.assertTrue(first.pool.closed)
+        self.assertNotIn(first.loop, AsyncConnectionPool._shared_pools)
+
+        # the registry does not keep the pools and the event loops of the clients which are not closed,
+        # only the session of the pool is closed here
+        asyncio.run(second.close())
+        loops = len(AsyncConnectionPool._shared_pools)
+        del client, first, second
+        gc.collect()
+        self.assertEqual(loops - 1, len(AsyncConnectionPool._shared_pools))
+
+    def test_detach_from_running_loop(self):
+        client = AsyncOTSClient(self.host, 'id', 'key', 'test-inst', share_connection_pool=True)
+        loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=loop.run_forever)
+        thread.start()
+
+        async def get_pool():
+            return client._get_or_create_connection()
+
+        try:
+            first = asyncio.run_coroutine_threadsafe(get_pool(), loop).result()
+            asyncio.run(get_pool())
+            # the pool is closed in its own event loop
+            asyncio.run_coroutine_threadsafe(asyncio.sleep(0), loop).result()
+            self.assertTrue(first.pool.closed)
+            asyncio.run(client.close())
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+            loop.close()
+
+    def test_lifecycle(self):
+        client = AsyncOTSClient(self.host, 'id', 'key', 'test-inst')
+
+        async def get_pool():
+            return client._get_or_create_connection()
+
+        async def close():
+            await client.close()
+
+        # a client which has not sent any request is closed without error
+        asyncio.run(close())
+        first = asyncio.run(get_pool())
+        # a pool of a previous event loop is replaced by a pool of the running one
+        second = asyncio.run(get_pool())
+        self.assertIsNot(first, second)
+        asyncio.run(close())
+        self.assertTrue(second.pool.closed)
+
+
+
+class ResponseBodyTest(HTTPServerTestCase):
+    handler = BodyHandler
+
+    def check_body(self, body):
+        self.assertIsInstance(body, ResponseBody)
+        self.assertEqual(self.server.body, body)
+        self.assertEqual(hashlib.md5(self.server.body).digest(), body.content_md5)
+
+    def test_receive(self):
+        pool = ConnectionPool(self.host, '', timeout=5)
+        for size in [0, 10, 200 * 1024 + 1]:
+            for chunked in [False, True]:
+                self.server.body, self.server.chunked = os.urandom(size), chunked
+                self.check_body(pool.send_receive('/GetRange', {}, b'body')[3])
+        # the connection is reused after the bodies are received
+        self.assertEqual(1, self.server.connections)
+        pool.close()
+
+    def test_async_receive(self):
+        async def run():
+            pool = AsyncConnectionPool(self.host, '', timeout=5)
+            for size in [0, 10, 200 * 1024 + 1]:
+                for chunked in [False, True]:
+                    self.server.body, self.server.chunked = os.urandom(size), chunked
+                    self.check_body((await pool.send_receive('/GetRange', {}, b'body'))[3])
+            await pool.close()
+
+        asyncio.run(run())
+
+if __name__ == '__main__':
+    unittest.main()
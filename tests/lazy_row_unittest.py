@@ -0,0 +1,105 @@
+# -*- coding: utf8 -*-
+
+import unittest
+
+import tablestore.protobuf.table_store_pb2 as pb2
+from tablestore import LazyRow
+from tablestore.decoder import OTSProtoBufferDecoder
+from tablestore.error import OTSClientError
+from tablestore.plainbuffer.plain_buffer_builder import PlainBufferBuilder
+from tablestore.plainbuffer.plain_buffer_fast_decoder import PlainBufferFastDecoder
+from tests.lib.plain_buffer_rows import serialize_rows
+
+
+ROWS = [
+    ([('gid', 1), ('uid', u'中文')],
+     [('s', u'hello 世界', 1), ('s', u'old', 0), ('i', -(1 << 62), 1700000000000), ('d', 3.25, 2),
+      ('b', bytearray(b'\x01\x02\x03'), 3), (u'列', True, 4)]),
+    ([('gid', 2), ('uid', u'')], []),
+    ([('gid', 3), ('uid', u'x' * 100)], [('i', 0, 5)]),
+]
+
+
+class LazyRowTest(unittest.TestCase):
+
+    def test_read_lazy_rows(self):
+        data = serialize_rows(ROWS)
+        rows = PlainBufferFastDecoder.read_lazy_rows(data)
+        self.assertEqual(len(ROWS), len(rows))
+        for row, (primary_key, attribute_columns) in zip(rows, ROWS):
+            self.assertIsInstance(row, LazyRow)
+            self.assertEqual(primary_key, row.primary_key)
+            self.assertIsNone(row._attribute_columns)
+            self.assertEqual(attribute_columns, row.attribute_columns)
+
+    def test_get_column(self):
+        row = PlainBufferFastDecoder.read_lazy_row(serialize_rows(ROWS[:1]))
+        self.assertEqual(['s', 'i', 'd', 'b', u'列'], row.column_names())
+        self.assertEqual([('s', u'hello 世界', 1), ('s', u'old', 0)], row.get_column('s'))
+        self.assertEqual([(u'列', True, 4)], row.get_column(u'列'))
+        self.assertEqual([], row.get_column('missing'))
+        # the whole row is not decoded by get_column
+        self.assertIsNone(row._attribute_columns)
+
+        row.attribute_columns
+        self.assertEqual([('d', 3.25, 2)], row.get_column('d'))
+        self.assertEqual(['s', 'i', 'd', 'b', u'列'], row.column_names())
+
+    def test_checksum(self):
+        data = bytearray(serialize_rows(ROWS[:1]))
+        # corrupt the last byte of the value of column 'i'
+        data[data.index(b'\x01\x00\x00\x00i') + 17] ^= 0xff
+        row = PlainBufferFastDecoder.read_lazy_row(bytes(data))
+        self.assertEqual([('d', 3.25, 2)], row.get_column('d'))
+        self.assertRaises(OTSClientError, row.get_column, 'i')
+        self.assertRaises(OTSClientError, lambda: row.attribute_columns)
+
+        row = PlainBufferFastDecoder.read_lazy_row(bytes(data), verify_checksum=False)
+        self.assertEqual(1, len(row.get_column('i')))
+
+        # the row checksum is verified when the row is created
+        data = bytearray(serialize_rows(ROWS[:1]))
+        data[-1] ^= 0xff
+        self.assertRaises(OTSClientError, PlainBufferFastDecoder.read_lazy_row, bytes(data))
+        self.assertRaises(OTSClientError, PlainBufferFastDecoder.read_lazy_row, bytes(data[:-10]))
+
+    def test_decode_get_range(self):
+        proto = pb2.GetRangeResponse()
+        proto.consumed.capacity_unit.read = 1
+        proto.rows = serialize_rows(ROWS)
+        decoder = OTSProtoBufferDecoder('utf-8')
+
+        (_, _, lazy_rows, _), _ = decoder.decode_response(
+            'GetRange', proto.SerializeToString(), 'request-id', {'lazy_rows': True})
+        (_, _, rows, _), _ = decoder.decode_response('GetRange', proto.SerializeToString(), 'request-id')
+        self.assertTrue(all(isinstance(row, LazyRow) for row in lazy_rows))
+        self.assertFalse(any(isinstance(row, LazyRow) for row in rows))
+        self.assertEqual([(row.primary_key, row.attribute_columns) for row in rows],
+                         [(row.primary_key, row.attribute_columns) for row in lazy_rows])
+
+    def test_decode_batch_get_row(self):
+        proto = pb2.BatchGetRowResponse()
+        table = proto.tables.add()
+        table.table_name = 'table'
+        for primary_key, attribute_columns in ROWS:
+            item = table.rows.add()
+            item.is_ok = True
+            item.consumed.capacity_unit.read = 1
+            item.row = PlainBufferBuilder.serialize_for_put_row(primary_key, attribute_columns)
+        item = table.rows.add()
+        item.is_ok = False
+        item.error.code = 'OTSRowOperationConflict'
+
+        items, _ = OTSProtoBufferDecoder('utf-8').decode_response(
+            'BatchGetRow', proto.SerializeToString(), 'request-id', {'lazy_rows': True})
+        items = items['table']
+        self.assertEqual(len(ROWS) + 1, len(items))
+        for item, (primary_key, attribute_columns) in zip(items, ROWS):
+            self.assertIsInstance(item.row, LazyRow)
+            self.assertEqual(primary_key, item.row.primary_key)
+            self.assertEqual(attribute_columns, item.row.attribute_columns)
+        self.assertIsNone(items[-1].row)
+
+
+if __name__ == '__main__':
+    unittest.main()
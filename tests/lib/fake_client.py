@@ -0,0 +1,31 @@
+# -*- coding: utf8 -*-
+
+import threading
+
+from tablestore.retry import NoDelayRetryPolicy
+
+
+class FakeClient(object):
+    """
+    The base of the fake clients, which record the requests and fail the items of a request by their keys.
+    The item of a key in ``fail_times`` fails that many times with ``error_code``, the subclasses build the
+    responses of their API with ``fail``.
+    """
+
+    ERROR_MESSAGE = 'mock error'
+
+    def __init__(self, fail_times=None, error_code='OTSServerBusy'):
+        self.retry_policy = NoDelayRetryPolicy()
+        self.requests = []
+        self.fail_times = dict(fail_times or {})
+        self.error_code = error_code
+        self.lock = threading.Lock()
+
+    def fail(self, key):
+        """
+        Return True if the item of ``key`` should fail this time, it is called with ``lock`` held.
+        """
+        if self.fail_times.get(key, 0) > 0:
+            self.fail_times[key] -= 1
+            return True
+        return False
@@ -0,0 +1,15 @@
+# -*- coding: utf8 -*-
+
+from tablestore.plainbuffer.plain_buffer_builder import PlainBufferBuilder
+
+
+def serialize_rows(rows):
+    """
+    Serialize the (primary key, attribute columns) of ``rows`` into the plain buffer of GetRange, where the rows
+    share one header.
+    """
+    data = bytearray()
+    for index, (primary_key, attribute_columns) in enumerate(rows):
+        row = PlainBufferBuilder.serialize_for_put_row(primary_key, attribute_columns)
+        data += row if index == 0 else row[4:]
+    return bytes(data)
@@ -0,0 +1,125 @@
+# -*- coding: utf8 -*-
+
+import asyncio
+import time
+import unittest
+
+from tablestore import *
+from tablestore.retry import RetryUtil
+from tablestore.metadata import ComputeSplitsResponse, ParallelScanResponse
+from tests.lib.fake_client import FakeClient
+
+
+class FakeSearchIndex(FakeClient):
+    """
+    Serves ParallelScan of ``splits_size`` splits, each split has ``rows_per_split`` rows.
+    The page of each (split, offset) in ``fail_times`` fails that many times.
+    """
+
+    def __init__(self, splits_size=3, rows_per_split=10, page_size=4, fail_times=None, error_code='OTSServerBusy'):
+        FakeClient.__init__(self, fail_times, error_code)
+        self.splits_size = splits_size
+        self.rows_per_split = rows_per_split
+        self.page_size = page_size
+        self.active_splits = set()
+        self.max_active_splits = 0
+
+    def compute_splits(self, table_name, index_name):
+        return ComputeSplitsResponse('session', self.splits_size)
+
+    def parallel_scan(self, table_name, index_name, scan_query, session_id, columns_to_get=None, timeout_s=None):
+        split_id = scan_query.current_parallel_id
+        offset = int(scan_query.next_token) if scan_query.next_token else 0
+        with self.lock:
+            self.requests.append((split_id, offset, scan_query.limit))
+            self.active_splits.add(split_id)
+            self.max_active_splits = max(self.max_active_splits, len(self.active_splits))
+            if self.fail((split_id, offset)):
+                raise OTSServiceError(400, self.error_code, self.ERROR_MESSAGE)
+        time.sleep(0.001)
+
+        limit = scan_query.limit or self.page_size
+        end = min(offset + limit, self.rows_per_split)
+        rows = [([('split', split_id), ('pk', i)], [('col', i)]) for i in range(offset, end)]
+        next_token = str(end).encode('utf-8') if end < self.rows_per_split else b''
+        if not next_token:
+            with self.lock:
+                self.active_splits.discard(split_id)
+        return ParallelScanResponse(rows, next_token)
+
+
+class FakeAsyncSearchIndex(FakeSearchIndex):
+
+    async def compute_splits(self, table_name, index_name):
+        return FakeSearchIndex.compute_splits(self, table_name, index_name)
+
+    async def parallel_scan(self, *args, **kwargs):
+        await asyncio.sleep(0.001)
+        return FakeSearchIndex.parallel_scan(self, *args, **kwargs)
+
+
+def row_keys(rows):
+    return sorted((row[0][0][1], row[0][1][1]) for row in rows)
+
+
+ALL_KEYS = [(split_id, i) for split_id in range(3) for i in range(10)]
+
+
+class ParallelScannerTest(unittest.TestCase):
+
+    def test_scan_all_splits(self):
+        client = FakeSearchIndex(splits_size=5)
+        scanner = ParallelScanner(client, 't', 'i', MatchAllQuery(), max_workers=2)
+        rows = list(scanner)
+        self.assertEqual([(s, i) for s in range(5) for i in range(10)], row_keys(rows))
+        self.assertEqual('session', scanner.session_id)
+        self.assertEqual(5, scanner.splits_size)
+        self.assertTrue(client.max_active_splits <= 2)
+        self.assertRaisesRegex(OTSClientError, 'only be iterated once', list, scanner)
+
+    def test_restart_split_from_token(self):
+        client = FakeSearchIndex(fail_times={(1, 4): 2})
+        rows = list(ParallelScanner(client, 't', 'i', MatchAllQuery()))
+        self.assertEqual(ALL_KEYS, row_keys(rows))
+        self.assertEqual(3, client.requests.count((1, 4, None)))
+        # the scanner is the only layer retrying ParallelScan, the client does not retry it again
+        self.assertFalse(RetryUtil.is_repeatable_api('ParallelScan'))
+
+    def test_not_retryable_error(self):
+        client = FakeSearchIndex(fail_times={(2, 0): 1}, error_code='OTSParameterInvalid')
+        with self.assertRaisesRegex(OTSServiceError, 'OTSParameterInvalid'):
+            list(ParallelScanner(client, 't', 'i', MatchAllQuery()))
+
+        with self.assertRaisesRegex(OTSClientError, 'max_workers'):
+            ParallelScanner(client, 't', 'i', MatchAllQuery(), max_workers=0)
+
+    def test_keep_alive(self):
+        client = FakeSearchIndex(splits_size=1, rows_per_split=100)
+        with ParallelScanner(client, 't', 'i', MatchAllQuery(), limit=10, alive_time=1) as scanner:
+            iterator = iter(scanner)
+            next(iterator)
+            time.sleep(1.5)
+            with client.lock:
+                keep_alive_requests = [r for r in client.requests if r[2] == 1]
+            self.assertTrue(len(keep_alive_requests) >= 1)
+            keys = [next(iterator)[0][1][1] for _ in range(40)]
+            self.assertEqual(list(range(1, 41)), keys)
+            iterator.close()
+
+    def test_async_scan(self):
+        client = FakeAsyncSearchIndex(fail_times={(0, 8): 1})
+
+        async def scan(max_workers):
+            return [row async for row in AsyncParallelScanner(client, 't', 'i', MatchAllQuery(),
+                                                               max_workers=max_workers)]
+
+        self.assertEqual(ALL_KEYS, row_keys(asyncio.run(scan(1))))
+        self.assertEqual(1, client.max_active_splits)
+        self.assertEqual(2, client.requests.count((0, 8, None)))
+
+        client = FakeAsyncSearchIndex(fail_times={(1, 0): 1}, error_code='OTSParameterInvalid')
+        self.assertRaisesRegex(OTSServiceError, 'OTSParameterInvalid', asyncio.run, scan(None))
+
+
+if __name__ == '__main__':
+    unittest.main()
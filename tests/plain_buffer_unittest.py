@@ -0,0 +1,200 @@
+# -*- coding: utf8 -*-
+
+import os
+import unittest
+
+import tablestore.protobuf.table_store_pb2 as pb2
+from tablestore.client import OTSClient
+from tablestore.error import OTSClientError
+from tablestore.metadata import Row, INF_MIN, INF_MAX, PK_AUTO_INCR
+from tablestore.plainbuffer.plain_buffer_builder import PlainBufferBuilder
+from tablestore.plainbuffer.plain_buffer_coded_stream import PlainBufferCodedInputStream
+from tablestore.plainbuffer.plain_buffer_crc8 import PlainBufferCrc8
+from tablestore.plainbuffer.plain_buffer_coded_stream import PlainBufferCodedOutputStream
+from tablestore.plainbuffer.plain_buffer_fast_encoder import PlainBufferFastEncoder
+from tablestore.plainbuffer.plain_buffer_stream import PlainBufferInputStream, PlainBufferOutputStream
+from tests.lib.plain_buffer_rows import serialize_rows
+
+
+def decode(data, method, use_fast_decoder, verify_checksum=True):
+    coded_input_stream = PlainBufferCodedInputStream(PlainBufferInputStream(data))
+    coded_input_stream.use_fast_decoder = use_fast_decoder
+    coded_input_stream.verify_checksum = verify_checksum
+    return getattr(coded_input_stream, method)()
+
+
+class PlainBufferDecoderTest(unittest.TestCase):
+
+    ROWS = [
+        ([('gid', 1), ('uid', u'中文'), ('bin', bytearray(b'\x00\xff'))],
+         [('s', u'hello 世界'), ('i', -(1 << 62), 1700000000000), ('d', 3.25), ('t', True), ('f', False),
+          ('b', bytearray(b'\x01\x02\x03')), ('empty', u'')]),
+        ([('gid', 2), ('uid', u''), ('bin', bytearray())], []),
+        ([('gid', -1), ('uid', u'x' * 1000), ('bin', bytearray(b'b'))], [('d', -0.0, 1), ('i', 0)]),
+    ]
+
+    def assert_same(self, data, method):
+        expected = decode(data, method, False)
+        actual = decode(data, method, True)
+        if method == 'read_rows':
+            expected = [(row.primary_key, row.attribute_columns) for row in expected]
+            actual_rows = [(row.primary_key, row.attribute_columns) for row in actual]
+            self.assertEqual(repr(expected), repr(actual_rows))
+        else:
+            self.assertEqual(repr(expected), repr(actual))
+        return actual
+
+    def test_read_row(self):
+        for primary_key, attribute_columns in self.ROWS:
+            data = bytes(PlainBufferBuilder.serialize_for_put_row(primary_key, attribute_columns))
+            self.assertEqual(primary_key, self.assert_same(data, 'read_row')[0])
+
+        data = bytes(PlainBufferBuilder.serialize_for_delete_row([('gid', 1), ('uid', u'a')]))
+        self.assertEqual(([('gid', 1), ('uid', u'a')], []), self.assert_same(data, 'read_row'))
+
+        data = bytes(PlainBufferBuilder.serialize_primary_key([('gid', 3)]))
+        self.assertEqual(([('gid', 3)], []), self.assert_same(data, 'read_row'))
+
+    def test_read_rows(self):
+        rows = self.assert_same(serialize_rows(self.ROWS), 'read_rows')
+        self.assertEqual(3, len(rows))
+        self.assertTrue(isinstance(rows[0], Row))
+        self.assertEqual([], self.assert_same(b'\x75\x00\x00\x00', 'read_rows'))
+
+    def test_invalid_data(self):
+        data = bytearray(PlainBufferBuilder.serialize_for_put_row(*self.ROWS[0]))
+        corrupted = bytearray(data)
+        corrupted[-1] ^= 0xff
+        truncated = data[:len(data) // 2]
+        bad_header = b'\x76' + bytes(data[1:])
+        for use_fast_decoder in (False, True):
+            with self.assertRaisesRegex(OTSClientError, 'Checksum'):
+                decode(bytes(corrupted), 'read_row', use_fast_decoder)
+            with self.assertRaises(OTSClientError):
+                decode(bytes(truncated), 'read_row', use_fast_decoder)
+            with self.assertRaisesRegex(OTSClientError, 'Invalid header'):
+                decode(bad_header, 'read_row', use_fast_decoder)
+            primary_key, _ = decode(bytes(corrupted), 'read_row', use_fast_decoder, verify_checksum=False)
+            self.assertEqual(self.ROWS[0][0], primary_key)
+
+    def test_verify_checksum_option(self):
+        data = bytearray(PlainBufferBuilder.serialize_for_put_row(*self.ROWS[0]))
+        data[-1] ^= 0xff
+        proto = pb2.GetRowResponse(row=bytes(data))
+        proto.consumed.capacity_unit.read = 1
+        body = proto.SerializeToString()
+        verifying_client = OTSClient('http://127.0.0.1', 'id', 'key', 'instance')
+        trusting_client = OTSClient('http://127.0.0.1', 'id', 'key', 'instance', verify_checksum=False)
+
+        # the option of one client does not change the other
+        (_, row, _), _ = trusting_client.protocol.decoder.decode_response('GetRow', body, 'request-id')
+        self.assertEqual(self.ROWS[0][0], row.primary_key)
+        self.assertRaises(OTSClientError, verifying_client.protocol.decoder.decode_response, 'GetRow', body,
+                          'request-id')
+        self.assertTrue(PlainBufferCodedInputStream.verify_checksum)
+
+
+def reference_crc8(crc, data):
+    # bitwise CRC-8 with polynomial x^8 + x^2 + x + 1
+    for byte in data:
+        crc ^= byte
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x07) & 0xff if crc & 0x80 else (crc << 1) & 0xff
+    return crc
+
+
+class PlainBufferCrc8Test(unittest.TestCase):
+
+    def test_crc(self):
+        # the inputs of 2048 bytes and more are checksummed in blocks of 64 bytes
+        for size in (0, 1, 7, 8, 9, 1000, 2047, 2048, 2049, 4096 + 63, 10000):
+            data = os.urandom(size)
+            self.assertEqual(reference_crc8(0x5a, data), PlainBufferCrc8.crc_bytes(0x5a, data))
+            self.assertEqual(reference_crc8(0x5a, data), PlainBufferCrc8.crc_bytes(0x5a, bytearray(data)))
+            self.assertEqual(reference_crc8(0x5a, data), PlainBufferCrc8.crc_bytes(0x5a, memoryview(data)))
+
+        for value in (0, 1, -1, 255, 1 << 40, -(1 << 63), (1 << 63) - 1):
+            self.assertEqual(reference_crc8(3, (value & 0xffffffffffffffff).to_bytes(8, 'little')),
+                             PlainBufferCrc8.crc_int64(3, value))
+            self.assertEqual(reference_crc8(3, (value & 0xffffffff).to_bytes(4, 'little')),
+                             PlainBufferCrc8.crc_int32(3, value))
+
+        self.assertEqual(reference_crc8(0, u'列名'.encode('utf-8')), PlainBufferCrc8.crc_column_name(u'列名'))
+        self.assertEqual(PlainBufferCrc8.crc_string(0, u'列名'), PlainBufferCrc8.crc_column_name(u'列名'.encode('utf-8')))
+        self.assertEqual(PlainBufferCrc8.crc_string(0, b'abc'), PlainBufferCrc8.crc_column_name(bytearray(b'abc')))
+
+
+def reference_encode(primary_key, attribute_columns=None, update=False, delete=False):
+    # the row written cell by cell through PlainBufferCodedOutputStream
+    output_stream = PlainBufferOutputStream(1 << 16)
+    coded_output_stream = PlainBufferCodedOutputStream(output_stream)
+    coded_output_stream.write_header()
+    row_checksum = coded_output_stream.write_primary_key(primary_key, 0)
+    if update:
+        row_checksum = coded_output_stream.write_update_columns(attribute_columns, row_checksum)
+    elif attribute_columns is not None:
+        row_checksum = coded_output_stream.write_columns(attribute_columns, row_checksum)
+    if delete:
+        row_checksum = coded_output_stream.write_delete_marker(row_checksum)
+    else:
+        row_checksum = PlainBufferCrc8.crc_int8(row_checksum, 0)
+    coded_output_stream.write_row_checksum(row_checksum)
+    return bytes(output_stream.get_buffer())
+
+
+class PlainBufferEncoderTest(unittest.TestCase):
+
+    PRIMARY_KEY = [('gid', 1), ('uid', u'中文'), ('bin', bytearray(b'\x00\xff')), ('raw', b'abc'), ('neg', -(1 << 63))]
+    ATTRIBUTE_COLUMNS = [('s', u'hello 世界'), ('i', -(1 << 62), 1700000000000), ('d', 3.25), ('t', True),
+                         ('f', False), ('b', bytearray(b'\x01\x02\x03')), ('empty', u''), ('raw', b'x', 5)]
+
+    def test_put_row(self):
+        for attribute_columns in (self.ATTRIBUTE_COLUMNS, []):
+            data = PlainBufferFastEncoder.serialize_for_put_row(self.PRIMARY_KEY, attribute_columns)
+            self.assertIsInstance(data, bytes)
+            self.assertEqual(reference_encode(self.PRIMARY_KEY, attribute_columns), data)
+            self.assertEqual(data, PlainBufferBuilder.serialize_for_put_row(self.PRIMARY_KEY, attribute_columns))
+
+        primary_key, attribute_columns = decode(
+            PlainBufferBuilder.serialize_for_put_row(self.PRIMARY_KEY, self.ATTRIBUTE_COLUMNS), 'read_row', True)
+        self.assertEqual(('raw', u'abc'), primary_key[3])
+        self.assertEqual(len(self.ATTRIBUTE_COLUMNS), len(attribute_columns))
+
+    def test_update_row(self):
+        attribute_columns = {
+            'put': [('s', u'v'), ('i', 1, 100)],
+            'delete': [('s', None, 100), 'i'],
+            'delete_all': ['d'],
+            'increment': [('counter', 5)],
+        }
+        data = PlainBufferBuilder.serialize_for_update_row(self.PRIMARY_KEY, attribute_columns)
+        self.assertIsInstance(data, bytes)
+        self.assertEqual(reference_encode(self.PRIMARY_KEY, attribute_columns, update=True), data)
+        # the cell type is checksummed after the timestamp in update rows, which are never decoded with checksums
+        self.assertEqual(self.PRIMARY_KEY[:3], decode(data, 'read_row', True, verify_checksum=False)[0][:3])
+
+        self.assertRaises(OTSClientError, PlainBufferBuilder.serialize_for_update_row, self.PRIMARY_KEY, [])
+        self.assertRaises(OTSClientError, PlainBufferBuilder.serialize_for_update_row,
+                          self.PRIMARY_KEY, {'put': ['s']})
+
+    def test_primary_key_and_delete_row(self):
+        for primary_key in (self.PRIMARY_KEY, [('a', INF_MIN), ('b', INF_MAX), ('c', PK_AUTO_INCR)]):
+            data = PlainBufferBuilder.serialize_primary_key(primary_key)
+            self.assertIsInstance(data, bytes)
+            self.assertEqual(reference_encode(primary_key), data)
+
+            data = PlainBufferBuilder.serialize_for_delete_row(primary_key)
+            self.assertEqual(reference_encode(primary_key, delete=True), data)
+
+        self.assertRaises(OTSClientError, PlainBufferBuilder.serialize_primary_key, ('gid', 1))
+        self.assertRaises(OTSClientError, PlainBufferBuilder.serialize_primary_key, [('gid', 1.5)])
+        self.assertRaises(OTSClientError, PlainBufferBuilder.serialize_for_put_row, [('gid', 1)], [('c', None)])
+
+    def test_non_ascii_column_name(self):
+        data = PlainBufferBuilder.serialize_for_put_row([(u'主键', 1)], [(u'列', u'值', 3)])
+        self.assertEqual(([(u'主键', 1)], [(u'列', u'值', 3)]), decode(data, 'read_row', True))
+        self.assertEqual(([(u'主键', 1)], [(u'列', u'值', 3)]), decode(data, 'read_row', False))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+# -*- coding: utf8 -*-
+
+import asyncio
+import time
+import unittest
+
+from tablestore.client import OTSClient, AsyncOTSClient
+from tablestore.metadata import *
+from tablestore.utils import prefetch_iterator, aprefetch_iterator
+
+
+def make_get_range(row_count, page_size, calls):
+    def get_range(table_name, direction, start, end, columns_to_get, limit, *args):
+        calls.append((start, limit))
+        begin = start[0][1]
+        size = page_size if limit is None else min(page_size, limit)
+        stop = min(begin + size, row_count)
+        rows = [Row([('pk', i)], [('col', i, 0)]) for i in range(begin, stop)]
+        next_start = [('pk', stop)] if stop < row_count else None
+        return CapacityUnit(1, 0), next_start, rows, None
+    return get_range
+
+
+class PrefetchTest(unittest.TestCase):
+
+    def test_prefetch_iterator(self):
+        produced = []
+
+        def generate():
+            for i in range(10):
+                produced.append(i)
+                yield i
+
+        iterator = prefetch_iterator(generate(), 2)
+        self.assertEqual(0, next(iterator))
+        time.sleep(0.05)
+        # one item consumed, two queued and one blocked on the full queue
+        self.assertEqual(4, len(produced))
+        self.assertEqual(list(range(1, 10)), list(iterator))
+
+    def test_prefetch_iterator_error_and_close(self):
+        def fail():
+            yield 1
+            raise OTSClientError('mock error')
+
+        iterator = prefetch_iterator(fail(), 1)
+        self.assertEqual(1, next(iterator))
+        self.assertRaisesRegex(OTSClientError, 'mock error', next, iterator)
+
+        def endless():
+            i = 0
+            while True:
+                yield i
+                i += 1
+
+        iterator = prefetch_iterator(endless(), 1)
+        self.assertEqual(0, next(iterator))
+        iterator.close()
+
+    def test_xget_range_prefetch(self):
+        client = OTSClient('http://test.endpoint', 'test_id', 'test_key', 'test-inst')
+        calls = []
+        client.get_range = make_get_range(25, 10, calls)
+
+        counter = CapacityUnit(0, 0)
+        rows = list(client.xget_range('t', Direction.FORWARD, [('pk', 0)], [('pk', INF_MAX)], counter,
+                                      prefetch_depth=2))
+        self.assertEqual(list(range(25)), [row.primary_key[0][1] for row in rows])
+        self.assertEqual(3, counter.read)
+
+        del calls[:]
+        rows = list(client.xget_range('t', Direction.FORWARD, [('pk', 0)], [('pk', INF_MAX)], counter,
+                                      count=15, prefetch_depth=1))
+        self.assertEqual(15, len(rows))
+        self.assertEqual([([('pk', 0)], 15), ([('pk', 10)], 5)], calls)
+
+        with self.assertRaisesRegex(OTSClientError, 'prefetch_depth'):
+            list(client.xget_range('t', Direction.FORWARD, [('pk', 0)], [('pk', INF_MAX)], counter,
+                                   prefetch_depth=-1))
+
+    def test_async_xget_range_prefetch(self):
+        client = AsyncOTSClient('http://test.endpoint', 'test_id', 'test_key', 'test-inst')
+        calls = []
+        get_range = make_get_range(25, 10, calls)
+
+        async def async_get_range(*args):
+            await asyncio.sleep(0.001)
+            return get_range(*args)
+
+        client.get_range = async_get_range
+
+        async def scan(count):
+            counter = CapacityUnit(0, 0)
+            rows = [row async for row in client.xget_range(
+                't', Direction.FORWARD, [('pk', 0)], [('pk', INF_MAX)], counter, count=count, prefetch_depth=2)]
+            return counter, [row.primary_key[0][1] for row in rows]
+
+        counter, keys = asyncio.run(scan(None))
+        self.assertEqual(list(range(25)), keys)
+        self.assertEqual(3, counter.read)
+
+        counter, keys = asyncio.run(scan(12))
+        self.assertEqual(list(range(12)), keys)
+
+        async def fail():
+            yield 1
+            raise OTSClientError('mock error')
+
+        async def consume():
+            return [item async for item in aprefetch_iterator(fail(), 1)]
+
+        self.assertRaisesRegex(OTSClientError, 'mock error', asyncio.run, consume())
+
+
+if __name__ == '__main__':
+    unittest.main()
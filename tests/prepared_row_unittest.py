@@ -0,0 +1,84 @@
+# -*- coding: utf8 -*-
+
+import asyncio
+import unittest
+
+import tablestore.protobuf.table_store_pb2 as pb2
+from tablestore.client import OTSClient, AsyncOTSClient
+from tablestore.encoder import OTSProtoBufferEncoder
+from tablestore.metadata import *
+
+
+class BodyRecorder(object):
+    """Replaces ``_send_request`` of a client and records the request bodies."""
+
+    def __init__(self):
+        self.requests = []
+
+    def __call__(self, api_name, query, req_headers, req_body, decode_options):
+        self.requests.append((api_name, req_body))
+        if api_name == 'GetRow':
+            return CapacityUnit(1, 0), Row([('pk', 1)], [('col', 'v')]), b''
+        return CapacityUnit(0, 1), None
+
+
+class PreparedRowTest(unittest.TestCase):
+
+    def setUp(self):
+        self.encoder = OTSProtoBufferEncoder('utf8')
+
+    def test_get_row(self):
+        column_filter = SingleColumnCondition('col', 'v', ComparatorType.EQUAL)
+        prepared = self.encoder.encode_prepared_get_row('t', ['col', 'col2'], column_filter, 1)
+        for transaction_id in [None, 'txn']:
+            expected = self.encoder.encode_request('GetRow', 't', [('pk', 1), ('pk2', 'a')], ['col', 'col2'],
+                                                   column_filter, 1, None, None, None, None, transaction_id)
+            body = self.encoder.encode_request('GetRow', None, [('pk', 1), ('pk2', 'a')], None, None, None,
+                                               None, None, None, None, transaction_id, prepared=prepared)
+            self.assertEqual(expected, pb2.GetRowRequest.FromString(body))
+
+    def test_put_row(self):
+        condition = Condition(RowExistenceExpectation.EXPECT_NOT_EXIST,
+                              SingleColumnCondition('col', 1, ComparatorType.GREATER_THAN))
+        row = Row([('pk', 1)], [('col', 'v'), ('n', 1.5), ('b', bytearray(b'\x00' * 200))])
+        prepared = self.encoder.encode_prepared_put_row('t', condition, ReturnType.RT_PK)
+        for transaction_id in [None, 'txn']:
+            expected = self.encoder.encode_request('PutRow', 't', row, condition, ReturnType.RT_PK, transaction_id)
+            body = self.encoder.encode_request('PutRow', None, row, None, None, transaction_id, prepared=prepared)
+            self.assertEqual(expected, pb2.PutRowRequest.FromString(body))
+
+    def test_client(self):
+        client = OTSClient('http://test.endpoint', 'test_id', 'test_key', 'test-inst', row_cache_size=10)
+        client._send_request = recorder = BodyRecorder()
+
+        client.get_row('t', [('pk', 1)], ['col'], transaction_id='txn')
+        client.execute_get_row(client.prepare_get_row('t', ['col']), [('pk', 1)], transaction_id='txn')
+        self.assertEqual(pb2.GetRowRequest.FromString(recorder.requests[0][1]),
+                         pb2.GetRowRequest.FromString(recorder.requests[1][1]))
+
+        # the prepared reads share the row cache with get_row, and the prepared writes invalidate it
+        prepared = client.prepare_get_row('t', ['col'])
+        consumed, row, _ = client.execute_get_row(prepared, [('pk', 1)])
+        self.assertIs(row, client.get_row('t', [('pk', 1)], ['col'])[1])
+        client.execute_put_row(client.prepare_put_row('t'), Row([('pk', 1)], [('col', 'x')]))
+        client.execute_get_row(prepared, [('pk', 1)])
+        self.assertEqual(['GetRow', 'GetRow', 'GetRow', 'PutRow', 'GetRow'], [request[0] for request in recorder.requests])
+
+    def test_async_client(self):
+        client = AsyncOTSClient('http://test.endpoint', 'test_id', 'test_key', 'test-inst')
+        recorder = BodyRecorder()
+
+        async def send_request(*args):
+            return recorder(*args)
+        client._send_request = send_request
+
+        async def run():
+            await client.execute_get_row(client.prepare_get_row('t'), [('pk', 1)])
+            return await client.execute_put_row(client.prepare_put_row('t'), Row([('pk', 1)], [('col', 'x')]))
+
+        self.assertEqual(1, asyncio.run(run())[0].write)
+        self.assertEqual(['GetRow', 'PutRow'], [request[0] for request in recorder.requests])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+# -*- coding: utf8 -*-
+
+import copy
+import unittest
+
+import tablestore.protobuf.search_pb2 as search_pb2
+from tablestore import *
+from tablestore.client import OTSClient
+from tablestore.encoder import OTSProtoBufferEncoder
+
+
+def make_search_query(**kwargs):
+    query = BoolQuery(
+        must_queries=[TermQuery('k', 'key000'), RangeQuery('n', 1, 100)],
+        should_queries=[TermQuery('tag', 'a'), TermQuery('tag', 'b')],
+        minimum_should_match=1,
+    )
+    return SearchQuery(query, sort=Sort([FieldSort('n', SortOrder.DESC)]), aggs=[Max('n', name='max_n')],
+                       group_bys=[GroupByField('tag', size=5, sub_aggs=[Count('n')])], **kwargs)
+
+
+def parse_search_query(data):
+    proto = search_pb2.SearchQuery()
+    proto.ParseFromString(data)
+    return proto
+
+
+class PreparedSearchQueryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.encoder = OTSProtoBufferEncoder('utf8')
+
+    def test_paging(self):
+        search_query = make_search_query(limit=10, get_total_count=True)
+        prepared = self.encoder.encode_prepared_search_query(search_query)
+        self.assertEqual((True, None, None, 10),
+                         (prepared.get_total_count, prepared.next_token, prepared.offset, prepared.limit))
+        self.assertEqual(10, search_query.limit)
+
+        self.assertEqual(parse_search_query(self.encoder._encode_search_query(search_query)),
+                         parse_search_query(self.encoder._encode_search_query(prepared)))
+
+        pages = [dict(offset=20), dict(next_token=b'token', get_total_count=False), dict(limit=0, offset=0)]
+        for page in pages:
+            expected_query = copy.copy(search_query)
+            prepared_query = copy.copy(prepared)
+            for name, value in page.items():
+                setattr(expected_query, name, value)
+                setattr(prepared_query, name, value)
+            self.assertEqual(parse_search_query(self.encoder._encode_search_query(expected_query)),
+                             parse_search_query(self.encoder._encode_search_query(prepared_query)))
+
+    def test_search_request(self):
+        client = OTSClient('http://test.endpoint', 'test_id', 'test_key', 'test-inst')
+        prepared = client.prepare_search_query(make_search_query(offset=5, limit=10))
+        columns_to_get = ColumnsToGet(return_type=ColumnReturnType.ALL)
+        expected = self.encoder.encode_request('Search', 't', 'idx', make_search_query(offset=5, limit=10), columns_to_get, None, 1)
+        request = self.encoder.encode_request('Search', 't', 'idx', prepared, columns_to_get, None, 1)
+        self.assertEqual(expected.table_name, request.table_name)
+        self.assertEqual(expected.timeout_ms, request.timeout_ms)
+        self.assertEqual(parse_search_query(expected.search_query), parse_search_query(request.search_query))
+        self.assertIn('PreparedSearchQuery', repr(prepared))
+
+
+if __name__ == '__main__':
+    unittest.main()
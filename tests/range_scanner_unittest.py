@@ -0,0 +1,172 @@
+# -*- coding: utf8 -*-
+
+import asyncio
+import threading
+import time
+import unittest
+
+from tablestore.client import OTSClient, AsyncOTSClient
+from tablestore.decoder import OTSProtoBufferDecoder
+from tablestore.metadata import *
+from tablestore.plainbuffer.plain_buffer_builder import PlainBufferBuilder
+from tablestore.range_scanner import *
+import tablestore.protobuf.table_store_pb2 as pb2
+
+
+class FakeTable(object):
+    """An in-memory table with primary key [('pk', i)] that answers GetRange with pages of ``page_size`` rows."""
+
+    def __init__(self, row_count, page_size=7):
+        self.rows = [Row([('pk', i)], [('col', i, 0)]) for i in range(row_count)]
+        self.page_size = page_size
+        self.lock = threading.Lock()
+        self.inflight = 0
+        self.max_inflight = 0
+
+    def get_range(self, start, end):
+        with self.lock:
+            self.inflight += 1
+            self.max_inflight = max(self.max_inflight, self.inflight)
+        time.sleep(0.001)
+        selected = [row for row in self.rows
+                    if compare_primary_key(start, row.primary_key) <= 0 and compare_primary_key(row.primary_key, end) < 0]
+        page = selected[:self.page_size]
+        next_start = selected[self.page_size].primary_key if len(selected) > self.page_size else None
+        with self.lock:
+            self.inflight -= 1
+        return CapacityUnit(1, 0), next_start, page, None
+
+    async def async_get_range(self, start, end):
+        with self.lock:
+            self.inflight += 1
+            self.max_inflight = max(self.max_inflight, self.inflight)
+        await asyncio.sleep(0.001)
+        with self.lock:
+            self.inflight -= 1
+        return self.get_range(start, end)
+
+
+class RangeScannerTest(unittest.TestCase):
+
+    def test_compare_primary_key(self):
+        self.assertTrue(compare_primary_key([('a', 1), ('b', INF_MIN)], [('a', 1), ('b', 'x')]) < 0)
+        self.assertTrue(compare_primary_key([('a', INF_MAX)], [('a', 10)]) > 0)
+        self.assertTrue(compare_primary_key([('a', bytearray(b'b'))], [('a', bytearray(b'a'))]) > 0)
+        self.assertEqual(0, compare_primary_key([('a', 'x'), ('b', 2)], [('a', 'x'), ('b', 2)]))
+        self.assertEqual([('a', 1), ('b', INF_MIN)], complete_split_point([('a', 1)], [('a', 'INTEGER'), ('b', 'STRING')]))
+
+    def test_make_scan_ranges(self):
+        start, end = [('pk', INF_MIN)], [('pk', INF_MAX)]
+        points = [[('pk', 50)], [('pk', 20)], [('pk', 20)]]
+        self.assertEqual([(start, [('pk', 20)]), ([('pk', 20)], [('pk', 50)]), ([('pk', 50)], end)],
+                         make_scan_ranges(Direction.FORWARD, start, end, points))
+
+        # split points out of the range are ignored
+        self.assertEqual([([('pk', 30)], [('pk', 50)]), ([('pk', 50)], [('pk', 60)])],
+                         make_scan_ranges(Direction.FORWARD, [('pk', 30)], [('pk', 60)], points))
+
+        self.assertEqual([(end, [('pk', 50)]), ([('pk', 50)], [('pk', 20)]), ([('pk', 20)], start)],
+                         make_scan_ranges(Direction.BACKWARD, end, start, points))
+
+        with self.assertRaisesRegex(OTSClientError, 'start primary key'):
+            make_scan_ranges(Direction.FORWARD, end, start, points)
+
+    def test_parallel_scan_ordered(self):
+        table = FakeTable(100)
+        ranges = make_scan_ranges(Direction.FORWARD, [('pk', INF_MIN)], [('pk', INF_MAX)],
+                                  [[('pk', i)] for i in range(10, 100, 10)])
+        counter = CapacityUnit(0, 0)
+        rows = list(iter_ranges_in_parallel(table.get_range, ranges, counter, 3, True))
+        self.assertEqual(list(range(100)), [row.primary_key[0][1] for row in rows])
+        self.assertEqual(20, counter.read)
+        self.assertTrue(table.max_inflight <= 3)
+
+    def test_parallel_scan_unordered(self):
+        table = FakeTable(100)
+        ranges = make_scan_ranges(Direction.FORWARD, [('pk', INF_MIN)], [('pk', INF_MAX)],
+                                  [[('pk', i)] for i in range(5, 100, 5)])
+        counter = CapacityUnit(0, 0)
+        rows = list(iter_ranges_in_parallel(table.get_range, ranges, counter, 4, False))
+        self.assertEqual(list(range(100)), sorted(row.primary_key[0][1] for row in rows))
+        self.assertTrue(table.max_inflight <= 4)
+
+    def test_parallel_scan_error_and_early_stop(self):
+        def get_range(start, end):
+            if start[0][1] == 50:
+                raise OTSClientError('mock error')
+            return CapacityUnit(1, 0), None, [Row(start, [])], None
+
+        ranges = make_scan_ranges(Direction.FORWARD, [('pk', 0)], [('pk', 100)], [[('pk', 50)]])
+        with self.assertRaisesRegex(OTSClientError, 'mock error'):
+            list(iter_ranges_in_parallel(get_range, ranges, CapacityUnit(0, 0), 2, True))
+
+        table = FakeTable(100, page_size=1)
+        iterator = iter_ranges_in_parallel(table.get_range, [([('pk', 0)], [('pk', 100)])], CapacityUnit(0, 0), 1, True)
+        self.assertEqual([('pk', 0)], next(iterator).primary_key)
+        iterator.close()
+
+    def test_async_parallel_scan(self):
+        table = FakeTable(100)
+        ranges = make_scan_ranges(Direction.FORWARD, [('pk', INF_MIN)], [('pk', INF_MAX)],
+                                  [[('pk', i)] for i in range(10, 100, 10)])
+
+        async def scan(ordered):
+            counter = CapacityUnit(0, 0)
+            rows = [row async for row in aiter_ranges_in_parallel(table.async_get_range, ranges, counter, 2, ordered)]
+            return counter, [row.primary_key[0][1] for row in rows]
+
+        counter, keys = asyncio.run(scan(True))
+        self.assertEqual(list(range(100)), keys)
+        self.assertEqual(20, counter.read)
+        counter, keys = asyncio.run(scan(False))
+        self.assertEqual(list(range(100)), sorted(keys))
+        self.assertTrue(table.max_inflight <= 2)
+
+    def test_client_parallel_xget_range(self):
+        table = FakeTable(30)
+        client = OTSClient('http://test.endpoint', 'test_id', 'test_key', 'test-inst')
+        client.get_range = lambda table_name, direction, start, end, *args: table.get_range(start, end)
+        client.compute_split_points_by_size = lambda table_name, split_size: ComputeSplitPointsBySizeResponse(
+            CapacityUnit(1, 0), [('pk', 'INTEGER')], [[('pk', 10)], [('pk', 20)]])
+
+        counter = CapacityUnit(0, 0)
+        rows = list(client.parallel_xget_range('t', Direction.FORWARD, [('pk', INF_MIN)], [('pk', INF_MAX)], counter))
+        self.assertEqual(list(range(30)), [row.primary_key[0][1] for row in rows])
+        self.assertEqual(7, counter.read)
+
+        async_client = AsyncOTSClient('http://test.endpoint', 'test_id', 'test_key', 'test-inst')
+
+        async def get_range(table_name, direction, start, end, *args):
+            return await table.async_get_range(start, end)
+
+        async_client.get_range = get_range
+
+        async def scan():
+            counter = CapacityUnit(0, 0)
+            rows = [row async for row in async_client.parallel_xget_range(
+                't', Direction.FORWARD, [('pk', 0)], [('pk', 30)], counter,
+                split_points=[[('pk', 15)]], ordered=False)]
+            return counter, sorted(row.primary_key[0][1] for row in rows)
+
+        counter, keys = asyncio.run(scan())
+        self.assertEqual(list(range(30)), keys)
+        self.assertEqual(6, counter.read)
+
+    def test_decode_split_points(self):
+        proto = pb2.ComputeSplitPointsBySizeResponse()
+        proto.consumed.capacity_unit.read = 1
+        schema = proto.schema.add()
+        schema.name = 'pk'
+        schema.type = pb2.INTEGER
+        proto.split_points.append(bytes(PlainBufferBuilder.serialize_primary_key([('pk', 10)])))
+
+        response, _ = OTSProtoBufferDecoder('utf-8').decode_response(
+            'ComputeSplitPointsBySize', proto.SerializeToString(), 'request-id')
+        consumed, schema, split_points = response
+        self.assertEqual(1, consumed.read)
+        self.assertEqual([('pk', 'INTEGER')], schema)
+        self.assertEqual([[('pk', 10)]], split_points)
+
+
+if __name__ == '__main__':
+    unittest.main()
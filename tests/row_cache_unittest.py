@@ -0,0 +1,204 @@
+# -*- coding: utf8 -*-
+
+import asyncio
+import time
+import unittest
+
+from tablestore.cache import RowCache
+from tablestore.client import OTSClient, AsyncOTSClient
+from tablestore.metadata import *
+
+
+class FakeRowRequestHelper(object):
+    """Serves GetRow and BatchGetRow from ``rows`` and records the requested primary keys."""
+
+    def __init__(self):
+        self.rows = {}
+        self.calls = []
+
+    def __call__(self, api_name, *args, **kwargs):
+        if api_name == 'GetRow':
+            table_name, primary_key = args[:2]
+            self.calls.append((api_name, [primary_key[0][1]]))
+            return CapacityUnit(1, 0), self.rows.get(primary_key[0][1]), b''
+        if api_name == 'BatchGetRow':
+            request = args[0]
+            response = {}
+            for table_name, item in request.items.items():
+                self.calls.append((api_name, [pk[0][1] for pk in item.primary_keys]))
+                response[table_name] = []
+                for pk in item.primary_keys:
+                    data_item = RowDataItem(True, None, None, table_name, CapacityUnit(1, 0), None, None)
+                    data_item.row = self.rows.get(pk[0][1])
+                    response[table_name].append(data_item)
+            return response
+        self.calls.append((api_name, None))
+        if api_name == 'BatchWriteRow':
+            return {}
+        return CapacityUnit(0, 1), None
+
+
+def make_client(client_class=OTSClient, **kwargs):
+    client = client_class('http://test.endpoint', 'test_id', 'test_key', 'test-inst', row_cache_size=100, **kwargs)
+    helper = FakeRowRequestHelper()
+    for i in range(5):
+        helper.rows[i] = Row([('pk', i)], [('col', 'v%d' % i)])
+    if client_class is OTSClient:
+        client._request_helper = helper
+    else:
+        async def request_helper(*args, **kwargs):
+            return helper(*args, **kwargs)
+        client._request_helper = request_helper
+    return client, helper
+
+
+class RowCacheTest(unittest.TestCase):
+
+    def test_row_cache(self):
+        cache = RowCache(2, ttl=0.02)
+        cache.put('t', [('pk', bytearray(b'a'))], None, 1, 'a', cache.version)
+        self.assertEqual((True, 'a'), cache.get('t', [('pk', bytearray(b'a'))], None, None))
+        self.assertEqual((False, None), cache.get('t', [('pk', bytearray(b'a'))], ['col'], 1))
+
+        # a row read before an invalidation is not cached
+        version = cache.version
+        cache.invalidate('t', [('pk', 'b')])
+        cache.put('t', [('pk', 'b')], None, 1, 'b', version)
+        self.assertEqual((False, None), cache.get('t', [('pk', 'b')], None, 1))
+
+        cache.put('t', [('pk', 'c')], None, 1, 'c', cache.version)
+        time.sleep(0.03)
+        self.assertEqual((False, None), cache.get('t', [('pk', 'c')], None, 1))
+        self.assertEqual(1, cache.stats()['hits'])
+
+        cache.put('t', [('pk', 'd')], None, 1, 'd', cache.version)
+        cache.invalidate('t', [('pk', 'e')], transaction_id='txn')
+        cache.put('t', [('pk', 'e')], None, 1, 'e', cache.version)
+        cache.finish_transaction('txn')
+        self.assertEqual((False, None), cache.get('t', [('pk', 'e')], None, 1))
+        self.assertEqual((True, 'd'), cache.get('t', [('pk', 'd')], None, 1))
+
+    def test_invalidation_of_other_rows(self):
+        cache = RowCache(2)
+        version = cache.version
+        # a write of another row does not stop the row read before it from being cached
+        cache.invalidate('t', [('pk', 'b')])
+        cache.put('t', [('pk', 'a')], None, 1, 'a', version)
+        self.assertEqual((True, 'a'), cache.get('t', [('pk', 'a')], None, 1))
+        cache.put('t', [('pk', 'b')], None, 1, 'b', version)
+        self.assertEqual((False, None), cache.get('t', [('pk', 'b')], None, 1))
+
+        # when the versions of too many rows are kept, the reads started before the forgotten versions are not cached
+        version = cache.version
+        for i in range(RowCache.MIN_INVALIDATED_ROWS + 1):
+            cache.invalidate('t2', [('pk', i)])
+        cache.put('t', [('pk', 'c')], None, 1, 'c', version)
+        self.assertEqual((False, None), cache.get('t', [('pk', 'c')], None, 1))
+        cache.put('t', [('pk', 'c')], None, 1, 'c', cache.version)
+        self.assertEqual((True, 'c'), cache.get('t', [('pk', 'c')], None, 1))
+
+        version = cache.version
+        cache.clear()
+        cache.put('t', [('pk', 'a')], None, 1, 'a', version)
+        self.assertEqual((False, None), cache.get('t', [('pk', 'a')], None, 1))
+
+    def test_get_row(self):
+        client, helper = make_client()
+        consumed, row, _ = client.get_row('t', [('pk', 1)], ['col'])
+        self.assertEqual(1, consumed.read)
+        consumed, cached_row, _ = client.get_row('t', [('pk', 1)], ['col'])
+        self.assertEqual(0, consumed.read)
+        self.assertIs(row, cached_row)
+        # another columns_to_get, a filter and a transaction are not served by the cache
+        client.get_row('t', [('pk', 1)])
+        client.get_row('t', [('pk', 1)], ['col'], transaction_id='txn')
+        client.get_row('t', [('pk', 1)], ['col'], column_filter=SingleColumnCondition('col', 'v', ComparatorType.EQUAL))
+        self.assertEqual(4, len(helper.calls))
+        self.assertEqual({'size': 1, 'hits': 1, 'misses': 2, 'hit_rate': 1.0 / 3}, client.row_cache.stats())
+
+        # rows which do not exist are cached too
+        self.assertIsNone(client.get_row('t', [('pk', 9)])[1])
+        self.assertIsNone(client.get_row('t', [('pk', 9)])[1])
+        self.assertEqual(5, len(helper.calls))
+
+    def test_invalidate_by_writes(self):
+        client, helper = make_client()
+        writes = [
+            lambda: client.put_row('t', Row([('pk', 1)], [('col', 'x')])),
+            lambda: client.update_row('t', Row([('pk', 1)], {'put': [('col', 'x')]}), None),
+            lambda: client.delete_row('t', Row([('pk', 1)])),
+            lambda: client.delete_row('t', primary_key=[('pk', 1)]),
+        ]
+        for write in writes:
+            client.get_row('t', [('pk', 1)])
+            client.get_row('t', [('pk', 1)], ['col'])
+            write()
+            del helper.calls[:]
+            client.get_row('t', [('pk', 1)])
+            client.get_row('t', [('pk', 1)], ['col'])
+            self.assertEqual([('GetRow', [1])] * 2, helper.calls)
+
+        client.get_row('t', [('pk', 2)])
+        client.get_row('t', [('pk', 3)])
+        request = BatchWriteRowRequest()
+        request.add(TableInBatchWriteRowItem('t', [PutRowItem(Row([('pk', 2)], [('col', 'x')]), None)]))
+        client.batch_write_row(request)
+        del helper.calls[:]
+        client.get_row('t', [('pk', 2)])
+        client.get_row('t', [('pk', 3)])
+        self.assertEqual([('GetRow', [2])], helper.calls)
+
+    def test_transaction(self):
+        client, helper = make_client()
+        client.put_row('t', Row([('pk', 1)], [('col', 'x')]), transaction_id='txn')
+        # the row is cached before the transaction is committed, and removed by the commit
+        client.get_row('t', [('pk', 1)])
+        client.get_row('t', [('pk', 1)])
+        client.commit_transaction('txn')
+        client.get_row('t', [('pk', 1)])
+        self.assertEqual(['PutRow', 'GetRow', 'CommitTransaction', 'GetRow'], [call[0] for call in helper.calls])
+
+    def test_batch_get_row(self):
+        client, helper = make_client()
+        client.get_row('t', [('pk', 1)], ['col'])
+        client.get_row('t2', [('pk', 0)], ['col'])
+
+        request = BatchGetRowRequest()
+        request.add(TableInBatchGetRowItem('t', [[('pk', i)] for i in range(4)], ['col'], max_version=1))
+        request.add(TableInBatchGetRowItem('t2', [[('pk', 0)]], ['col'], max_version=1))
+        response = client.batch_get_row(request)
+        self.assertEqual([('BatchGetRow', [0, 2, 3])], helper.calls[2:])
+        self.assertEqual(['v0', 'v1', 'v2', 'v3'],
+                         [item.row.attribute_columns[0][1] for item in response.get_result_by_table('t')])
+        self.assertEqual([1, 0, 1, 1], [item.consumed.read for item in response.get_result_by_table('t')])
+        self.assertTrue(response.is_all_succeed())
+        self.assertEqual(1, len(response.get_result_by_table('t2')))
+        # the primary keys of the request are not modified
+        self.assertEqual(4, len(request.items['t'].primary_keys))
+
+        del helper.calls[:]
+        response = client.batch_get_row(request)
+        self.assertEqual([], helper.calls)
+        self.assertEqual(5, len(response.get_succeed_rows()))
+
+    def test_async(self):
+        client, helper = make_client(AsyncOTSClient, row_cache_ttl=30)
+
+        async def run():
+            await client.get_row('t', [('pk', 1)])
+            await client.get_row('t', [('pk', 1)])
+            await client.put_row('t', Row([('pk', 1)], [('col', 'x')]))
+            await client.get_row('t', [('pk', 1)])
+            request = BatchGetRowRequest()
+            request.add(TableInBatchGetRowItem('t', [[('pk', 1)], [('pk', 2)]], max_version=1))
+            return await client.batch_get_row(request)
+
+        response = asyncio.run(run())
+        self.assertEqual(2, len(response.get_succeed_rows()))
+        self.assertEqual(['GetRow', 'PutRow', 'GetRow', 'BatchGetRow'], [call[0] for call in helper.calls])
+        self.assertEqual([2], helper.calls[-1][1])
+        self.assertEqual(30, client.row_cache.ttl)
+
+
+if __name__ == '__main__':
+    unittest.main()
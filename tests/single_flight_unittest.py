@@ -0,0 +1,164 @@
+# -*- coding: utf8 -*-
+
+import asyncio
+import threading
+import time
+import unittest
+
+from tablestore.client import OTSClient, AsyncOTSClient
+from tablestore.error import OTSClientError
+from tablestore.metadata import *
+from tablestore.single_flight import SingleFlight, AsyncSingleFlight
+
+
+class FakeSender(object):
+    """Replaces ``_send_request`` of a client, records the requests and returns a new result for each of them."""
+
+    def __init__(self, delay=0.1, error=None):
+        self.delay = delay
+        self.error = error
+        self.requests = []
+
+    def result(self, api_name, req_body, decode_options):
+        self.requests.append((api_name, req_body, decode_options))
+        if self.error is not None:
+            raise self.error
+        if api_name == 'GetRow':
+            return CapacityUnit(1, 0), Row([('pk', 1)], [('col', len(self.requests))]), b''
+        return CapacityUnit(0, 1), None
+
+    def __call__(self, api_name, query, req_headers, req_body, decode_options):
+        time.sleep(self.delay)
+        return self.result(api_name, req_body, decode_options)
+
+
+class AsyncFakeSender(FakeSender):
+
+    async def __call__(self, api_name, query, req_headers, req_body, decode_options):
+        await asyncio.sleep(self.delay)
+        return self.result(api_name, req_body, decode_options)
+
+
+def run_threads(count, func):
+    results = [None] * count
+
+    def run(index):
+        try:
+            results[index] = func()
+        except Exception as e:
+            results[index] = e
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+class SingleFlightTest(unittest.TestCase):
+
+    def test_single_flight(self):
+        single_flight = SingleFlight()
+        calls = []
+
+        def func():
+            calls.append(1)
+            time.sleep(0.1)
+            return object()
+
+        results = run_threads(8, lambda: single_flight.do('key', func))
+        self.assertEqual(1, len(calls))
+        self.assertEqual(1, len(set(id(result) for result in results)))
+        self.assertEqual(7, single_flight.shared)
+        self.assertEqual(0, len(single_flight))
+        # the calls after the shared call returns run the function again
+        single_flight.do('key', func)
+        self.assertEqual(2, len(calls))
+
+    def test_client(self):
+        client = OTSClient('http://test.endpoint', 'test_id', 'test_key', 'test-inst', coalesce_requests=True)
+        client._send_request = sender = FakeSender()
+
+        results = run_threads(8, lambda: client.get_row('t', [('pk', 1)], ['col']))
+        self.assertEqual(1, len(sender.requests))
+        self.assertTrue(all(result is results[0] for result in results))
+
+        # the requests with other arguments, and the requests of the write APIs are sent separately
+        del sender.requests[:]
+        run_threads(2, lambda: client.get_row('t', [('pk', 2)], ['col']))
+        run_threads(2, lambda: client.put_row('t', Row([('pk', 1)], [('col', 1)])))
+        self.assertEqual(['GetRow', 'PutRow', 'PutRow'], [request[0] for request in sender.requests])
+
+    def test_decode_options(self):
+        client = OTSClient('http://test.endpoint', 'test_id', 'test_key', 'test-inst', coalesce_requests=True)
+        client._send_request = sender = FakeSender()
+        self.assertNotEqual(client._single_flight_key('GetRange', b'body', {'lazy_rows': True}),
+                            client._single_flight_key('GetRange', b'body', None))
+        self.assertIsNone(client._single_flight_key('PutRow', b'body', None))
+
+        # the requests are not coalesced by default
+        client = OTSClient('http://test.endpoint', 'test_id', 'test_key', 'test-inst')
+        client._send_request = sender
+        self.assertIsNone(client.single_flight)
+        run_threads(2, lambda: client.get_row('t', [('pk', 1)], ['col']))
+        self.assertEqual(2, len(sender.requests))
+
+    def test_error(self):
+        client = OTSClient('http://test.endpoint', 'test_id', 'test_key', 'test-inst', coalesce_requests=True)
+        client._send_request = sender = FakeSender(error=OTSClientError('network error'))
+        results = run_threads(4, lambda: client.get_row('t', [('pk', 1)], ['col']))
+        self.assertEqual(1, len(sender.requests))
+        self.assertTrue(all(isinstance(result, OTSClientError) for result in results))
+
+
+class AsyncSingleFlightTest(unittest.TestCase):
+
+    def test_client(self):
+        client = AsyncOTSClient('http://test.endpoint', 'test_id', 'test_key', 'test-inst', coalesce_requests=True)
+        client._send_request = sender = AsyncFakeSender()
+
+        async def run():
+            return await asyncio.gather(*[client.get_row('t', [('pk', 1)], ['col']) for _ in range(10)])
+
+        results = asyncio.run(run())
+        self.assertEqual(1, len(sender.requests))
+        self.assertTrue(all(result is results[0] for result in results))
+        self.assertEqual(9, client.single_flight.shared)
+        self.assertEqual(0, len(client.single_flight))
+
+    def test_cancel(self):
+        single_flight = AsyncSingleFlight()
+
+        async def func():
+            await asyncio.sleep(0.05)
+            return 'result'
+
+        async def run():
+            first = asyncio.ensure_future(single_flight.do('key', func))
+            second = asyncio.ensure_future(single_flight.do('key', func))
+            await asyncio.sleep(0.01)
+            # cancelling the call which started the task does not cancel the other calls
+            first.cancel()
+            return await second, first.cancelled()
+
+        self.assertEqual(('result', True), asyncio.run(run()))
+
+    def test_error(self):
+        single_flight = AsyncSingleFlight()
+
+        async def func():
+            await asyncio.sleep(0.01)
+            raise OTSClientError('network error')
+
+        async def run():
+            return await asyncio.gather(single_flight.do('key', func), single_flight.do('key', func),
+                                        return_exceptions=True)
+
+        results = asyncio.run(run())
+        self.assertTrue(all(isinstance(result, OTSClientError) for result in results))
+        self.assertEqual(1, single_flight.shared)
+
+
+if __name__ == '__main__':
+    unittest.main()
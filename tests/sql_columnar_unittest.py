@@ -0,0 +1,150 @@
+# -*- coding: utf8 -*-
+
+import unittest
+
+import flatbuffers
+import numpy
+
+import tablestore.protobuf.table_store_pb2 as pb2
+from tablestore.decoder import OTSProtoBufferDecoder
+from tablestore.flatbuffer.dataprotocol import BytesValue, ColumnValues, RLEStringValues
+from tablestore.flatbuffer.dataprotocol import SQLResponseColumn, SQLResponseColumns
+from tablestore.flatbuffer.dataprotocol.DataType import DataType
+
+
+def build_vector(builder, start_vector, prepend, values):
+    start_vector(builder, len(values))
+    for value in reversed(values):
+        prepend(value)
+    return builder.EndVector()
+
+
+def build_offsets(builder, start_vector, offsets):
+    return build_vector(builder, start_vector, builder.PrependUOffsetTRelative, offsets)
+
+
+def build_column_values(builder, column_type, is_null, values):
+    value_offset = None
+    rle_offset = None
+    if column_type == DataType.LONG:
+        value_offset = build_vector(builder, ColumnValues.StartLongValuesVector, builder.PrependInt64, values)
+    elif column_type == DataType.BOOLEAN:
+        value_offset = build_vector(builder, ColumnValues.StartBoolValuesVector, builder.PrependBool, values)
+    elif column_type == DataType.DOUBLE:
+        value_offset = build_vector(builder, ColumnValues.StartDoubleValuesVector, builder.PrependFloat64, values)
+    elif column_type == DataType.STRING:
+        strings = [builder.CreateString(value) for value in values]
+        value_offset = build_offsets(builder, ColumnValues.StartStringValuesVector, strings)
+    elif column_type == DataType.BINARY:
+        binaries = []
+        for value in values:
+            data = build_vector(builder, BytesValue.StartValueVector, builder.PrependInt8,
+                                list(numpy.frombuffer(value, dtype=numpy.int8)))
+            BytesValue.Start(builder)
+            BytesValue.AddValue(builder, data)
+            binaries.append(BytesValue.End(builder))
+        value_offset = build_offsets(builder, ColumnValues.StartBinaryValuesVector, binaries)
+    elif column_type == DataType.STRING_RLE:
+        array, index_mapping = values
+        array = build_offsets(builder, RLEStringValues.StartArrayVector, [builder.CreateString(s) for s in array])
+        index_mapping = build_vector(builder, RLEStringValues.StartIndexMappingVector, builder.PrependInt32,
+                                     index_mapping)
+        RLEStringValues.Start(builder)
+        RLEStringValues.AddArray(builder, array)
+        RLEStringValues.AddIndexMapping(builder, index_mapping)
+        rle_offset = RLEStringValues.End(builder)
+
+    is_null_offset = build_vector(builder, ColumnValues.StartIsNullvaluesVector, builder.PrependBool, is_null)
+    ColumnValues.Start(builder)
+    ColumnValues.AddIsNullvalues(builder, is_null_offset)
+    if column_type == DataType.LONG:
+        ColumnValues.AddLongValues(builder, value_offset)
+    elif column_type == DataType.BOOLEAN:
+        ColumnValues.AddBoolValues(builder, value_offset)
+    elif column_type == DataType.DOUBLE:
+        ColumnValues.AddDoubleValues(builder, value_offset)
+    elif column_type == DataType.STRING:
+        ColumnValues.AddStringValues(builder, value_offset)
+    elif column_type == DataType.BINARY:
+        ColumnValues.AddBinaryValues(builder, value_offset)
+    elif column_type == DataType.STRING_RLE:
+        ColumnValues.AddRleStringValues(builder, rle_offset)
+    return ColumnValues.End(builder)
+
+
+def build_sql_response(columns, row_count):
+    builder = flatbuffers.Builder(1024)
+    column_offsets = []
+    for name, column_type, is_null, values in columns:
+        name_offset = builder.CreateString(name)
+        values_offset = build_column_values(builder, column_type, is_null, values)
+        SQLResponseColumn.Start(builder)
+        SQLResponseColumn.AddColumnName(builder, name_offset)
+        SQLResponseColumn.AddColumnType(builder, column_type)
+        SQLResponseColumn.AddColumnValue(builder, values_offset)
+        column_offsets.append(SQLResponseColumn.End(builder))
+    columns_offset = build_offsets(builder, SQLResponseColumns.StartColumnsVector, column_offsets)
+    SQLResponseColumns.Start(builder)
+    SQLResponseColumns.AddColumns(builder, columns_offset)
+    SQLResponseColumns.AddRowCount(builder, row_count)
+    builder.Finish(SQLResponseColumns.End(builder))
+
+    proto = pb2.SQLQueryResponse()
+    proto.rows = bytes(builder.Output())
+    return proto.SerializeToString()
+
+
+COLUMNS = [
+    ('l', DataType.LONG, [False, True, False], [1, 0, -(1 << 62)]),
+    ('b', DataType.BOOLEAN, [False, False, True], [True, False, False]),
+    ('d', DataType.DOUBLE, [False, False, False], [1.5, -0.0, 3.25]),
+    ('s', DataType.STRING, [False, True, False], [u'中文', u'', u'abc']),
+    ('bin', DataType.BINARY, [False, False, False], [b'\x01\x02', b'', b'\x7f']),
+    ('rle', DataType.STRING_RLE, [False, False, False], ([u'x', u'y'], [1, 0, 1])),
+    ('none', DataType.NONE, [True, True, True], None),
+]
+
+
+class SQLColumnarTest(unittest.TestCase):
+
+    def decode(self, body, columnar):
+        options = {'columnar': True} if columnar else None
+        (rows, _, _), _ = OTSProtoBufferDecoder('utf-8').decode_response('SQLQuery', body, 'request-id', options)
+        return rows
+
+    def test_columnar(self):
+        body = build_sql_response(COLUMNS, 3)
+        columns = self.decode(body, True)
+        self.assertEqual([column[0] for column in COLUMNS], list(columns.keys()))
+
+        values, is_null = columns['l']
+        self.assertEqual(numpy.int64, values.dtype)
+        self.assertEqual([False, True, False], is_null.tolist())
+        self.assertEqual([1, -(1 << 62)], values[~is_null].tolist())
+        self.assertEqual(numpy.bool_, columns['b'][0].dtype)
+        self.assertEqual([1.5, -0.0, 3.25], columns['d'][0].tolist())
+        self.assertEqual([u'中文', u'abc'], columns['s'][0][~columns['s'][1]].tolist())
+        self.assertEqual([b'\x01\x02', b'', b'\x7f'], columns['bin'][0].tolist())
+        self.assertEqual([u'y', u'x', u'y'], columns['rle'][0].tolist())
+        self.assertEqual([True, True, True], columns['none'][1].tolist())
+
+    def test_same_as_rows(self):
+        body = build_sql_response(COLUMNS, 3)
+        columns = self.decode(body, True)
+        rows = self.decode(body, False)
+        self.assertEqual(3, len(rows))
+        for index, row in enumerate(rows):
+            expected = []
+            for name, (values, is_null) in columns.items():
+                expected.append((name, None if is_null[index] else values[index]))
+            self.assertEqual(expected, row.attribute_columns)
+
+    def test_empty(self):
+        self.assertEqual({}, self.decode(pb2.SQLQueryResponse().SerializeToString(), True))
+        columns = self.decode(build_sql_response([('l', DataType.LONG, [], [])], 0), True)
+        self.assertEqual(0, len(columns['l'][0]))
+        self.assertEqual(0, len(columns['l'][1]))
+
+
+if __name__ == '__main__':
+    unittest.main()
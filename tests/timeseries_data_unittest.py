@@ -0,0 +1,133 @@
+# -*- coding: utf8 -*-
+
+import asyncio
+import unittest
+
+import numpy
+
+import tablestore.protobuf.timeseries_pb2 as timeseries_pb2
+from tablestore.client import OTSClient, AsyncOTSClient
+from tablestore.decoder import OTSProtoBufferDecoder
+from tablestore.metadata import *
+from tablestore.plainbuffer.plain_buffer_builder import PlainBufferBuilder
+
+
+def serialize_points(points):
+    data = bytearray()
+    for index, (time, fields) in enumerate(points):
+        primary_key = [('_#h', 'hash'), ('_m_name', 'cpu'), ('_data_source', 'host1'),
+                       ('_tags', '["region=hz","az=a"]'), ('_time', time)]
+        row = PlainBufferBuilder.serialize_for_put_row(primary_key, fields)
+        data += row if index == 0 else row[4:]
+    return bytes(data)
+
+
+POINTS = [
+    (1000, [('usage:d', 0.5), ('count:l', 1), ('ok:b', True), ('state:s', u'运行')]),
+    (2000, [('usage:d', 1.5), ('count:l', -2), ('ok:b', False), ('state:s', u'idle'), ('raw:B', bytearray(b'\x01'))]),
+    (3000, [('usage:d', 2.5), ('count:l', 1 << 40), ('ok:b', True), ('state:s', u'')]),
+]
+
+
+def make_get_timeseries_data(point_count, page_size, calls):
+    def get_timeseries_data(request, columnar=False):
+        calls.append(request.nextToken)
+        begin = int(request.nextToken or 0)
+        stop = min(begin + page_size, point_count)
+        body = timeseries_pb2.GetTimeseriesDataResponse()
+        body.rows_data = serialize_points([(i, [('v:l', i)]) for i in range(begin, stop)])
+        if stop < point_count:
+            body.next_token = str(stop).encode('utf-8')
+        response, _ = OTSProtoBufferDecoder('utf-8').decode_response(
+            'GetTimeseriesData', body.SerializeToString(), 'request-id', {'columnar': True} if columnar else None)
+        return response
+    return get_timeseries_data
+
+
+class TimeseriesDataTest(unittest.TestCase):
+
+    def decode(self, points, columnar):
+        proto = timeseries_pb2.GetTimeseriesDataResponse()
+        proto.rows_data = serialize_points(points)
+        proto.next_token = b'token'
+        response, _ = OTSProtoBufferDecoder('utf-8').decode_response(
+            'GetTimeseriesData', proto.SerializeToString(), 'request-id', {'columnar': True} if columnar else None)
+        self.assertEqual(b'token', response.nextToken)
+        return response.rows
+
+    def test_columnar(self):
+        times, fields = self.decode(POINTS, True)
+        self.assertEqual(numpy.int64, times.dtype)
+        self.assertEqual([1000, 2000, 3000], times.tolist())
+        self.assertEqual(['usage', 'count', 'ok', 'state', 'raw'], list(fields.keys()))
+        self.assertEqual(numpy.float64, fields['usage'][0].dtype)
+        self.assertEqual([0.5, 1.5, 2.5], fields['usage'][0].tolist())
+        self.assertEqual(numpy.int64, fields['count'][0].dtype)
+        self.assertEqual([1, -2, 1 << 40], fields['count'][0].tolist())
+        self.assertEqual(numpy.bool_, fields['ok'][0].dtype)
+        self.assertEqual([u'运行', u'idle', u''], fields['state'][0].tolist())
+        self.assertEqual([False, False, False], fields['state'][1].tolist())
+
+        values, is_null = fields['raw']
+        self.assertEqual([True, False, True], is_null.tolist())
+        self.assertEqual(bytearray(b'\x01'), values[1])
+
+    def test_same_as_rows(self):
+        times, fields = self.decode(POINTS, True)
+        rows = self.decode(POINTS, False)
+        self.assertEqual(len(rows), len(times))
+        for index, row in enumerate(rows):
+            self.assertEqual(TimeseriesKey('cpu', 'host1', {'region': 'hz', 'az': 'a'}).__dict__, row.timeseries_key.__dict__)
+            self.assertEqual(row.time_in_us, times[index])
+            expected = dict((name, values[index]) for name, (values, is_null) in fields.items() if not is_null[index])
+            self.assertEqual(expected, row.fields)
+        # the tags are parsed once, but every row has its own dict
+        self.assertIsNot(rows[0].timeseries_key.tags, rows[1].timeseries_key.tags)
+
+    def test_empty(self):
+        proto = timeseries_pb2.GetTimeseriesDataResponse()
+        proto.rows_data = b''
+        response, _ = OTSProtoBufferDecoder('utf-8').decode_response(
+            'GetTimeseriesData', proto.SerializeToString(), 'request-id', {'columnar': True})
+        times, fields = response.rows
+        self.assertEqual(0, len(times))
+        self.assertEqual({}, fields)
+
+    def test_xget_timeseries_data(self):
+        client = OTSClient('http://test.endpoint', 'test_id', 'test_key', 'test-inst')
+        calls = []
+        client.get_timeseries_data = make_get_timeseries_data(25, 10, calls)
+        request = GetTimeseriesDataRequest('table', TimeseriesKey('cpu', 'host1', {}), 0, 100, limit=10)
+
+        rows = list(client.xget_timeseries_data(request, prefetch_depth=2))
+        self.assertEqual(list(range(25)), [row.time_in_us for row in rows])
+        self.assertEqual([None, b'10', b'20'], calls)
+        self.assertIsNone(request.nextToken)
+
+        pages = list(client.xget_timeseries_data(request, prefetch_depth=0, columnar=True))
+        self.assertEqual([10, 10, 5], [len(times) for times, _ in pages])
+        self.assertEqual(list(range(25)), numpy.concatenate([fields['v'][0] for _, fields in pages]).tolist())
+
+        with self.assertRaisesRegex(OTSClientError, 'prefetch_depth'):
+            list(client.xget_timeseries_data(request, prefetch_depth=-1))
+
+    def test_async_xget_timeseries_data(self):
+        client = AsyncOTSClient('http://test.endpoint', 'test_id', 'test_key', 'test-inst')
+        get_timeseries_data = make_get_timeseries_data(25, 10, [])
+
+        async def fake(request, columnar=False):
+            return get_timeseries_data(request, columnar)
+        client.get_timeseries_data = fake
+        request = GetTimeseriesDataRequest('table', TimeseriesKey('cpu', 'host1', {}), 0, 100, limit=10)
+
+        async def collect(**kwargs):
+            return [item async for item in client.xget_timeseries_data(request, **kwargs)]
+
+        rows = asyncio.run(collect())
+        self.assertEqual(list(range(25)), [row.time_in_us for row in rows])
+        pages = asyncio.run(collect(columnar=True, prefetch_depth=0))
+        self.assertEqual([10, 10, 5], [len(times) for times, _ in pages])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,170 @@
+# -*- coding: utf8 -*-
+
+import array
+import unittest
+
+import flatbuffers
+import numpy
+
+import tablestore.protobuf.timeseries_pb2 as timeseries_pb2
+from tablestore.encoder import OTSProtoBufferEncoder
+from tablestore.error import OTSClientError
+from tablestore.flatbuffer import timeseries_flat_buffer_encoder
+from tablestore.flatbuffer.timeseries import FlatBufferRows
+from tablestore.flatbuffer.timeseries.DataType import DataType
+from tablestore.metadata import TimeseriesKey, TimeseriesRow
+
+
+def encode_per_row(timeseries_table_name, timeseries_rows):
+    # one row group for every row, as the encoder did before it grouped the rows of a timeseries
+    builder = flatbuffers.Builder()
+    row_group_offs = [timeseries_flat_buffer_encoder.build_row_to_row_group_offset(row, builder, timeseries_table_name)
+                      for row in timeseries_rows]
+    row_group_vector_offs = timeseries_flat_buffer_encoder.build_row_group_vectors(row_group_offs, builder)
+    FlatBufferRows.FlatBufferRowsStart(builder)
+    FlatBufferRows.FlatBufferRowsAddRowGroups(builder, row_group_vector_offs)
+    builder.Finish(FlatBufferRows.FlatBufferRowsEnd(builder))
+    return builder.Output()
+
+
+def decode_rows(data):
+    # flatten the row groups into (measurement, data_source, tags, time, fields)
+    rows = FlatBufferRows.FlatBufferRows.GetRootAsFlatBufferRows(bytes(data), 0)
+    result = []
+    for i in range(rows.RowGroupsLength()):
+        group = rows.RowGroups(i)
+        names = [group.FieldNames(j).decode('utf-8') for j in range(group.FieldNamesLength())]
+        types = [group.FieldTypes(j) for j in range(group.FieldTypesLength())]
+        for j in range(group.RowsLength()):
+            row = group.Rows(j)
+            values = row.FieldValues()
+            counters = dict.fromkeys(types, 0)
+            fields = {}
+            for name, field_type in zip(names, types):
+                index = counters[field_type]
+                counters[field_type] += 1
+                if field_type == DataType.LONG:
+                    fields[name] = values.LongValues(index)
+                elif field_type == DataType.DOUBLE:
+                    fields[name] = values.DoubleValues(index)
+                elif field_type == DataType.BOOLEAN:
+                    fields[name] = values.BoolValues(index)
+                elif field_type == DataType.STRING:
+                    fields[name] = values.StringValues(index).decode('utf-8')
+                else:
+                    fields[name] = values.BinaryValues(index).ValueAsNumpy().tobytes()
+            tags = dict((row.TagList(k).Name().decode('utf-8'), row.TagList(k).Value().decode('utf-8'))
+                        for k in range(row.TagListLength()))
+            result.append((group.MeasurementName().decode('utf-8'), row.DataSource().decode('utf-8'),
+                           tags, row.Time(), fields))
+    return result
+
+
+def make_rows():
+    key1 = TimeseriesKey('cpu', 'host1', {'region': 'hz', 'az': 'a'})
+    key2 = TimeseriesKey('cpu', 'host2', {'region': 'hz', 'az': 'b'})
+    key3 = TimeseriesKey('mem', None, {})
+    rows = []
+    for i in range(5):
+        rows.append(TimeseriesRow(key1, {'usage': i * 0.5, 'count': i, 'ok': True, 'state': u'运行'}, 1000 + i))
+        rows.append(TimeseriesRow(key2, {'count': -i, 'usage': 1.5, 'ok': False, 'state': 'idle'}, 2000 + i))
+    rows.append(TimeseriesRow(key3, {'bin': bytearray(b'\x00\xff'), 'raw': b'x'}, 3000))
+    rows.append(TimeseriesRow(key1, {'usage': 0.25, 'count': 9, 'ok': True, 'state': 'x'}, 4000))
+    return rows
+
+
+class TimeseriesEncoderTest(unittest.TestCase):
+
+    def test_same_rows_as_per_row_encoder(self):
+        rows = make_rows()
+        data = timeseries_flat_buffer_encoder.get_column_val_by_tp('table', rows)
+        reference = encode_per_row('table', rows)
+        self.assertEqual(decode_rows(reference), decode_rows(data))
+        self.assertLess(len(data), len(reference))
+
+    def test_row_groups(self):
+        rows = make_rows()
+        data = timeseries_flat_buffer_encoder.get_column_val_by_tp('table', rows)
+        flat_buffer_rows = FlatBufferRows.FlatBufferRows.GetRootAsFlatBufferRows(bytes(data), 0)
+        # the consecutive rows of cpu share one group, the rows are not reordered
+        self.assertEqual([10, 1, 1], [flat_buffer_rows.RowGroups(i).RowsLength()
+                                      for i in range(flat_buffer_rows.RowGroupsLength())])
+        self.assertEqual([row.time_in_us for row in rows], [row[3] for row in decode_rows(data)])
+
+    def test_numpy_values(self):
+        key = TimeseriesKey('m', 'd', {'t': 'v'})
+        rows = [TimeseriesRow(key, {'l': numpy.int64(3), 'd': numpy.float32(0.5), 'b': numpy.bool_(True)},
+                              numpy.int64(10))]
+        data = timeseries_flat_buffer_encoder.get_column_val_by_tp('table', rows)
+        self.assertEqual([('m', 'd', {'t': 'v'}, 10, {'l': 3, 'd': 0.5, 'b': True})], decode_rows(data))
+
+        rows = [TimeseriesRow(key, {'l': [1]}, 10)]
+        self.assertRaises(OTSClientError, timeseries_flat_buffer_encoder.get_column_val_by_tp, 'table', rows)
+
+    def test_empty(self):
+        data = timeseries_flat_buffer_encoder.get_column_val_by_tp('table', [])
+        self.assertEqual([], decode_rows(data))
+
+
+class TimeseriesColumnsEncoderTest(unittest.TestCase):
+
+    def test_same_as_rows(self):
+        key = TimeseriesKey('cpu', 'host1', {'region': 'hz', 'az': 'a'})
+        timestamps = numpy.arange(1000, 1010)
+        fields = {
+            'count': numpy.arange(10, dtype=numpy.int32),
+            'usage': numpy.linspace(0, 1, 10),
+            'ok': numpy.arange(10) % 2 == 0,
+            'state': [u'运行' if i % 2 else 'idle' for i in range(10)],
+            'bin': [bytearray([i]) for i in range(10)],
+            'total': array.array('q', range(100, 110)),
+            'load': [i * 0.25 for i in range(10)],
+        }
+        rows = [TimeseriesRow(key, dict((name, values[i]) for name, values in fields.items()), int(timestamps[i]))
+                for i in range(10)]
+        # numpy scalars are decoded as python values by the reference encoder
+        for row in rows:
+            row.fields = dict((name, value.item() if isinstance(value, numpy.generic) else value)
+                              for name, value in row.fields.items())
+
+        data = timeseries_flat_buffer_encoder.get_column_val_by_columns(key, timestamps, fields)
+        reference = encode_per_row('table', rows)
+        self.assertEqual(decode_rows(reference), decode_rows(data))
+        flat_buffer_rows = FlatBufferRows.FlatBufferRows.GetRootAsFlatBufferRows(bytes(data), 0)
+        self.assertEqual(1, flat_buffer_rows.RowGroupsLength())
+
+    def test_invalid_columns(self):
+        key = TimeseriesKey('cpu', 'host1', {})
+        encode = timeseries_flat_buffer_encoder.get_column_val_by_columns
+        self.assertRaises(OTSClientError, encode, key, [1, 2], {'a': [1]})
+        self.assertRaises(OTSClientError, encode, key, [1, 2], {'a': [1, 'x']})
+        self.assertRaises(OTSClientError, encode, key, [1, 2], {'a': numpy.zeros((2, 2))})
+        self.assertRaises(OTSClientError, encode, key, [[1, 2]], {'a': [1]})
+        self.assertEqual([], decode_rows(encode(key, [], {'a': []})))
+
+    def test_unsigned_columns(self):
+        key = TimeseriesKey('cpu', 'host1', {})
+        encode = timeseries_flat_buffer_encoder.get_column_val_by_columns
+        too_large = numpy.array([1, 1 << 63], dtype=numpy.uint64)
+        self.assertRaises(OTSClientError, encode, key, [1, 2], {'a': too_large})
+        self.assertRaises(OTSClientError, encode, key, [1, 2], {'a': array.array('Q', [1, 1 << 63])})
+        self.assertRaises(OTSClientError, encode, key, too_large, {'a': [1, 2]})
+
+        data = encode(key, numpy.array([1, 2], dtype=numpy.uint32),
+                      {'a': numpy.array([0, (1 << 63) - 1], dtype=numpy.uint64)})
+        self.assertEqual([('cpu', 'host1', {}, 1, {'a': 0}), ('cpu', 'host1', {}, 2, {'a': (1 << 63) - 1})],
+                         decode_rows(data))
+
+    def test_encode_request(self):
+        key = TimeseriesKey('cpu', 'host1', {'region': 'hz'})
+        proto = OTSProtoBufferEncoder('utf-8').encode_request(
+            'PutTimeseriesData', 'table', None, timeseries_columns=(key, [10, 20], {'v': [1.5, 2.5]}))
+        self.assertEqual('table', proto.table_name)
+        self.assertEqual(timeseries_pb2.RST_FLAT_BUFFER, proto.rows_data.type)
+        self.assertEqual([('cpu', 'host1', {'region': 'hz'}, 10, {'v': 1.5}),
+                          ('cpu', 'host1', {'region': 'hz'}, 20, {'v': 2.5})],
+                         decode_rows(proto.rows_data.rows_data))
+
+
+if __name__ == '__main__':
+    unittest.main()
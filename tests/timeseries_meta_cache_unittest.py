@@ -0,0 +1,134 @@
+# -*- coding: utf8 -*-
+
+import asyncio
+import time
+import unittest
+
+from tablestore.cache import LRUCache
+from tablestore.client import OTSClient, AsyncOTSClient
+from tablestore.error import OTSClientError
+from tablestore.metadata import *
+from tablestore.timeseries_condition import *
+
+
+def make_condition(measurement, region):
+    return CompositeMetaQueryCondition(MetaQueryCompositeOperator.OP_AND, [
+        MeasurementMetaQueryCondition(MetaQuerySingleOperator.OP_EQUAL, measurement),
+        TagMetaQueryCondition(MetaQuerySingleOperator.OP_EQUAL, 'region', region),
+    ])
+
+
+class FakeRequestHelper(object):
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, api_name, request, **kwargs):
+        self.calls.append(api_name)
+        if api_name == 'QueryTimeseriesMeta':
+            return QueryTimeseriesMetaResponse([], len(self.calls))
+        return None
+
+
+class LRUCacheTest(unittest.TestCase):
+
+    def test_lru(self):
+        cache = LRUCache(2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        self.assertEqual(1, cache.get('a'))
+        cache.put('c', 3)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(3, cache.get('c'))
+        self.assertEqual({'size': 2, 'hits': 2, 'misses': 1, 'hit_rate': 2.0 / 3}, cache.stats())
+
+        cache.invalidate_if(lambda key: key == 'a')
+        self.assertIsNone(cache.get('a'))
+        cache.clear()
+        self.assertEqual(0, len(cache))
+        self.assertRaises(OTSClientError, LRUCache, 0)
+
+    def test_ttl(self):
+        cache = LRUCache(10, ttl=0.01)
+        cache.put('a', 1)
+        self.assertEqual(1, cache.get('a'))
+        time.sleep(0.02)
+        self.assertEqual('missing', cache.get('a', 'missing'))
+        self.assertEqual(0, len(cache))
+
+
+class TimeseriesMetaCacheTest(unittest.TestCase):
+
+    def test_canonicalize(self):
+        c1 = make_condition('cpu', 'hz')
+        c2 = CompositeMetaQueryCondition(MetaQueryCompositeOperator.OP_AND, [
+            TagMetaQueryCondition(MetaQuerySingleOperator.OP_EQUAL, 'region', 'hz'),
+            CompositeMetaQueryCondition(MetaQueryCompositeOperator.OP_AND, [
+                MeasurementMetaQueryCondition(MetaQuerySingleOperator.OP_EQUAL, 'cpu'),
+            ]),
+        ])
+        self.assertEqual(canonicalize_meta_condition(c1), canonicalize_meta_condition(c2))
+        self.assertNotEqual(canonicalize_meta_condition(c1), canonicalize_meta_condition(make_condition('cpu', 'sh')))
+
+        c3 = CompositeMetaQueryCondition(MetaQueryCompositeOperator.OP_OR, c1.subConditions)
+        self.assertNotEqual(canonicalize_meta_condition(c1), canonicalize_meta_condition(c3))
+        hash(canonicalize_meta_condition(c3))
+        self.assertIsNone(canonicalize_meta_condition(None))
+        self.assertRaises(OTSClientError, canonicalize_meta_condition, object())
+
+    def test_cache(self):
+        client = OTSClient('http://test.endpoint', 'test_id', 'test_key', 'test-inst', timeseries_meta_cache_size=10)
+        client._request_helper = helper = FakeRequestHelper()
+
+        first = client.query_timeseries_meta(QueryTimeseriesMetaRequest('t', make_condition('cpu', 'hz')))
+        second = client.query_timeseries_meta(QueryTimeseriesMetaRequest('t', make_condition('cpu', 'hz')))
+        self.assertIs(first, second)
+        client.query_timeseries_meta(QueryTimeseriesMetaRequest('t', make_condition('cpu', 'hz'), limit=10))
+        client.query_timeseries_meta(QueryTimeseriesMetaRequest('t2', make_condition('cpu', 'hz')))
+        self.assertEqual(3, len(helper.calls))
+        self.assertEqual(1, client.timeseries_meta_cache.hits)
+        self.assertEqual(3, client.timeseries_meta_cache.misses)
+
+        client.update_timeseries_meta(UpdateTimeseriesMetaRequest('t', []))
+        self.assertEqual(1, len(client.timeseries_meta_cache))
+        client.query_timeseries_meta(QueryTimeseriesMetaRequest('t', make_condition('cpu', 'hz')))
+        client.delete_timeseries_meta(DeleteTimeseriesMetaRequest('t2', []))
+        client.query_timeseries_meta(QueryTimeseriesMetaRequest('t2', make_condition('cpu', 'hz')))
+        self.assertEqual(['QueryTimeseriesMeta'] * 3 + ['UpdateTimeseriesMeta', 'QueryTimeseriesMeta',
+                                                        'DeleteTimeseriesMeta', 'QueryTimeseriesMeta'], helper.calls)
+
+        client.invalidate_timeseries_meta_cache()
+        self.assertEqual(0, len(client.timeseries_meta_cache))
+
+    def test_disabled(self):
+        client = OTSClient('http://test.endpoint', 'test_id', 'test_key', 'test-inst')
+        client._request_helper = helper = FakeRequestHelper()
+        self.assertIsNone(client.timeseries_meta_cache)
+        client.query_timeseries_meta(QueryTimeseriesMetaRequest('t', make_condition('cpu', 'hz')))
+        client.query_timeseries_meta(QueryTimeseriesMetaRequest('t', make_condition('cpu', 'hz')))
+        client.invalidate_timeseries_meta_cache('t')
+        self.assertEqual(2, len(helper.calls))
+
+    def test_async_cache(self):
+        client = AsyncOTSClient('http://test.endpoint', 'test_id', 'test_key', 'test-inst',
+                                timeseries_meta_cache_size=10, timeseries_meta_cache_ttl=30)
+        helper = FakeRequestHelper()
+
+        async def request_helper(api_name, request, **kwargs):
+            return helper(api_name, request, **kwargs)
+        client._request_helper = request_helper
+
+        async def run():
+            request = QueryTimeseriesMetaRequest('t', make_condition('cpu', 'hz'))
+            await client.query_timeseries_meta(request)
+            await client.query_timeseries_meta(request)
+            await client.delete_timeseries_meta(DeleteTimeseriesMetaRequest('t', []))
+            await client.query_timeseries_meta(request)
+
+        asyncio.run(run())
+        self.assertEqual(30, client.timeseries_meta_cache.ttl)
+        self.assertEqual(['QueryTimeseriesMeta', 'DeleteTimeseriesMeta', 'QueryTimeseriesMeta'], helper.calls)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,186 @@
+# -*- coding: utf8 -*-
+
+import asyncio
+import time
+import unittest
+
+import tablestore.protobuf.timeseries_pb2 as timeseries_pb2
+from tablestore import *
+from tablestore.decoder import OTSProtoBufferDecoder
+from tablestore.metadata import *
+from tests.lib.fake_client import FakeClient
+
+
+class FakePutTimeseriesClient(FakeClient):
+    """Records PutTimeseriesData requests and fails each point in ``fail_times`` that many times."""
+
+    def __init__(self, fail_times=None, error_code='OTSServerBusy', delay=0):
+        FakeClient.__init__(self, fail_times, error_code)
+        self.delay = delay
+
+    def put_timeseries_data(self, table_name, rows):
+        time.sleep(self.delay)
+        with self.lock:
+            self.requests.append((table_name, list(rows)))
+            failed = [FailedRowResult(index, Error(self.error_code, self.ERROR_MESSAGE))
+                      for index, row in enumerate(rows)
+                      if self.fail((row.timeseries_key.data_source, row.time_in_us))]
+            return PutTimeseriesDataResponse(failed)
+
+
+class AsyncFakePutTimeseriesClient(FakePutTimeseriesClient):
+
+    async def put_timeseries_data(self, table_name, rows):
+        await asyncio.sleep(self.delay)
+        return FakePutTimeseriesClient.put_timeseries_data(self, table_name, rows)
+
+
+def make_row(host, time_in_us):
+    return TimeseriesRow(TimeseriesKey('cpu', host, {'region': 'hz'}), {'usage': 0.5}, time_in_us)
+
+
+class TimeseriesWriterTest(unittest.TestCase):
+
+    def test_coalesce_by_series(self):
+        client = FakePutTimeseriesClient()
+        with TimeseriesWriter(client, 't', max_batch_rows=10, linger_time=60) as writer:
+            futures = [writer.write(make_row('host%d' % (i % 3), i)) for i in range(25)]
+            writer.flush()
+        for future in futures:
+            self.assertIsNone(future.result())
+        self.assertEqual([10, 10, 5], [len(rows) for _, rows in client.requests])
+        self.assertEqual(set(['t']), set(table_name for table_name, _ in client.requests))
+        # the points of one series are sent together in the order of writing
+        sources = [row.timeseries_key.data_source for _, rows in client.requests for row in rows]
+        self.assertEqual(['host0'] * 9 + ['host1'] * 8 + ['host2'] * 8, sources)
+        times = [row.time_in_us for _, rows in client.requests for row in rows]
+        self.assertEqual(list(range(0, 25, 3)), times[:9])
+
+    def test_cancelled_future(self):
+        client = FakePutTimeseriesClient(fail_times={('host', 1): 1})
+        with TimeseriesWriter(client, 't', linger_time=60) as writer:
+            futures = [writer.write(make_row('host', i)) for i in range(3)]
+            self.assertTrue(futures[0].cancel() and futures[1].cancel())
+            writer.flush()
+            self.assertIsNone(futures[2].result(timeout=5))
+            # the background thread still sends the later points
+            future = writer.write(make_row('host', 3))
+            writer.flush()
+            self.assertIsNone(future.result(timeout=5))
+        self.assertEqual(3, len(client.requests))
+
+    def test_linger_time(self):
+        client = FakePutTimeseriesClient()
+        writer = TimeseriesWriter(client, 't', linger_time=0.01)
+        future = writer.write(make_row('host', 1))
+        self.assertIsNone(future.result(timeout=5))
+        writer.close()
+
+    def test_retry_failed_rows_only(self):
+        client = FakePutTimeseriesClient(fail_times={('host1', 1): 2})
+        with TimeseriesWriter(client, 't', linger_time=60) as writer:
+            futures = [writer.write(make_row('host%d' % i, i)) for i in range(3)]
+        for future in futures:
+            self.assertIsNone(future.result())
+        self.assertEqual([3, 1, 1], [len(rows) for _, rows in client.requests])
+        self.assertEqual(1, client.requests[1][1][0].time_in_us)
+
+    def test_not_retryable_error(self):
+        client = FakePutTimeseriesClient(fail_times={('host0', 0): 1}, error_code='OTSParameterInvalid')
+        with TimeseriesWriter(client, 't', linger_time=60) as writer:
+            failed = writer.write(make_row('host0', 0))
+            succeed = writer.write(make_row('host1', 1))
+        self.assertIsNone(succeed.result())
+        with self.assertRaises(OTSServiceError) as cm:
+            failed.result()
+        self.assertEqual('OTSParameterInvalid', cm.exception.code)
+        self.assertEqual(1, len(client.requests))
+
+    def test_request_error(self):
+        client = FakePutTimeseriesClient()
+
+        def raise_error(table_name, rows):
+            raise OTSClientError('network error')
+
+        client.put_timeseries_data = raise_error
+        with TimeseriesWriter(client, 't', linger_time=60) as writer:
+            future = writer.write(make_row('host', 0))
+        self.assertRaisesRegex(OTSClientError, 'network error', future.result)
+
+    def test_backpressure(self):
+        client = FakePutTimeseriesClient(delay=0.2)
+        writer = TimeseriesWriter(client, 't', max_batch_rows=2, max_pending_rows=2, linger_time=0)
+        writer.write(make_row('host', 0))
+        writer.write(make_row('host', 1))
+        time.sleep(0.05)
+        # the first batch is being committed, the buffer holds two more points and then write blocks
+        writer.write(make_row('host', 2))
+        writer.write(make_row('host', 3))
+        with self.assertRaisesRegex(OTSClientError, 'Timeout'):
+            writer.write(make_row('host', 4), timeout=0.01)
+        start = time.time()
+        writer.write(make_row('host', 4))
+        self.assertGreater(time.time() - start, 0.05)
+        writer.close()
+        self.assertEqual(5, sum(len(rows) for _, rows in client.requests))
+
+    def test_closed(self):
+        writer = TimeseriesWriter(FakePutTimeseriesClient(), 't')
+        writer.close()
+        with self.assertRaisesRegex(OTSClientError, 'TimeseriesWriter is closed.'):
+            writer.write(make_row('host', 0))
+        self.assertRaises(OTSClientError, writer.write, 'not a row')
+        with self.assertRaisesRegex(OTSClientError, 'max_batch_rows'):
+            TimeseriesWriter(FakePutTimeseriesClient(), 't', max_batch_rows=1001)
+        with self.assertRaisesRegex(OTSClientError, 'max_pending_rows'):
+            TimeseriesWriter(FakePutTimeseriesClient(), 't', max_batch_rows=10, max_pending_rows=5)
+
+    def test_decode_failed_rows(self):
+        proto = timeseries_pb2.PutTimeseriesDataResponse()
+        failed = proto.failed_rows.add()
+        failed.row_index = 3
+        failed.error_code = 'OTSServerBusy'
+        failed.error_message = 'busy'
+        response, _ = OTSProtoBufferDecoder('utf-8').decode_response(
+            'PutTimeseriesData', proto.SerializeToString(), 'request-id')
+        self.assertEqual(1, len(response.failedRows))
+        self.assertEqual((3, 'OTSServerBusy', 'busy'), (response.failedRows[0].index, response.failedRows[0].error.code,
+                                                       response.failedRows[0].error.message))
+
+
+class AsyncTimeseriesWriterTest(unittest.TestCase):
+
+    def test_write(self):
+        client = AsyncFakePutTimeseriesClient(fail_times={('host1', 1): 1})
+
+        async def run():
+            async with AsyncTimeseriesWriter(client, 't', max_batch_rows=4, linger_time=60) as writer:
+                futures = [await writer.write(make_row('host%d' % (i % 2), i)) for i in range(6)]
+            return [await future for future in futures]
+
+        self.assertEqual([None] * 6, asyncio.run(run()))
+        # the failed point is retried before the next batch is taken
+        self.assertEqual([4, 1, 2], [len(rows) for _, rows in client.requests])
+        self.assertEqual(['host0', 'host0', 'host0', 'host1'],
+                         [row.timeseries_key.data_source for row in client.requests[0][1]])
+
+    def test_backpressure_and_linger(self):
+        client = AsyncFakePutTimeseriesClient(delay=0.1)
+
+        async def run():
+            writer = AsyncTimeseriesWriter(client, 't', max_batch_rows=1, max_pending_rows=1, linger_time=0.01)
+            start = time.time()
+            futures = [await writer.write(make_row('host', i)) for i in range(3)]
+            blocked = time.time() - start
+            await asyncio.wait_for(asyncio.gather(*futures), 5)
+            await writer.close()
+            with self.assertRaisesRegex(OTSClientError, 'closed'):
+                await writer.write(make_row('host', 3))
+            return blocked
+
+        self.assertGreater(asyncio.run(run()), 0.05)
+        self.assertEqual(3, len(client.requests))
+
+
+if __name__ == '__main__':
+    unittest.main()
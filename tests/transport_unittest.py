@@ -0,0 +1,102 @@
+# -*- coding: utf8 -*-
+
+import asyncio
+import base64
+import hashlib
+import unittest
+
+import tablestore.protobuf.table_store_pb2 as pb2
+from tablestore import utils
+from tablestore.client import OTSClient, AsyncOTSClient
+from tablestore.connection import ConnectionPool, AsyncConnectionPool
+from tablestore.error import OTSClientError
+from tablestore.transport import *
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+
+def make_response(client, query, proto):
+    body = proto.SerializeToString()
+    headers = {
+        'x-ots-date': utils.get_now_utc_datetime().strftime('%Y-%m-%dT%H:%M:%S.000Z'),
+        'x-ots-requestid': 'request-id',
+        'x-ots-contentmd5': base64.b64encode(hashlib.md5(body).digest()).decode('utf8'),
+        'x-ots-contenttype': 'protocol buffer',
+    }
+    headers['authorization'] = 'OTS test_id:%s' % client._signer.make_response_signature(query, headers)
+    return 200, 'OK', headers, body
+
+
+class ListTableTransport(Transport):
+    """Answers ListTable with the table names of ``tables``."""
+
+    def __init__(self, tables):
+        self.tables = tables
+        self.client = None
+        self.requests = []
+        self.closed = False
+
+    def send_receive(self, url, request_headers, request_body):
+        self.requests.append(url)
+        proto = pb2.ListTableResponse()
+        proto.table_names.extend(self.tables)
+        return make_response(self.client, url, proto)
+
+    def close(self):
+        self.closed = True
+
+
+class AsyncListTableTransport(AsyncTransport):
+
+    def __init__(self, tables):
+        self.transport = ListTableTransport(tables)
+
+    async def send_receive(self, url, request_headers, request_body):
+        return self.transport.send_receive(url, request_headers, request_body)
+
+
+class TransportTest(unittest.TestCase):
+
+    def test_transport(self):
+        transport = ListTableTransport(['t1', 't2'])
+        with OTSClient('http://test.endpoint', 'test_id', 'test_key', 'test-inst', transport=transport) as client:
+            transport.client = client
+            self.assertIs(transport, client.connection)
+            self.assertEqual(('t1', 't2'), client.list_table())
+        self.assertEqual(['/ListTable'], transport.requests)
+        # the transport is owned by the caller
+        self.assertFalse(transport.closed)
+
+    def test_async_transport(self):
+        transport = AsyncListTableTransport(['t1'])
+        client = AsyncOTSClient('http://test.endpoint', 'test_id', 'test_key', 'test-inst', transport=transport)
+        transport.transport.client = client
+
+        async def run():
+            async with client:
+                return await client.list_table()
+
+        self.assertEqual(('t1',), asyncio.run(run()))
+        self.assertEqual(['/ListTable'], transport.transport.requests)
+
+    def test_interface(self):
+        self.assertTrue(issubclass(ConnectionPool, Transport))
+        self.assertTrue(issubclass(AsyncConnectionPool, AsyncTransport))
+        self.assertRaises(TypeError, Transport)
+
+    @unittest.skipIf(httpx is not None, 'httpx is installed')
+    def test_httpx_not_installed(self):
+        self.assertRaisesRegex(OTSClientError, 'pip install', HttpxTransport, 'http://test.endpoint')
+
+    @unittest.skipIf(httpx is None, 'httpx is not installed')
+    def test_httpx(self):
+        transport = HttpxTransport('http://test.endpoint', http2=False, timeout=(1, 5), maxsize=10)
+        self.assertEqual(10, transport.pool._transport._pool._max_connections)
+        transport.close()
+
+
+if __name__ == '__main__':
+    unittest.main()